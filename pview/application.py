@@ -5,6 +5,7 @@ from __future__ import annotations
 
 import typing
 import collections
+import concurrent.futures
 import uuid
 import logging
 
@@ -15,13 +16,32 @@ from aiohttp.web_routedef import RouteDef
 from application_details import ALLOW_REMOTE
 from application_details import LOG_LEVEL
 
+from utilities.collectors import Collector
+from utilities.collectors import get_collector
 from utilities.common import LOCAL_ONLY_IDENTIFIER
+from utilities.sampler import Sampler
 
 
 class LocalApplication(web.Application):
-    def __init__(self, include_self: bool = False, **kwargs):
+    def __init__(
+        self,
+        include_self: bool = False,
+        collector: Collector = None,
+        sampler: Sampler = None,
+        executor: concurrent.futures.Executor = None,
+        **kwargs
+    ):
         super().__init__(**kwargs)
         self.__include_self = bool(include_self)
+        self.__collector = collector if collector is not None else get_collector()
+        self.__sampler = sampler
+        self.__executor = executor
+
+        if executor is not None:
+            self.cleanup_ctx.append(self.__shut_down_executor)
+
+        if sampler is not None:
+            self.cleanup_ctx.append(self.__run_sampler)
         self.__current_client_ids: collections.deque[str] = collections.deque(maxlen=5)
 
         log_level = logging.getLevelName(LOG_LEVEL)
@@ -31,6 +51,36 @@ class LocalApplication(web.Application):
     def include_self(self) -> bool:
         return self.__include_self
 
+    @property
+    def collector(self) -> Collector:
+        """
+        The backend used to collect process data
+        """
+        return self.__collector
+
+    @property
+    def sampler(self) -> typing.Optional[Sampler]:
+        """
+        The sampler that keeps snapshots of process data ready in the background
+        """
+        return self.__sampler
+
+    @property
+    def executor(self) -> typing.Optional[concurrent.futures.Executor]:
+        """
+        Where CPU heavy work like building process trees is run. Work is run on the event loop if there isn't one
+        """
+        return self.__executor
+
+    async def __shut_down_executor(self, application: web.Application) -> typing.AsyncIterator[None]:
+        yield
+        self.__executor.shutdown(wait=False, cancel_futures=True)
+
+    async def __run_sampler(self, application: web.Application) -> typing.AsyncIterator[None]:
+        self.__sampler.start()
+        yield
+        await self.__sampler.stop()
+
     def is_valid_client_id(self, client_id: typing.Optional[str]) -> bool:
         return client_id in self.__current_client_ids
 
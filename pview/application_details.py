@@ -29,6 +29,52 @@ USERNAME: typing.Final[str] = os.environ.get("USER")
 MAX_CLIENTS: typing.Final[int] = int(os.environ.get("PVIEW_MAX_CLIENTS", 5))
 """The maximum number of clients that may be connected at a given time"""
 
+DEFAULT_COLLECTOR: typing.Final[str] = os.environ.get("PVIEW_DEFAULT_COLLECTOR", "auto")
+"""The name of the backend used to collect process data. 'auto' picks the cheapest one available on the host"""
+
+DEFAULT_FOLD_MODE: typing.Final[str] = os.environ.get("PVIEW_DEFAULT_FOLD_MODE", "children")
+"""How the usage of child processes is folded into their parents: 'none', 'children', or 'subtree'"""
+
+SAMPLE_INTERVAL: typing.Final[float] = float(os.environ.get("PVIEW_SAMPLE_INTERVAL", 5.0))
+"""The number of seconds to wait between samples of process data"""
+
+SNAPSHOT_COUNT: typing.Final[int] = int(os.environ.get("PVIEW_SNAPSHOT_COUNT", 5))
+"""The number of samples of process data to keep in memory"""
+
+RENDER_EXECUTOR: typing.Final[str] = os.environ.get("PVIEW_RENDER_EXECUTOR", "thread")
+"""Where process trees are built and rendered: 'inline', 'thread', or 'process'"""
+
+RENDER_WORKERS: typing.Final[typing.Optional[int]] = int(os.environ["PVIEW_RENDER_WORKERS"]) \
+    if os.environ.get("PVIEW_RENDER_WORKERS") else None
+"""The number of workers used to build and render process trees. The executor's default is used if not set"""
+
+COMMAND_TIMEOUT: typing.Final[float] = float(os.environ.get("PVIEW_COMMAND_TIMEOUT", 10.0))
+"""The number of seconds a shell command used to collect process data may run before it is killed"""
+
+COMMAND_OUTPUT_LIMIT: typing.Final[int] = int(os.environ.get("PVIEW_COMMAND_OUTPUT_LIMIT", 64 * 1024 * 1024))
+"""The maximum number of bytes that will be read from the stdout or the stderr of a shell command"""
+
+SUNBURST_MAX_CHILDREN: typing.Final[int] = int(os.environ.get("PVIEW_SUNBURST_MAX_CHILDREN", 50))
+"""
+The number of the largest children drawn beneath each segment of the process sunburst. The rest are drawn as a
+single 'other' segment. 0 draws every child
+"""
+
+SUNBURST_MIN_PERCENT: typing.Final[float] = float(os.environ.get("PVIEW_SUNBURST_MIN_PERCENT", 0.5))
+"""
+The smallest share of its siblings, as a percent, that a child needs to be drawn on its own in the process sunburst.
+0 draws every child
+"""
+
+SUNBURST_DEPTH: typing.Final[int] = int(os.environ.get("PVIEW_SUNBURST_DEPTH", 2))
+"""
+The number of levels of the process sunburst sent at once. Deeper levels are sent when a segment is clicked.
+0 sends every level
+"""
+
+JSON_ENCODER: typing.Final[str] = os.environ.get("PVIEW_JSON_ENCODER", "auto")
+"""The name of the encoder used to serialize responses: 'orjson' or 'json'. 'auto' picks the fastest one available"""
+
 LOG_LEVEL: typing.Final[str] = os.environ.get("PVIEW_LOG_LEVEL", "INFO")
 """The logging level for messaging"""
 
@@ -7,4 +7,5 @@ from .http import Index
 
 from .ps import PS
 from .ps import GetProcessView
+from .ps import GetSubtreeView
 from .ps import KillProcess
\ No newline at end of file
@@ -3,6 +3,7 @@ Views that reflect the results of the 'ps' command
 """
 from __future__ import annotations
 
+import functools
 import os
 import re
 import typing
@@ -20,35 +21,230 @@ from messages.responses import access_denied
 from messages.responses import invalid_message_response
 from messages.responses.error import item_missing
 from messages.responses.process import KillResponse
+from pview.models.tree import DetailLimits
 from pview.models.tree import ProcessTree
+from pview.models.tree import SUNBURST_METRICS
 from pview.utilities.common import to_bool
+from utilities.collectors import Collector
+from utilities.executors import PAYLOAD_BUILDER
+from utilities.executors import render_payload
+from utilities.executors import run_in_executor
 from utilities.ps import ProcessEntry
+from utilities.ps import ProcessSnapshot
 from utilities.ps import ProcessStatus
 from utilities.ps import SizeUnit
 from utilities.ps import describe_memory
+from utilities.sampler import Sampler
+from utilities.serialization import json_response
+from utilities.serialization import payload_response
 
 POSITIVE_INTEGER_PATTERN = re.compile(r"^\d+$")
 
 
-def get_tree_payload(include_self: bool = None) -> typing.Dict[str, typing.Any]:
-    include_self = to_bool(value=include_self)
+def get_default_detail_limits() -> DetailLimits:
+    """
+    How much of the process tree is drawn when a client doesn't ask for anything else
+    """
+    return DetailLimits(
+        max_children=application_details.SUNBURST_MAX_CHILDREN or None,
+        min_percent=application_details.SUNBURST_MIN_PERCENT or None,
+        max_depth=application_details.SUNBURST_DEPTH or None
+    )
 
-    process_tree = ProcessTree.load(include_self=include_self)
-    data = process_tree.plot_dict()
+
+def read_detail_limits(query: typing.Mapping[str, str]) -> DetailLimits:
+    """
+    Read how much of the process tree to draw from the parameters of a request
+
+    `top` is the number of the largest children to draw beneath each segment, `min_percent` is the smallest share
+    of its siblings that a child needs to be drawn on its own, and `depth` is the number of levels to draw.
+    A value of 0 draws everything
+
+    :param query: The query parameters of the request
+    :return: The limits requested, falling back to the defaults for anything not given
+    """
+    limits = get_default_detail_limits()
+    top = query.get("top")
+    min_percent = query.get("min_percent")
+    depth = query.get("depth")
+
+    if top is not None and top != '':
+        if not POSITIVE_INTEGER_PATTERN.search(top):
+            raise ValueError(f"'{top}' is not a valid number of children to draw")
+
+        limits = limits._replace(max_children=int(top) or None)
+
+    if min_percent is not None and min_percent != '':
+        try:
+            percent = float(min_percent)
+        except ValueError:
+            raise ValueError(f"'{min_percent}' is not a valid percent") from None
+
+        if not 0 <= percent <= 100:
+            raise ValueError(f"'{min_percent}' is not a valid percent - it must be between 0 and 100")
+
+        limits = limits._replace(min_percent=percent or None)
+
+    if depth is not None and depth != '':
+        if not POSITIVE_INTEGER_PATTERN.search(depth):
+            raise ValueError(f"'{depth}' is not a valid number of levels to draw")
+
+        limits = limits._replace(max_depth=int(depth) or None)
+
+    return limits
+
+
+def get_application_collector(app: web.Application) -> Collector:
+    """
+    Get the collector the application reads process data with
+
+    Collectors measure CPU usage against their previous sample, so a new one must not be made for a request
+
+    :param app: The application handling the request
+    :return: The application's collector
+    """
+    collector: typing.Optional[Collector] = getattr(app, "collector", None)
+
+    if collector is None:
+        raise RuntimeError(f"{app.__class__.__name__} does not have a collector to read process data with")
+
+    return collector
+
+
+async def render_latest_payload(app: web.Application, build_payload: PAYLOAD_BUILDER) -> bytes:
+    """
+    Render the newest process data held by the application
+
+    :param app: The application handling the request
+    :param build_payload: The function that creates the payload from the process data
+    :return: The serialized payload
+    """
+    sampler: typing.Optional[Sampler] = getattr(app, "sampler", None)
+
+    if sampler is not None:
+        snapshot = sampler.latest or await sampler.sample_async()
+        return await sampler.render_async(snapshot, build_payload)
+
+    collector = get_application_collector(app)
+    process_snapshot = await collector.collect_async()
+    status = ProcessStatus(include_self=to_bool(getattr(app, "include_self", False)), snapshot=process_snapshot)
+    return await run_in_executor(
+        getattr(app, "executor", None),
+        render_payload,
+        build_payload,
+        status.snapshot,
+        {"collector": collector.describe()}
+    )
+
+
+def build_tree_payload(
+    snapshot: ProcessSnapshot,
+    details: typing.Dict[str, typing.Any],
+    limits: DetailLimits = None,
+    tree: ProcessTree = None
+) -> typing.Dict[str, typing.Any]:
+    """
+    Create the data used to draw the process tree on the client
+
+    May be run within a process pool, so it only relies on the raw snapshot unless a tree is given
+
+    :param snapshot: The sample of process data to draw. Processes that shouldn't be shown have already been removed
+    :param details: Information about how the sample was collected
+    :param limits: How much of the tree to draw. The application's defaults are used if not given
+    :param tree: A tree already built from the snapshot, such as the one the sampler keeps up to date. A new tree
+        is built from the snapshot if not given
+    :return: The compact figure data for the process tree, sized by every metric in one pass, along with
+        overall usage
+    """
+    if limits is None:
+        limits = get_default_detail_limits()
+
+    process_tree = tree or ProcessTree.from_status(ProcessStatus(include_self=True, snapshot=snapshot))
+    data = process_tree.compact_dict(limits=limits, metrics=SUNBURST_METRICS)
     data['memory_usage'] = describe_memory(process_tree.memory_usage, SizeUnit.KB)
     data['cpu_percent'] = f"{round(process_tree.cpu_percent, 2)}%"
 
     return data
 
 
+def build_subtree_payload(
+    snapshot: ProcessSnapshot,
+    details: typing.Dict[str, typing.Any],
+    node_id: str,
+    limits: DetailLimits = None,
+    tree: ProcessTree = None
+) -> typing.Dict[str, typing.Any]:
+    """
+    Create the data used to draw what lies beneath a single segment of the process tree on the client
+
+    May be run within a process pool, so it only relies on the raw snapshot unless a tree is given
+
+    :param snapshot: The sample of process data to draw. Processes that shouldn't be shown have already been removed
+    :param details: Information about how the sample was collected
+    :param node_id: The ID of the segment to draw beneath
+    :param limits: How much of the subtree to draw. The application's defaults are used if not given
+    :param tree: A tree already built from the snapshot, such as the one the sampler keeps up to date. A new tree
+        is built from the snapshot if not given
+    :return: The compact segments for the segment and everything drawn beneath it
+    """
+    if limits is None:
+        limits = get_default_detail_limits()
+
+    process_tree = tree or ProcessTree.from_status(ProcessStatus(include_self=True, snapshot=snapshot))
+    return process_tree.compact_subtree_dict(node_id, limits=limits, metrics=SUNBURST_METRICS)
+
+
 class PS(RegisteredLocalOnlyView):
     @property
     def operation(self) -> str:
         return "Process Status"
 
     async def process_request(self, request: web.Request, *args, **kwargs) -> typing.Union[PViewResponse, web.Response]:
-        data = get_tree_payload(include_self=getattr(request.app, "include_self", False))
-        return web.json_response(data=data)
+        try:
+            limits = read_detail_limits(request.query)
+        except ValueError as exception:
+            return invalid_message_response(operation=self.operation, error_message=str(exception))
+
+        sampler: typing.Optional[Sampler] = getattr(request.app, "sampler", None)
+
+        if sampler is not None and limits == get_default_detail_limits():
+            # The newest snapshot is served as is - one is only taken here if the sampler hasn't made one yet
+            snapshot = sampler.latest or await sampler.sample_async()
+            payload = snapshot.payload
+        else:
+            payload = await render_latest_payload(request.app, functools.partial(build_tree_payload, limits=limits))
+
+        return payload_response(payload)
+
+
+class GetSubtreeView(RegisteredLocalOnlyView):
+    """
+    Sends the part of the process tree beneath a single segment so that clients may draw deeper levels on demand
+    """
+    @property
+    def operation(self) -> str:
+        return "Get Subtree"
+
+    async def process_request(self, request: web.Request, *args, **kwargs) -> typing.Union[PViewResponse, web.Response]:
+        node_id = request.match_info['node_id']
+
+        try:
+            limits = read_detail_limits(request.query)
+        except ValueError as exception:
+            return invalid_message_response(operation=self.operation, error_message=str(exception))
+
+        try:
+            payload = await render_latest_payload(
+                request.app,
+                functools.partial(build_subtree_payload, node_id=node_id, limits=limits)
+            )
+        except KeyError as exception:
+            return item_missing(
+                operation=self.operation,
+                message=str(exception.args[0]) if exception.args else f"There is no '{node_id}' node"
+            )
+
+        return payload_response(payload)
 
 
 class KillProcess(RegisteredLocalOnlyView):
@@ -176,6 +372,16 @@ class GetProcessView(RegisteredLocalOnlyView):
                 ])
                 cpu_percent += process_data.get("cpu_percent") if process_data.get("cpu_percent") is not None else 0
 
+                # psutil reports 0% on the first reading for a process, so prefer the rates measured by the sampler
+                sampler: typing.Optional[Sampler] = getattr(request.app, "sampler", None)
+                sampled_process = sampler.latest.status.get_by_pid(process_id) if sampler and sampler.latest else None
+
+                if sampled_process is not None:
+                    cpu_percent = sampled_process.current_cpu_percent + sum([
+                        child_process.current_cpu_percent
+                        for child_process in sampler.latest.status.get_child_processes(process_id)
+                    ])
+
                 memory_percent = sum([
                     child.get("memory_percent") or 0
                     for child in children
@@ -206,7 +412,13 @@ class GetProcessView(RegisteredLocalOnlyView):
                 if isinstance(process_data.get("create_time"), (int, float)):
                     data['create_time'] = datetime.fromtimestamp(process_data['create_time']).strftime("%Y-%m-%d %H:%M%z")
             else:
-                latest_status = ProcessStatus.latest()
+                sampler: typing.Optional[Sampler] = getattr(request.app, "sampler", None)
+
+                if sampler is not None and sampler.latest is not None:
+                    latest_status = sampler.latest.status
+                else:
+                    collector = get_application_collector(request.app)
+                    latest_status = ProcessStatus(snapshot=await collector.collect_async())
                 current_process_state: typing.Optional[ProcessEntry] = latest_status.get_by_pid(process_id)
 
                 if current_process_state is None:
@@ -254,4 +466,4 @@ class GetProcessView(RegisteredLocalOnlyView):
             )
             return response
 
-        return web.json_response(data=data)
+        return json_response(data)
@@ -7,6 +7,10 @@ import argparse
 import typing
 
 import application_details
+from utilities.collectors import AUTOMATIC_COLLECTOR
+from utilities.collectors import COLLECTORS
+from utilities.executors import ExecutorKind
+from utilities.ps import FoldMode
 
 
 class ApplicationArguments:
@@ -14,6 +18,12 @@ class ApplicationArguments:
         self.__port: typing.Optional[int] = None
         self.__index_page: typing.Optional[str] = None
         self.__include_self: bool = False
+        self.__collector: typing.Optional[str] = None
+        self.__fold_mode: typing.Optional[str] = None
+        self.__sample_interval: typing.Optional[float] = None
+        self.__snapshot_count: typing.Optional[int] = None
+        self.__render_executor: typing.Optional[str] = None
+        self.__render_workers: typing.Optional[int] = None
 
         self.__parse_arguments(*argv)
 
@@ -29,6 +39,30 @@ class ApplicationArguments:
     def include_self(self) -> bool:
         return self.__include_self
 
+    @property
+    def collector(self) -> str:
+        return self.__collector
+
+    @property
+    def fold_mode(self) -> str:
+        return self.__fold_mode
+
+    @property
+    def sample_interval(self) -> float:
+        return self.__sample_interval
+
+    @property
+    def snapshot_count(self) -> int:
+        return self.__snapshot_count
+
+    @property
+    def render_executor(self) -> str:
+        return self.__render_executor
+
+    @property
+    def render_workers(self) -> typing.Optional[int]:
+        return self.__render_workers
+
     def __parse_arguments(self, *argv):
         parser = argparse.ArgumentParser(
             prog=application_details.APPLICATION_NAME,
@@ -59,9 +93,63 @@ class ApplicationArguments:
             help="Include the calling application within PS results"
         )
 
+        parser.add_argument(
+            "--collector",
+            dest="collector",
+            default=application_details.DEFAULT_COLLECTOR,
+            choices=[AUTOMATIC_COLLECTOR, *COLLECTORS],
+            help="The backend used to collect process data"
+        )
+
+        parser.add_argument(
+            "--fold",
+            dest="fold_mode",
+            default=application_details.DEFAULT_FOLD_MODE,
+            choices=[mode.value for mode in FoldMode],
+            help="How the usage of child processes should be folded into their parents"
+        )
+
+        parser.add_argument(
+            "--interval",
+            dest="sample_interval",
+            type=float,
+            default=application_details.SAMPLE_INTERVAL,
+            help="The number of seconds to wait between samples of process data"
+        )
+
+        parser.add_argument(
+            "--snapshots",
+            dest="snapshot_count",
+            type=int,
+            default=application_details.SNAPSHOT_COUNT,
+            help="The number of samples of process data to keep in memory"
+        )
+
+        parser.add_argument(
+            "--render-executor",
+            dest="render_executor",
+            default=application_details.RENDER_EXECUTOR,
+            choices=[kind.value for kind in ExecutorKind],
+            help="Where process trees are built and rendered"
+        )
+
+        parser.add_argument(
+            "--render-workers",
+            dest="render_workers",
+            type=int,
+            default=application_details.RENDER_WORKERS,
+            help="The number of workers used to build and render process trees"
+        )
+
         parameters = parser.parse_args(argv)
 
         self.__port = parameters.port
         self.__index_page = parameters.index_page
         self.__include_self = parameters.include_self
+        self.__collector = parameters.collector
+        self.__fold_mode = parameters.fold_mode
+        self.__sample_interval = parameters.sample_interval
+        self.__snapshot_count = parameters.snapshot_count
+        self.__render_executor = parameters.render_executor
+        self.__render_workers = parameters.render_workers
 
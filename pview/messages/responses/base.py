@@ -8,13 +8,13 @@ import typing
 
 from aiohttp import web
 
+from utilities.serialization import model_response
 from ..base import PViewMessage
 
 
 class PViewResponse(PViewMessage, abc.ABC):
     def create_web_response(self) -> web.Response:
-        data = self.model_dump()
-        return web.json_response(data=data)
+        return model_response(self)
 
 
 class InfoResponse(PViewResponse):
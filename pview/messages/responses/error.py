@@ -10,6 +10,7 @@ import typing
 import pydantic
 from aiohttp import web
 
+from utilities.serialization import model_response
 from . import PViewResponse
 
 
@@ -31,8 +32,7 @@ class ErrorResponse(PViewResponse):
     )
 
     def create_web_response(self) -> web.Response:
-        data = self.model_dump()
-        return web.json_response(data=data, status=self.code)
+        return model_response(self, status=self.code)
 
 
 class ProcessErrorResponse(ErrorResponse):
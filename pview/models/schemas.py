@@ -0,0 +1,57 @@
+"""
+Serializable forms of the process tree, used only when a node is handed to a caller
+
+Trees are built and aggregated with lightweight classes in `models.tree`. These models are only created on request
+so that validation is not paid for every process on every sample
+"""
+from __future__ import annotations
+
+import typing
+
+from pydantic import BaseModel
+from pydantic import Field
+
+
+class ProcessLeafModel(BaseModel):
+    """
+    A process, or a group of matching processes, at the end of a branch of the tree
+    """
+    process_id: typing.Union[int, typing.List[int]] = Field(description="The ID of each process in the leaf")
+    parent_process_id: int = Field(description="The ID of the process that started the processes")
+    cpu_percent: typing.Optional[float] = Field(default=None, description="The total percent of a CPU used")
+    memory_usage: typing.Optional[float] = Field(default=None, description="The total memory used in kilobytes")
+    memory_percent: typing.Optional[float] = Field(default=None, description="The total percent of memory used")
+    memory_amount: typing.Optional[str] = Field(default=None, description="A readable description of memory used")
+    state: str = Field(description="The state of the processes")
+    user: str = Field(description="The user running the processes")
+    command: str = Field(description="The command behind the processes")
+    arguments: typing.Optional[typing.Union[typing.List[str], str]] = Field(
+        default_factory=list,
+        description="The arguments passed to the command"
+    )
+    name: str = Field(description="The name of the executable")
+    instance_count: int = Field(default=1, description="The number of processes in the leaf")
+
+
+class ProcessNodeModel(BaseModel):
+    """
+    A directory along the path to executables, along with everything beneath it
+    """
+    node_id: str = Field(description="The path to the directory, which identifies the node")
+    name: str = Field(description="The name of the directory")
+    depth: int = Field(default=1, description="How far the node is from the root of the tree")
+    cpu_percent: float = Field(default=0.0, description="The total percent of a CPU used beneath the node")
+    memory_usage: float = Field(default=0.0, description="The total memory used beneath the node in kilobytes")
+    count: int = Field(default=0, description="The number of processes beneath the node")
+    children: typing.List[typing.Union[ProcessNodeModel, ProcessLeafModel]] = Field(default_factory=list)
+
+
+class ProcessTreeModel(BaseModel):
+    """
+    Every process on the host arranged by the path to its executable
+    """
+    depth: int = Field(default=1, description="The depth of the root of the tree")
+    cpu_percent: float = Field(default=0.0, description="The percent of every CPU used by every process")
+    memory_usage: float = Field(default=0.0, description="The total memory used by every process in kilobytes")
+    count: int = Field(default=0, description="The number of processes in the tree")
+    children: typing.List[typing.Union[ProcessNodeModel, ProcessLeafModel]] = Field(default_factory=list)
@@ -8,25 +8,232 @@ import json
 import typing
 from collections import defaultdict
 
+import numpy
 import pandas
 
-from pydantic import BaseModel
-from pydantic import Field
-
-from plotly import express
-from plotly import graph_objects
-from pydantic import PrivateAttr
-
+try:
+    from plotly import express
+    from plotly import graph_objects
+except ImportError:
+    # plotly is only needed to draw figures on the server - data for the client is formed without it
+    express = None
+    graph_objects = None
+
+from models.schemas import ProcessLeafModel
+from models.schemas import ProcessNodeModel
+from models.schemas import ProcessTreeModel
+from utilities.collectors import Collector
 from utilities.ps import ProcessStatus
 from utilities.ps import ProcessEntry
 from utilities.ps import SizeUnit
+from utilities.ps import SnapshotDiff
 from utilities.ps import describe_memory
+from utilities.ps import describe_memory_values
 
 SEPARATOR = "/"
 """The separator used to join collapsed path names"""
 
-VALUE_SEQUENCE = typing.Union[typing.List[str], typing.List[typing.Optional[int]], typing.List[typing.Optional[float]]]
-"""A list of all strings, a list of all integers, or a list of all floats"""
+SUNBURST_METRICS: typing.Final[typing.Sequence[str]] = ("memory_usage", "cpu_percent", "memory_percent", "count")
+"""Every attribute that segments of a sunburst may be sized by"""
+
+COLUMN_CHUNK_SIZE: typing.Final[int] = 1024
+"""The number of rows room is made for at a time when a column of sunburst data runs out of space"""
+
+SCALAR_TYPES: typing.Final[typing.Tuple[type, ...]] = (str, float, int, type(None))
+"""The types of values that may be stored in a column of sunburst data"""
+
+NUMERIC_TYPES: typing.Final[typing.Tuple[type, ...]] = (float, int, numpy.number, type(None))
+"""The types of values that may be stored in a numeric column of sunburst data"""
+
+
+def get_metric_value(source: typing.Any, metric: str) -> typing.Union[int, float, None]:
+    """
+    Read a metric from a leaf, node, or tree
+
+    :param source: The object to read from
+    :param metric: The name of the attribute holding the metric
+    :return: The value of the metric
+    """
+    value = getattr(source, metric)
+
+    # The tree counts its processes through a method rather than a property
+    return value() if callable(value) else value
+
+
+def get_extra_metrics(value_attribute: typing.Optional[str], metrics: typing.Optional[typing.Sequence[str]]) -> typing.Tuple[str, ...]:
+    """
+    The metrics to record alongside the value of each segment, leaving out the one that already is the value
+
+    :param value_attribute: The attribute used as the value of each segment
+    :param metrics: Every metric that was asked for
+    :return: The metrics that need their own columns
+    """
+    value_attribute = value_attribute or "memory_usage"
+    return tuple(metric for metric in metrics or () if metric != value_attribute)
+
+
+def require_plotly(purpose: str):
+    """
+    Ensure that plotly may be used
+
+    :param purpose: What plotly is needed for
+    """
+    if graph_objects is None:
+        raise ImportError(f"plotly must be installed in order to {purpose}")
+
+
+def get_figure_layout() -> typing.Dict[str, typing.Any]:
+    """
+    The layout sent along with every sunburst figure
+
+    The layout is the same whether or not plotly is installed, so payloads don't depend on the host. plotly.js
+    applies its own default template on the client
+    """
+    return {"margin": dict(t=0, l=0, r=0, b=0)}
+
+
+def column_to_list(column: numpy.ndarray) -> typing.List[typing.Any]:
+    """
+    Convert a column of sunburst data into plain values that may be serialized, with `NaN` marking a missing value
+
+    Numeric columns that only hold whole numbers are converted into integers so they serialize just as compactly
+    as they did before they were stored as floats
+
+    :param column: The column, or part of a column, to convert
+    :return: The plain value of each row
+    """
+    if column.dtype.kind != "f":
+        return column.tolist()
+
+    missing = numpy.isnan(column)
+    has_missing = bool(missing.any())
+    present = column[~missing] if has_missing else column
+
+    if numpy.array_equal(present, numpy.trunc(present)) and numpy.all(numpy.abs(present) < 2 ** 53):
+        values = numpy.where(missing, 0, column).astype(numpy.int64).tolist()
+    else:
+        values = column.tolist()
+
+    if has_missing:
+        values = [None if is_missing else value for value, is_missing in zip(values, missing.tolist())]
+
+    return values
+
+
+class ColumnBuffer:
+    """
+    A single column of sunburst data that makes room for rows a chunk at a time rather than a row at a time
+    """
+    def __init__(self, dtype: typing.Union[numpy.dtype, type], capacity: int = COLUMN_CHUNK_SIZE):
+        self.__data = numpy.empty(capacity, dtype=dtype)
+        self.__length = 0
+
+    @property
+    def dtype(self) -> numpy.dtype:
+        return self.__data.dtype
+
+    @property
+    def capacity(self) -> int:
+        """
+        The number of rows the column may hold before it needs to grow
+        """
+        return len(self.__data)
+
+    def __reserve(self, row_count: int):
+        """
+        Make sure there is room for the given number of rows past the last one
+
+        The column at least doubles whenever it grows so that adding rows one at a time stays cheap
+        """
+        required = self.__length + row_count
+
+        if required <= len(self.__data):
+            return
+
+        capacity = max(required, len(self.__data) * 2)
+        capacity = -(-capacity // COLUMN_CHUNK_SIZE) * COLUMN_CHUNK_SIZE
+
+        data = numpy.empty(capacity, dtype=self.__data.dtype)
+        data[:self.__length] = self.__data[:self.__length]
+        self.__data = data
+
+    def append(self, value: typing.Union[str, int, float, None]):
+        self.__reserve(1)
+
+        if value is None and self.__data.dtype.kind == "f":
+            value = numpy.nan
+
+        self.__data[self.__length] = value
+        self.__length += 1
+
+    def extend(self, values: typing.Union[typing.Sequence[typing.Union[str, int, float, None]], numpy.ndarray]):
+        """
+        Add many rows at once
+
+        :param values: The value of each new row. `None` is stored as `NaN` in numeric columns
+        """
+        if self.__data.dtype.kind == "f":
+            # Lists and arrays of objects alike may hold `None`, which only becomes `NaN` through a conversion
+            values = numpy.asarray(values, dtype=self.__data.dtype)
+
+        if isinstance(values, numpy.ndarray) and values.ndim != 1:
+            raise ValueError(f"Values may only be added to a column in one dimension - received {values.ndim}")
+
+        row_count = len(values)
+
+        if row_count == 0:
+            return
+
+        self.__reserve(row_count)
+        self.__data[self.__length:self.__length + row_count] = values
+        self.__length += row_count
+
+    def view(self) -> numpy.ndarray:
+        """
+        The rows of the column without copying them. The view must not be modified and only reflects rows added
+        after it was taken if the column didn't need to grow
+        """
+        return self.__data[:self.__length]
+
+    def __len__(self) -> int:
+        return self.__length
+
+
+class SunburstColumns:
+    """
+    Every column of a set of sunburst data, each held within its own buffer
+    """
+    def __init__(self, keys: typing.Sequence[str], numeric_keys: typing.Collection[str]):
+        self.__columns: typing.Dict[str, ColumnBuffer] = {
+            key: ColumnBuffer(numpy.float64 if key in numeric_keys else object)
+            for key in keys
+        }
+
+    def keys(self) -> typing.KeysView[str]:
+        return self.__columns.keys()
+
+    def is_numeric(self, key: str) -> bool:
+        return self.__columns[key].dtype.kind == "f"
+
+    def append(self, values: typing.Mapping[str, typing.Union[str, int, float, None]]):
+        for key, column in self.__columns.items():
+            column.append(values[key])
+
+    def extend(self, values: typing.Mapping[str, typing.Union[typing.Sequence[typing.Any], numpy.ndarray]]):
+        for key, column in self.__columns.items():
+            column.extend(values[key])
+
+    def to_list(self, key: str) -> typing.List[typing.Any]:
+        return column_to_list(self[key])
+
+    def __getitem__(self, key: str) -> numpy.ndarray:
+        return self.__columns[key].view()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__columns
+
+    def __len__(self) -> int:
+        return min((len(column) for column in self.__columns.values()), default=0)
 
 
 class Sunburst:
@@ -56,43 +263,68 @@ class Sunburst:
         return "names"
 
     @property
-    def names(self) -> typing.Sequence[str]:
-        return [
-            name
-            for name in self.__sunburst_map[self.names_key()]
-        ]
+    def metrics(self) -> typing.Sequence[str]:
+        """
+        The attributes recorded for each segment alongside its value
+        """
+        return self.__metrics
+
+    def column_keys(self) -> typing.Tuple[str, ...]:
+        """
+        The key of every column held for each segment: the columns every sunburst needs followed by each metric
+        """
+        return self.sunburst_keys() + self.__metrics
+
+    def get_metric_values(self, source: typing.Any) -> typing.Dict[str, typing.Union[int, float]]:
+        """
+        Read the value of each metric from a leaf, node, or tree
+
+        :param source: The object a segment is drawn for
+        :return: The value of each metric keyed by name
+        """
+        return {
+            metric: get_metric_value(source, metric)
+            for metric in self.__metrics
+        }
 
     @property
-    def ids(self) -> typing.Sequence[typing.Union[str, int]]:
-        return [
-            id_value
-            for id_value in self.__sunburst_map[self.ids_key()]
-        ]
+    def names(self) -> numpy.ndarray:
+        """
+        The name of each segment of the main data, without copying anything
+        """
+        return self.__sunburst_map[self.names_key()]
 
     @property
-    def values(self) -> typing.Sequence[typing.Union[str, int, float]]:
-        return [
-            value
-            for value in self.__sunburst_map[self.values_key()]
-        ]
+    def ids(self) -> numpy.ndarray:
+        """
+        The ID of each segment of the main data, without copying anything
+        """
+        return self.__sunburst_map[self.ids_key()]
 
     @property
-    def parents(self) -> typing.Sequence[typing.Union[str, int]]:
-        return [
-            parent
-            for parent in self.__sunburst_map[self.parent_key()]
-        ]
+    def values(self) -> numpy.ndarray:
+        """
+        The value of each segment of the main data, without copying anything. Missing values are `NaN`
+        """
+        return self.__sunburst_map[self.values_key()]
+
+    @property
+    def parents(self) -> numpy.ndarray:
+        """
+        The ID of the parent of each segment of the main data, without copying anything
+        """
+        return self.__sunburst_map[self.parent_key()]
 
     def to_dict(self) -> typing.Dict[str, typing.Sequence[typing.Union[str, int, float]]]:
         return {
-            key: [value for value in values]
-            for key, values in self.__sunburst_map.items()
+            key: self.__sunburst_map.to_list(key)
+            for key in self.__sunburst_map.keys()
         }
 
     def to_json(self) -> str:
         return json.dumps(self.to_dict(), indent=4)
 
-    def __getitem__(self, key: str) -> typing.Sequence[str]:
+    def __getitem__(self, key: str) -> numpy.ndarray:
         if key not in self.__sunburst_map:
             raise ValueError(f"There are no values mapped to '{key}' within {self}")
 
@@ -100,25 +332,25 @@ class Sunburst:
 
     @property
     def has_traces(self) -> bool:
-        return any([
-            max([len(values) for values in items.values()]) > 0
-            for items in self.__traces.values()
-        ])
+        return bool(self.__references) or any(len(columns) > 0 for columns in self.__traces.values())
 
     def add_trace(self, name: str):
         if name not in self.__traces:
-            self.__traces[name] = {
-                key: []
-                for key in self.sunburst_keys()
-            }
+            self.__traces[name] = self.__create_columns()
+
+    def __create_columns(self) -> SunburstColumns:
+        return SunburstColumns(self.column_keys(), numeric_keys=(self.values_key(), *self.__metrics))
 
     def __init__(self, **kwargs):
+        self.__metrics: typing.Tuple[str, ...] = tuple(kwargs.get("metrics") or ())
+        """Attributes recorded for each segment alongside its value, so that clients may switch between them"""
 
-        self.__traces: typing.Dict[str, typing.MutableMapping[str, VALUE_SEQUENCE]] = {}
-        self.__sunburst_map: typing.MutableMapping[str, VALUE_SEQUENCE] = {
-            key: []
-            for key in self.sunburst_keys()
-        }
+        self.__traces: typing.Dict[str, SunburstColumns] = {}
+        self.__sunburst_map: SunburstColumns = self.__create_columns()
+        self.__expandable: typing.Dict[typing.Optional[str], typing.List[typing.Union[str, int]]] = defaultdict(list)
+        """The IDs of segments whose children were left out, keyed by the name of their trace"""
+        self.__references: typing.Dict[str, typing.List[typing.Union[str, int]]] = {}
+        """The IDs of the segments each trace starts from, keyed by the name of the trace, in the order they were added"""
 
         self.color = kwargs.get("color")
         self.color_continuous_scale = kwargs.get("color_continuous_scale")
@@ -137,6 +369,7 @@ class Sunburst:
 
     def copy(self) -> Sunburst:
         copied_sunburst = Sunburst(
+            metrics=self.metrics,
             color=self.color,
             color_continuous_scale=self.color_continuous_scale,
             color_continuous_midpoint=self.color_continuous_midpoint,
@@ -157,88 +390,356 @@ class Sunburst:
         return copied_sunburst
 
     def to_dataframe(self) -> pandas.DataFrame:
-        return pandas.DataFrame(self.__sunburst_map)
+        return pandas.DataFrame({
+            key: self.__sunburst_map[key]
+            for key in self.__sunburst_map.keys()
+        })
 
     def insert_trace(self, name: str, data: Sunburst) -> Sunburst:
         if data.has_traces:
             raise ValueError(f"Cannot add sunburst data to another sunburst if it has traces.")
 
         self.add_trace(name)
-
-        for key in self.sunburst_keys():
-            self.__traces[name][key].extend(data[key])
+        self.__traces[name].extend({key: data[key] for key in self.column_keys()})
 
         return self
 
+    def __get_target_columns(self, trace_name: typing.Optional[str]) -> SunburstColumns:
+        if isinstance(trace_name, str):
+            self.add_trace(name=trace_name)
+            return self.__traces[trace_name]
+
+        return self.__sunburst_map
+
     def add(self, values: typing.Mapping[str, typing.Union[str, float, int]], trace_name: str = None):
-        for key in self.sunburst_keys():
+        columns = self.__get_target_columns(trace_name)
+
+        for key in self.column_keys():
             if key not in values:
                 raise ValueError(f"Cannot add values to a sunburst - it is missing a value for the '{key}' key")
 
-            if values[key] is not None and not isinstance(values[key], (str, float, int)):
+            allowed_types = NUMERIC_TYPES if columns.is_numeric(key) else SCALAR_TYPES
+
+            if not isinstance(values[key], allowed_types):
                 raise TypeError(
                     f"The value for the '{key}' key ({values[key]}: {type(values[key])}) cannot be added as a "
-                    f"sunburst value - it must be either an int, float, or string"
+                    f"sunburst value - it must be {'a number' if columns.is_numeric(key) else 'an int, float, or string'}"
                 )
 
-        if isinstance(trace_name, str):
-            self.add_trace(name=trace_name)
-            for key in self.sunburst_keys():
-                self.__traces[trace_name][key].append(
-                    values[key]
+        columns.append(values)
+
+    def extend(
+        self,
+        values: typing.Mapping[str, typing.Union[typing.Sequence[typing.Union[str, float, int, None]], numpy.ndarray]],
+        trace_name: str = None
+    ):
+        """
+        Add many segments at once, checking the whole batch in one pass rather than one segment at a time
+
+        :param values: The value of each new segment for every column, keyed by column
+        :param trace_name: The name of the trace to add to. The main data is added to if not given
+        """
+        columns = self.__get_target_columns(trace_name)
+        row_counts = set()
+
+        for key in self.column_keys():
+            if key not in values:
+                raise ValueError(f"Cannot add values to a sunburst - it is missing values for the '{key}' key")
+
+            row_counts.add(len(values[key]))
+            column_values = values[key]
+            numeric_column = columns.is_numeric(key)
+
+            if isinstance(column_values, numpy.ndarray) and column_values.ndim != 1:
+                raise ValueError(
+                    f"Cannot add values to a sunburst - the values for the '{key}' key must have a single dimension"
                 )
-        else:
-            for key in self.sunburst_keys():
-                self.__sunburst_map[key].append(
-                    values[key]
+
+            if isinstance(column_values, numpy.ndarray) and column_values.dtype.kind != "O":
+                # Arrays of plain numbers or strings are checked by their type alone
+                allowed_kinds = "biuf" if numeric_column else "biufU"
+                invalid_types = {column_values.dtype} if column_values.dtype.kind not in allowed_kinds else set()
+            else:
+                # Lists and arrays of objects may hold anything, so each value is checked
+                allowed_types = NUMERIC_TYPES if numeric_column else SCALAR_TYPES
+                invalid_types = {
+                    value_type
+                    for value_type in set(map(type, column_values))
+                    if not issubclass(value_type, allowed_types)
+                }
+
+            if invalid_types:
+                raise TypeError(
+                    f"The values for the '{key}' key cannot be added as sunburst values - "
+                    f"{', '.join(str(invalid_type) for invalid_type in invalid_types)} values are not allowed"
                 )
 
+        if len(row_counts) > 1:
+            raise ValueError(f"Cannot add values to a sunburst - every key needs the same number of values")
+
+        columns.extend(values)
+
+    def reference_trace(self, name: str, root_id: typing.Union[str, int]):
+        """
+        Add a segment of the main data, along with everything beneath it, to a trace without copying anything
+
+        Traces may start from more than one segment
+
+        :param name: The name of the trace
+        :param root_id: The ID of the segment the trace starts from
+        """
+        self.__references.setdefault(name, []).append(root_id)
+
+    def get_trace_roots(self, name: str) -> typing.Sequence[typing.Union[str, int]]:
+        """
+        The IDs of the segments of the main data that a trace starts from
+
+        :param name: The name of the trace
+        """
+        return list(self.__references.get(name, []))
+
+    def __get_row_positions(self) -> typing.Dict[typing.Union[str, int], int]:
+        # IDs may repeat, in which case the first row with the ID is the one its children are drawn beneath
+        row_by_id: typing.Dict[typing.Union[str, int], int] = {}
+
+        for row, row_id in enumerate(self.__sunburst_map.to_list(self.ids_key())):
+            row_by_id.setdefault(row_id, row)
+
+        return row_by_id
+
+    def __select_rows(
+        self,
+        root_ids: typing.Sequence[typing.Union[str, int]],
+        row_by_id: typing.Mapping[typing.Union[str, int], int]
+    ) -> typing.List[int]:
+        """
+        Find the rows of the main data that lie at or beneath the given segments
+
+        :param root_ids: The IDs of the segments to start from
+        :param row_by_id: The first row of each ID
+        :return: The position of each row, in order
+        """
+        roots = set(root_ids)
+        selected: typing.List[bool] = []
+
+        # Parents come before their children, so whether a row's parent was selected is already known
+        for row, (row_id, parent) in enumerate(
+            zip(self.__sunburst_map.to_list(self.ids_key()), self.__sunburst_map.to_list(self.parent_key()))
+        ):
+            parent_row = row_by_id.get(parent)
+            selected.append(
+                row_id in roots or (parent_row is not None and parent_row < row and selected[parent_row])
+            )
+
+        return [row for row, is_selected in enumerate(selected) if is_selected]
+
+    def __get_trace_columns(self) -> typing.List[typing.Tuple[str, typing.Mapping[str, numpy.ndarray]]]:
+        """
+        The name and columns of every trace after the main one, with referenced traces sliced out of the main data
+        """
+        traces = list(self.__traces.items())
+
+        if self.__references:
+            row_by_id = self.__get_row_positions()
+
+            for trace_name, root_ids in self.__references.items():
+                rows = numpy.array(self.__select_rows(root_ids, row_by_id), dtype=numpy.intp)
+                traces.append((
+                    trace_name,
+                    {
+                        key: self.__sunburst_map[key][rows]
+                        for key in self.sunburst_keys()
+                    }
+                ))
+
+        return traces
+
+    def mark_expandable(self, segment_id: typing.Union[str, int], trace_name: str = None):
+        """
+        Record that a segment has children that were left out and may be requested later
+
+        :param segment_id: The ID of the segment
+        :param trace_name: The name of the trace the segment is in. The main data is used if not given
+        """
+        self.__expandable[trace_name if isinstance(trace_name, str) else None].append(segment_id)
+
+    def get_expandable(self, trace_name: str = None) -> typing.Sequence[typing.Union[str, int]]:
+        """
+        The IDs of segments in a trace whose children were left out
+
+        :param trace_name: The name of the trace. The main data is used if not given
+        """
+        return list(self.__expandable.get(trace_name if isinstance(trace_name, str) else None, []))
+
     def to_figure(self, **kwargs) -> graph_objects.Figure:
+        require_plotly("build a figure")
         figure = graph_objects.Figure()
 
         figure.update_layout(
             margin=dict(t=0, l=0, r=0, b=0)
         )
 
-        position_index = 0
-
-        trace = graph_objects.Sunburst(
-            labels=self.names,
-            ids=self.ids,
-            parents=self.parents,
-            values=self.values,
-            hovertemplate='%{label}<br>%{text}',
-            name="All",
-            text=[
-                describe_memory(value, SizeUnit.KB)
-                for value in self.values
-            ],
-            maxdepth=3,
-            **kwargs
+        figure.add_trace(
+            trace=graph_objects.Sunburst(
+                labels=column_to_list(self.names),
+                ids=column_to_list(self.ids),
+                parents=column_to_list(self.parents),
+                values=column_to_list(self.values),
+                hovertemplate='%{label}<br>%{text}',
+                name="All",
+                text=describe_memory_values(self.values, SizeUnit.KB),
+                maxdepth=3,
+                **kwargs
+            )
         )
 
-        figure.add_trace(trace=trace)
+        for trace_name, columns in self.__get_trace_columns():
+            figure.add_trace(
+                trace=graph_objects.Sunburst(
+                    labels=column_to_list(columns[self.names_key()]),
+                    ids=column_to_list(columns[self.ids_key()]),
+                    parents=column_to_list(columns[self.parent_key()]),
+                    values=column_to_list(columns[self.values_key()]),
+                    hovertemplate='%{label}<br>%{text}',
+                    name=trace_name,
+                    text=describe_memory_values(columns[self.values_key()], SizeUnit.KB),
+                    **kwargs
+                )
+            )
 
-        position_index += 1
+        return figure
 
-        for trace_name, trace in self.__traces.items():
-            trace = graph_objects.Sunburst(
-                labels=trace[self.names_key()],
-                ids=trace[self.ids_key()],
-                parents=trace[self.parent_key()],
-                values=trace[self.values_key()],
-                hovertemplate='%{label}<br>%{text}',
-                name=trace_name,
-                text=[
-                    describe_memory(value, SizeUnit.KB)
-                    for value in trace[self.values_key()]
-                ],
-                **kwargs
+    def to_figure_dict(self, **kwargs) -> typing.Dict[str, typing.Any]:
+        """
+        Form the same data as `to_figure().to_dict()` straight from the columns
+
+        plotly validates every element of every array when a figure is built, which costs far more than forming
+        the data itself. Nothing here is validated, so any extra trace attributes must already be valid
+
+        :param kwargs: Extra attributes for every trace
+        :return: Every trace along with the layout of the figure
+        """
+        traces = [self.__trace_dict("All", self.__sunburst_map, maxdepth=3, **kwargs)]
+
+        for trace_name, trace in self.__get_trace_columns():
+            traces.append(self.__trace_dict(trace_name, trace, **kwargs))
+
+        return {
+            "data": traces,
+            "layout": get_figure_layout(),
+        }
+
+    @classmethod
+    def __trace_dict(
+        cls,
+        name: str,
+        columns: typing.Mapping[str, numpy.ndarray],
+        **kwargs
+    ) -> typing.Dict[str, typing.Any]:
+        trace = {
+            "hovertemplate": '%{label}<br>%{text}',
+            "ids": column_to_list(columns[cls.ids_key()]),
+            "labels": column_to_list(columns[cls.names_key()]),
+            "name": name,
+            "parents": column_to_list(columns[cls.parent_key()]),
+            "text": describe_memory_values(columns[cls.values_key()], SizeUnit.KB),
+            "values": column_to_list(columns[cls.values_key()]),
+        }
+
+        # plotly leaves out attributes that weren't set and lists the rest in order, with the type last
+        trace.update((key, value) for key, value in kwargs.items() if value is not None)
+        trace = {key: trace[key] for key in sorted(trace)}
+        trace["type"] = "sunburst"
+        return trace
+
+    def to_compact(self) -> typing.Dict[str, typing.Any]:
+        """
+        Encode the main data once, so that each label is sent once and parents are referred to by position, along
+        with where each trace starts within it
+
+        `segments` holds:
+
+        - `labels`: every distinct label, once
+        - `label_indices`: the position of each row's label within `labels`
+        - `parents`: the position of each row's parent, or -1 for rows at the top
+        - `ids`: each row's ID, or `None` when the ID is just the parent's ID and the label joined by the
+          separator (or only the label at the top), as it is for every directory
+        - `values`: each row's value
+        - `expandable`: the positions of rows whose children were left out and may be requested later
+        - `metrics`: each row's value for every metric, keyed by metric, if any metrics were recorded
+
+        Each of the `traces` holds its `name` and either the position of every row it starts from within `roots`
+        or, for the main trace, `null`, meaning every row. A trace holds its roots and everything beneath them
+
+        :return: The segments shared by every trace along with each trace
+        """
+        if self.__traces:
+            raise ValueError(
+                f"Cannot encode sunburst data with copied traces - traces must refer to the main data instead"
             )
-            figure.add_trace(trace=trace)
-            position_index += 1
 
-        return figure
+        segments = self.__compact_columns(self.__sunburst_map, self.get_expandable())
+        row_by_id = self.__get_row_positions()
+
+        if self.__metrics:
+            segments["metrics"] = {
+                metric: self.__sunburst_map.to_list(metric)
+                for metric in self.__metrics
+            }
+
+        traces = [{"name": "All", "roots": None, "maxdepth": 3}]
+        traces.extend(
+            {
+                "name": trace_name,
+                "roots": [row_by_id[root_id] for root_id in root_ids if root_id in row_by_id],
+            }
+            for trace_name, root_ids in self.__references.items()
+        )
+
+        return {
+            "segments": segments,
+            "traces": traces,
+        }
+
+    @classmethod
+    def __compact_columns(
+        cls,
+        columns: typing.Mapping[str, numpy.ndarray],
+        expandable: typing.Sequence[typing.Union[str, int]]
+    ) -> typing.Dict[str, typing.Any]:
+        ids = column_to_list(columns[cls.ids_key()])
+        names = column_to_list(columns[cls.names_key()])
+        parents = column_to_list(columns[cls.parent_key()])
+
+        # IDs may repeat, in which case the first row with the ID is the one its children are drawn beneath
+        row_by_id: typing.Dict[typing.Union[str, int], int] = {}
+
+        for row, row_id in enumerate(ids):
+            row_by_id.setdefault(row_id, row)
+
+        label_codes: typing.Dict[str, int] = {}
+        label_indices: typing.List[int] = []
+        parent_rows: typing.List[int] = []
+        compact_ids: typing.List[typing.Union[str, int, None]] = []
+
+        for row_id, label, parent in zip(ids, names, parents):
+            label_indices.append(label_codes.setdefault(label, len(label_codes)))
+
+            parent_row = -1 if parent == "" or parent is None else row_by_id.get(parent, -1)
+            parent_rows.append(parent_row)
+
+            # The client rebuilds IDs the same way, so only IDs that can't be rebuilt are sent
+            derived_id = label if parent_row < 0 else f"{parent}{SEPARATOR}{label}"
+            compact_ids.append(None if row_id == derived_id else row_id)
+
+        return {
+            "labels": list(label_codes),
+            "label_indices": label_indices,
+            "parents": parent_rows,
+            "ids": compact_ids,
+            "values": column_to_list(columns[cls.values_key()]),
+            "expandable": [row_by_id[segment_id] for segment_id in expandable if segment_id in row_by_id],
+        }
 
     def plot(self, div_id: str = None, figure_kwargs: typing.Dict[str, typing.Any] = None, **kwargs) -> str:
         if figure_kwargs is None:
@@ -259,22 +760,27 @@ class Sunburst:
         )
 
     def to_entries(self):
+        keys = self.column_keys()
         return (
-            {
-                key: self.__sunburst_map[key][data_index]
-                for key in self.sunburst_keys()
-            }
-            for data_index in range(len(self))
+            dict(zip(keys, row))
+            for row in zip(*(self.__sunburst_map.to_list(key) for key in keys))
         )
 
     def combine(self, other: Sunburst) -> Sunburst:
-        for key in self.sunburst_keys():
-            self.__sunburst_map[key].extend(other[key])
+        if tuple(other.metrics) != tuple(self.metrics):
+            raise ValueError(f"Cannot combine sunburst data that records different metrics")
+
+        self.__sunburst_map.extend({key: other[key] for key in self.column_keys()})
 
         for trace_name, trace in other.__traces.items():
             self.add_trace(name=trace_name)
-            for key in self.sunburst_keys():
-                self.__traces[trace_name][key].extend(trace[key])
+            self.__traces[trace_name].extend({key: trace[key] for key in self.column_keys()})
+
+        for trace_name, segment_ids in other.__expandable.items():
+            self.__expandable[trace_name].extend(segment_ids)
+
+        for trace_name, root_ids in other.__references.items():
+            self.__references.setdefault(trace_name, []).extend(root_ids)
 
         return self
 
@@ -299,38 +805,168 @@ class Sunburst:
             return first.copy().combine(other=second.copy())
 
     def __len__(self):
-        return len(self.__sunburst_map[self.sunburst_keys()[0]])
-
-
-class ProcessLeaf(BaseModel):
-    process_id: typing.Union[int, typing.MutableSequence[int]]
-    parent_process_id: int
-    cpu_percent: typing.Optional[float] = Field(default=None)
-    memory_usage: typing.Optional[float] = Field(default=None)
-    memory_percent: typing.Optional[float] = Field(default=None)
-    memory_amount: typing.Optional[str] = Field(default=None)
-    state: str
-    user: str
-    command: str
-    arguments: typing.Optional[typing.Union[typing.List[str], str]] = Field(default_factory=list)
-    name: str
-    instance_count: int = Field(default=1)
-    _parent: typing.Optional[typing.Union[ProcessNode, ProcessTree]] = PrivateAttr(default=None)
+        return len(self.__sunburst_map)
+
+
+LEAF_KEY = typing.Tuple[int, str, typing.Hashable]
+"""The parent process ID, command, and arguments shared by every process within a leaf"""
+
+
+def get_leaf_key(
+    parent_process_id: int,
+    command: str,
+    arguments: typing.Optional[typing.Union[typing.Sequence[str], str]]
+) -> LEAF_KEY:
+    """
+    Form the key used to find the leaf that matching processes are grouped into
+
+    :param parent_process_id: The ID of the process that started the process
+    :param command: The command behind the process
+    :param arguments: The arguments passed to the command
+    :return: A hashable key for the leaf
+    """
+    if isinstance(arguments, list):
+        arguments = tuple(arguments)
+
+    return parent_process_id, command, arguments
+
+
+class ProcessLeaf:
+    """
+    A process, or a group of matching processes started by the same parent, at the end of a branch of the tree
+
+    Leaves are built for every process on every sample, so they are slotted and unvalidated.
+    Call `to_model` for a validated, serializable copy
+    """
+    __slots__ = (
+        "process_id",
+        "parent_process_id",
+        "cpu_percent",
+        "memory_usage",
+        "memory_percent",
+        "state",
+        "user",
+        "command",
+        "arguments",
+        "name",
+        "instance_count",
+        "_parent",
+    )
+
+    def __init__(
+        self,
+        process_id: typing.Union[int, typing.MutableSequence[int]],
+        parent_process_id: int,
+        state: str,
+        user: str,
+        command: str,
+        name: str,
+        cpu_percent: typing.Optional[float] = None,
+        memory_usage: typing.Optional[float] = None,
+        memory_percent: typing.Optional[float] = None,
+        arguments: typing.Optional[typing.Union[typing.List[str], str]] = None,
+        instance_count: int = 1
+    ):
+        self.process_id = process_id
+        self.parent_process_id = parent_process_id
+        self.cpu_percent = cpu_percent
+        self.memory_usage = memory_usage
+        self.memory_percent = memory_percent
+        self.state = state
+        self.user = user
+        self.command = command
+        self.arguments = arguments if arguments is not None else []
+        self.name = name
+        self.instance_count = instance_count
+        self._parent: typing.Optional[typing.Union[ProcessNode, ProcessTree]] = None
+
+    @staticmethod
+    def __describe_entry(entry: ProcessEntry) -> typing.Dict[str, typing.Any]:
+        """
+        Get the values a leaf holds when it only contains the given process
+        """
+        return {
+            "process_id": entry.process_id,
+            "parent_process_id": entry.parent_process_id,
+            "cpu_percent": entry.current_cpu_percent,
+            "memory_usage": entry.memory_usage,
+            "memory_percent": entry.memory_percent,
+            "state": entry.status,
+            "user": entry.user,
+            "command": entry.executable or entry.name,
+            "arguments": entry.arguments if entry.arguments is not None else [],
+            "name": entry.executable_parts[-1],
+        }
 
     @classmethod
     def from_entry(cls, entry: ProcessEntry) -> ProcessLeaf:
-        return ProcessLeaf(
-            process_id=entry.process_id,
-            parent_process_id=entry.parent_process_id,
-            cpu_percent=entry.current_cpu_percent,
-            memory_usage=entry.memory_usage,
-            memory_percent=entry.memory_percent,
-            memory_amount=entry.memory_amount,
-            state=entry.status,
-            user=entry.user,
-            command=entry.executable or entry.name,
-            arguments=entry.arguments,
-            name=entry.executable_parts[-1]
+        return ProcessLeaf(**cls.__describe_entry(entry))
+
+    @property
+    def process_ids(self) -> typing.Sequence[int]:
+        """
+        The ID of every process in the leaf, in the order they were added
+        """
+        return (self.process_id,) if isinstance(self.process_id, int) else tuple(self.process_id)
+
+    def reset(self, entries: typing.Sequence[ProcessEntry]):
+        """
+        Replace every process in the leaf, leaving it as if it had been built from the given processes
+
+        :param entries: The processes that now make up the leaf, in the order they should be added
+        """
+        if not entries:
+            raise ValueError("A leaf must hold at least one process")
+
+        for attribute, value in self.__describe_entry(entries[0]).items():
+            setattr(self, attribute, value)
+
+        self.instance_count = 1
+
+        for entry in entries[1:]:
+            self.add_instance(entry)
+
+        if self._parent is not None:
+            self._parent.invalidate_aggregates()
+
+    @property
+    def segment_id(self) -> typing.Union[str, int, float]:
+        """
+        The ID the leaf is drawn with. A leaf holding several processes is drawn once, under its first process
+        """
+        return self.process_id if isinstance(self.process_id, (str, int, float)) else self.process_id[0]
+
+    @property
+    def key(self) -> LEAF_KEY:
+        """
+        The key that matching processes are grouped by
+        """
+        return get_leaf_key(self.parent_process_id, self.command, self.arguments)
+
+    @property
+    def memory_amount(self) -> typing.Optional[str]:
+        """
+        A readable description of the memory used by every process in the leaf
+        """
+        return describe_memory(self.memory_usage, SizeUnit.KB) if self.memory_usage is not None else None
+
+    def to_model(self) -> ProcessLeafModel:
+        """
+        Create a validated, serializable copy of the leaf
+        """
+        return ProcessLeafModel(
+            process_id=self.process_id if isinstance(self.process_id, int) else list(self.process_id),
+            parent_process_id=self.parent_process_id,
+            cpu_percent=self.cpu_percent,
+            memory_usage=self.memory_usage,
+            memory_percent=self.memory_percent,
+            memory_amount=self.memory_amount,
+            state=self.state,
+            user=self.user,
+            command=self.command,
+            arguments=self.arguments,
+            name=self.name,
+            instance_count=self.instance_count
         )
 
     def add_instance(self, entry: ProcessEntry):
@@ -359,6 +995,9 @@ class ProcessLeaf(BaseModel):
 
         self.instance_count += 1
 
+        if self._parent is not None:
+            self._parent.invalidate_aggregates()
+
     @property
     def parent(self) -> typing.Optional[typing.Union[ProcessNode, ProcessTree]]:
         return self._parent
@@ -374,87 +1013,577 @@ class ProcessLeaf(BaseModel):
     def count(self) -> int:
         return self.instance_count
 
-    def __len__(self):
-        return self.count
+    def __len__(self):
+        return self.count
+
+    def duplicate(self, parent: typing.Union[ProcessNode, ProcessTree] = None) -> ProcessLeaf:
+        """
+        Make a deep copy of the process metadata separated from its current parent node
+
+        :param parent: A parent node that will contain the new process data
+        :return: The copied leaf
+        """
+        new_leaf = ProcessLeaf(
+            process_id=self.process_id if isinstance(self.process_id, int) else list(self.process_id),
+            parent_process_id=self.parent_process_id,
+            cpu_percent=self.cpu_percent,
+            memory_usage=self.memory_usage,
+            memory_percent=self.memory_percent,
+            state=self.state,
+            user=self.user,
+            command=self.command,
+            arguments=self.arguments,
+            name=self.name,
+            instance_count=self.instance_count
+        )
+
+        if isinstance(parent, (ProcessNode, ProcessTree)):
+            new_leaf.parent = parent
+
+        return new_leaf
+
+    def get_sunburst_data(self, value_attribute: str = None) -> typing.Sequence[typing.Dict[str, typing.Union[float, str, int]]]:
+        if not value_attribute:
+            value_attribute = "memory_usage"
+
+        if not hasattr(self, value_attribute):
+            raise ValueError(f"'{value_attribute}' is not a value for a process")
+
+        return [{
+            Sunburst.parent_key(): self._parent.node_id if self._parent is not None else "",
+            Sunburst.values_key(): getattr(self, value_attribute),
+            Sunburst.ids_key(): self.segment_id,
+            Sunburst.names_key(): self.name
+        }]
+
+    def add_sunburst_data(self, sunburst: Sunburst, value_attribute: str = None, trace_name: str = None) -> Sunburst:
+        if value_attribute and not hasattr(self, value_attribute):
+            raise ValueError(f"'{value_attribute}' is not a value for a process")
+
+        return add_leaf_segments(
+            sunburst=sunburst,
+            leaves=[self],
+            value_attribute=value_attribute,
+            trace_name=trace_name
+        )
+
+    @property
+    def top(self) -> typing.Optional[ProcessNode, ProcessTree]:
+        if self._parent is None:
+            return None
+        return self._parent.top
+
+    def __str__(self):
+        return f"{self.command} {' '.join(self.arguments)}"
+
+
+class Aggregates(typing.NamedTuple):
+    """
+    Totals for every process beneath a node or the tree
+    """
+    count: int
+    cpu_percent: float
+    memory_usage: float
+    memory_percent: float
+
+
+class ProcessBranch:
+    """
+    Holds the children of a node or of the tree
+
+    Child nodes are indexed by name and leaves by their key so that adding an entry never has to scan siblings.
+    Children must be added through `add_child`, or `reindex` must be called after `children` is changed directly.
+
+    Totals for everything beneath the branch are computed once and kept until something beneath it changes
+    """
+    __slots__ = ("children", "_nodes_by_name", "_leaves_by_key", "_aggregates", "_parent")
+
+    def __init__(self, children: typing.Iterable[typing.Union[ProcessNode, ProcessLeaf]] = None):
+        self.children: typing.List[typing.Union[ProcessNode, ProcessLeaf]] = []
+        self._nodes_by_name: typing.Dict[str, ProcessNode] = {}
+        self._leaves_by_key: typing.Dict[LEAF_KEY, ProcessLeaf] = {}
+        self._aggregates: typing.Optional[Aggregates] = None
+        self._parent: typing.Optional[ProcessBranch] = None
+
+        for child in children or ():
+            self.add_child(child)
+
+    def add_child(self, child: typing.Union[ProcessNode, ProcessLeaf]):
+        """
+        Attach a node or leaf to this branch
+
+        :param child: The node or leaf to attach
+        """
+        child.parent = self
+        self.children.append(child)
+        self.__index(child)
+        self.invalidate_aggregates()
+
+    def remove_child(self, child: typing.Union[ProcessNode, ProcessLeaf]):
+        """
+        Detach a node or leaf from this branch
+
+        :param child: The node or leaf to detach
+        """
+        self.children.remove(child)
+
+        # Only the removed child's entry is dropped rather than rebuilding the indexes, since processes are removed
+        # one at a time when a tree is updated. Siblings only share a key when they can never be matched by it
+        if isinstance(child, ProcessLeaf):
+            if self._leaves_by_key.get(child.key) is child:
+                del self._leaves_by_key[child.key]
+        elif self._nodes_by_name.get(child.name) is child:
+            del self._nodes_by_name[child.name]
+
+        self.invalidate_aggregates()
+
+    def reindex(self):
+        """
+        Rebuild the indexes after `children` or the names of children were changed directly
+        """
+        self._nodes_by_name.clear()
+        self._leaves_by_key.clear()
+
+        for child in self.children:
+            self.__index(child)
+
+        self.invalidate_aggregates()
+
+    def invalidate_aggregates(self):
+        """
+        Mark the totals of this branch and every branch above it as out of date
+        """
+        branch = self
+
+        # A branch's totals are only ever computed after those of its children, so once a branch without totals
+        # is reached, every branch above it is already without totals
+        while branch is not None and branch._aggregates is not None:
+            branch._aggregates = None
+            branch = branch._parent
+
+    @property
+    def aggregates(self) -> Aggregates:
+        """
+        Totals for every process beneath this branch
+        """
+        if self._aggregates is None:
+            self.__compute_aggregates()
+        return self._aggregates
+
+    def __compute_aggregates(self):
+        """
+        Compute the totals of every out of date branch beneath this one in a single post-order pass
+        """
+        for branch in self.walk_postorder(where=lambda candidate: candidate._aggregates is None):
+            count = 0
+            cpu_percent = 0.0
+            memory_usage = 0.0
+            memory_percent = 0.0
+
+            for child in branch.children:
+                if isinstance(child, ProcessBranch):
+                    count += child._aggregates.count
+                    cpu_percent += child._aggregates.cpu_percent
+                    memory_usage += child._aggregates.memory_usage
+                    memory_percent += child._aggregates.memory_percent
+                    continue
+
+                count += child.instance_count
+
+                if isinstance(child.cpu_percent, (int, float)):
+                    cpu_percent += child.cpu_percent
+
+                if isinstance(child.memory_usage, (int, float)):
+                    memory_usage += child.memory_usage
+
+                if isinstance(child.memory_percent, (int, float)):
+                    memory_percent += child.memory_percent
+
+            branch._aggregates = Aggregates(
+                count=count,
+                cpu_percent=cpu_percent,
+                memory_usage=memory_usage,
+                memory_percent=memory_percent
+            )
+
+    def _copy_children(self, target: ProcessBranch):
+        """
+        Copy everything beneath this branch into another branch, one level at a time rather than recursively
+
+        :param target: The branch that receives the copies
+        """
+        pairs: typing.List[typing.Tuple[ProcessBranch, ProcessBranch]] = [(self, target)]
+
+        while pairs:
+            original, copy = pairs.pop()
+
+            for child in original.children:
+                if isinstance(child, ProcessLeaf):
+                    copy.add_child(child.duplicate(copy))
+                else:
+                    child_copy = ProcessNode(node_id=child.node_id, name=child.name, depth=child.depth)
+                    copy.add_child(child_copy)
+                    pairs.append((child, child_copy))
+
+    def _place_entry(self, entry: ProcessEntry) -> ProcessLeaf:
+        """
+        Find or create the leaf for a process beneath this branch, creating any directories along the way
+
+        The path is followed in a loop rather than recursively so that long executable paths are safe
+
+        :param entry: The process to place
+        :return: The leaf that now holds the process
+        """
+        branch = self
+        parts = entry.executable_parts
+
+        while True:
+            depth = branch.depth
+
+            if depth == len(parts) - 1 and parts[depth] == entry.name:
+                leaf = branch.get_matching_leaf(entry)
+
+                if leaf is None:
+                    leaf = ProcessLeaf.from_entry(entry)
+                    branch.add_child(leaf)
+                else:
+                    leaf.add_instance(entry=entry)
+
+                return leaf
+            elif depth >= len(parts):
+                leaf = ProcessLeaf.from_entry(entry)
+                branch.add_child(leaf)
+                return leaf
+
+            name = parts[depth]
+            matching_child_node = branch.get_child_node_by_name(name)
+
+            if matching_child_node is None:
+                new_node_id = name if isinstance(branch, ProcessTree) else f"{branch.node_id}{SEPARATOR}{name}"
+                matching_child_node = ProcessNode(node_id=new_node_id, name=name, depth=depth + 1)
+                branch.add_child(matching_child_node)
+
+            branch = matching_child_node
+
+    def walk_preorder(
+        self,
+        max_depth: int = None,
+        where: typing.Callable[[ProcessBranch], bool] = None
+    ) -> typing.Iterator[ProcessBranch]:
+        """
+        Visit this branch and the nodes beneath it, each before anything beneath it
+
+        Children are read after their parent is visited, so a visited branch may change its own children
 
-    def duplicate(self, parent: typing.Union[ProcessNode, ProcessTree] = None) -> ProcessLeaf:
+        :param max_depth: How many levels beneath this branch to visit. Every level is visited if not given
+        :param where: Only visit branches, and what is beneath them, that this returns True for
+        :return: A generator yielding each branch
         """
-        Make a deep copy of the process metadata separated from its current parent node
+        for branch, _ in self.__traverse(max_depth=max_depth, where=where, children_first=False):
+            yield branch
+
+    def walk_postorder(
+        self,
+        max_depth: int = None,
+        where: typing.Callable[[ProcessBranch], bool] = None
+    ) -> typing.Iterator[ProcessBranch]:
+        """
+        Visit this branch and the nodes beneath it, each after everything beneath it
 
-        :param parent: A parent node that will contain the new process data
-        :return: The copied leaf
+        :param max_depth: How many levels beneath this branch to visit. Every level is visited if not given
+        :param where: Only visit branches, and what is beneath them, that this returns True for
+        :return: A generator yielding each branch
         """
-        new_leaf = ProcessLeaf(
-            process_id=self.process_id,
-            parent_process_id=self.parent_process_id,
-            cpu_percent=self.cpu_percent,
-            memory_usage=self.memory_usage,
-            memory_percent=self.memory_percent,
-            memory_amount=self.memory_amount,
-            state=self.state,
-            user=self.user,
-            command=self.command,
-            arguments=self.arguments,
-            name=self.name
-        )
+        for branch, _ in self.__traverse(max_depth=max_depth, where=where, children_first=True):
+            yield branch
+
+    def __traverse(
+        self,
+        max_depth: typing.Optional[int],
+        where: typing.Optional[typing.Callable[[ProcessBranch], bool]],
+        children_first: bool
+    ) -> typing.Iterator[typing.Tuple[ProcessBranch, int]]:
+        """
+        Visit branches with an explicit stack rather than recursion so that deep trees can't exhaust the call stack
 
-        if isinstance(parent, (ProcessNode, ProcessTree)):
-            new_leaf.parent = parent
+        :return: A generator yielding each branch along with how many levels beneath this branch it is
+        """
+        if where is not None and not where(self):
+            return
 
-        return new_leaf
+        stack: typing.List[typing.Tuple[ProcessBranch, int, bool]] = [(self, 0, False)]
 
-    def get_sunburst_data(self, value_attribute: str = None) -> typing.Sequence[typing.Dict[str, typing.Union[float, str, int]]]:
-        if not value_attribute:
-            value_attribute = "memory_usage"
+        while stack:
+            branch, level, children_were_visited = stack.pop()
 
-        if not hasattr(self, value_attribute):
-            raise ValueError(f"'{value_attribute}' is not a value for a process")
+            if children_were_visited:
+                yield branch, level
+                continue
 
-        if isinstance(self.process_id, (str, int, float)):
-            return [{
-                Sunburst.parent_key(): self._parent.node_id if self._parent else "",
-                Sunburst.values_key(): getattr(self, value_attribute),
-                Sunburst.ids_key(): self.process_id,
-                Sunburst.names_key(): self.name
-            }]
+            if children_first:
+                stack.append((branch, level, True))
+            else:
+                yield branch, level
 
-        return [
-            {
-                Sunburst.parent_key(): self._parent.node_id if self._parent else "",
-                Sunburst.values_key(): getattr(self, value_attribute),
-                Sunburst.ids_key(): process_id,
-                Sunburst.names_key(): self.name
-            }
-            for process_id in self.process_id
+            if max_depth is not None and level >= max_depth:
+                continue
+
+            # Children are pushed in reverse so that they are visited in their original order
+            stack.extend(
+                (child, level + 1, False)
+                for child in reversed(branch.children)
+                if isinstance(child, ProcessBranch) and (where is None or where(child))
+            )
+
+    def walk(self, max_depth: int = None) -> typing.Iterator[
+        typing.Tuple[
+            ProcessBranch,
+            typing.Sequence[ProcessNode],
+            typing.Sequence[ProcessLeaf]
         ]
+    ]:
+        """
+        Visit this branch and the nodes beneath it in pre-order
 
-    def add_sunburst_data(self, sunburst: Sunburst, value_attribute: str = None, trace_name: str = None) -> Sunburst:
-        sunburst_data = self.get_sunburst_data(value_attribute=value_attribute)
+        :param max_depth: How many levels beneath this branch to visit. Every level is visited if not given
+        :return: A generator yielding each branch along with its child nodes and leaves
+        """
+        for branch in self.walk_preorder(max_depth=max_depth):
+            nodes = [child for child in branch.children if isinstance(child, ProcessBranch)]
+            leaves = [child for child in branch.children if isinstance(child, ProcessLeaf)]
+            yield branch, nodes, leaves
+
+    @property
+    def height(self) -> int:
+        """
+        The number of levels of branches from this one down to its deepest node
+        """
+        return max(level for _, level in self.__traverse(max_depth=None, where=None, children_first=False)) + 1
 
-        if isinstance(sunburst_data, typing.Mapping):
-            sunburst.add(values=sunburst_data, trace_name=trace_name)
-        elif isinstance(sunburst_data, typing.Sequence):
-            for sunburst_entry in sunburst_data:  # type: typing.Mapping[str, typing.Union[str, float, int]]
-                sunburst.add(values=sunburst_entry, trace_name=trace_name)
+    def __index(self, child: typing.Union[ProcessNode, ProcessLeaf]):
+        # The first child with a name or key wins, the same as it would in a scan of the children
+        if isinstance(child, ProcessLeaf):
+            self._leaves_by_key.setdefault(child.key, child)
+        else:
+            self._nodes_by_name.setdefault(child.name, child)
 
-        return sunburst
+    def get_child_node_by_name(self, name: str) -> typing.Optional[ProcessNode]:
+        return self._nodes_by_name.get(name)
+
+    def get_matching_leaf(self, entry: ProcessEntry) -> typing.Optional[ProcessLeaf]:
+        """
+        Find the leaf that a process should be grouped into
+
+        :param entry: The process to group
+        :return: The leaf with the same parent process, command, and arguments, if there is one
+        """
+        return self._leaves_by_key.get(get_leaf_key(entry.parent_process_id, entry.executable, entry.arguments))
+
+
+class DetailLimits(typing.NamedTuple):
+    """
+    How many segments are kept beneath each segment of a sunburst and how deep a sunburst goes
+
+    Children that don't make the cut are folded into a single "other" segment and levels past the last one are
+    left for the client to request, so that the number of segments stays bounded no matter how many processes
+    are on the host
+    """
+    max_children: typing.Optional[int] = None
+    """The number of the largest children to keep. Every child may be kept if not given"""
+    min_percent: typing.Optional[float] = None
+    """The smallest share of its siblings' total, as a percent, that a child needs to be kept"""
+    max_depth: typing.Optional[int] = None
+    """
+    How many levels are drawn beneath the segment a sunburst starts from. Segments at the last level are drawn
+    with the totals of everything beneath them and are marked as expandable. Every level is drawn if not given
+    """
 
     @property
-    def top(self) -> typing.Optional[ProcessNode, ProcessTree]:
-        if self._parent is None:
-            return None
-        return self._parent.top
+    def is_limited(self) -> bool:
+        """
+        Whether any children may be folded together
+        """
+        return bool(self.max_children) or bool(self.min_percent)
 
-    def __str__(self):
-        return f"{self.command} {' '.join(self.arguments)}"
+    def descend(self) -> DetailLimits:
+        """
+        The limits for a segment one level beneath the one these limits were given for
+        """
+        return self if self.max_depth is None else self._replace(max_depth=max(self.max_depth - 1, 0))
+
+    def split(
+        self,
+        children: typing.Sequence[typing.Union[ProcessNode, ProcessLeaf]],
+        value_attribute: str
+    ) -> typing.Tuple[typing.List[typing.Union[ProcessNode, ProcessLeaf]], typing.List[typing.Union[ProcessNode, ProcessLeaf]]]:
+        """
+        Separate the children to keep from the children to fold together
 
+        Folding is skipped when it would only replace a single child
 
-class ProcessNode(BaseModel):
-    node_id: str = Field(min_length=1)
-    name: str = Field(min_length=1)
-    depth: typing.Optional[int] = Field(default=1)
-    children: typing.Optional[typing.List[typing.Union[ProcessNode, ProcessLeaf]]] = Field(default_factory=list)
-    _parent: typing.Optional[typing.Union[ProcessNode, ProcessTree]] = PrivateAttr(default=None)
+        :param children: The children of a single segment
+        :param value_attribute: The attribute used to size each child
+        :return: The children to keep and the children to fold, each in their original order
+        """
+        if not self.is_limited or len(children) < 2:
+            return list(children), []
+
+        values = [getattr(child, value_attribute) or 0 for child in children]
+        total = sum(values)
+        kept_indices: typing.Set[int] = set()
+
+        for rank, index in enumerate(sorted(range(len(children)), key=values.__getitem__, reverse=True)):
+            if self.max_children and rank >= self.max_children:
+                break
+
+            # Children are visited from largest to smallest, so nothing after this one would be large enough
+            if self.min_percent and total > 0 and values[index] / total * 100.0 < self.min_percent:
+                break
+
+            kept_indices.add(index)
+
+        if len(children) - len(kept_indices) < 2:
+            return list(children), []
+
+        kept = [child for index, child in enumerate(children) if index in kept_indices]
+        folded = [child for index, child in enumerate(children) if index not in kept_indices]
+        return kept, folded
+
+
+def add_leaf_segments(
+    sunburst: Sunburst,
+    leaves: typing.Iterable[ProcessLeaf],
+    value_attribute: str = None,
+    trace_name: str = None
+) -> Sunburst:
+    """
+    Add a segment for each of the given leaves in a single batch
+
+    :param sunburst: The sunburst data to add to
+    :param leaves: The leaves to add
+    :param value_attribute: The attribute used as the value of each entry
+    :param trace_name: The name of the trace to add to. The main data is added to if not given
+    :return: The updated sunburst data
+    """
+    if not value_attribute:
+        value_attribute = "memory_usage"
+
+    names: typing.List[str] = []
+    ids: typing.List[typing.Union[str, int, float]] = []
+    parents: typing.List[str] = []
+    values: typing.List[typing.Union[int, float, None]] = []
+    metric_values: typing.Dict[str, typing.List[typing.Union[int, float, None]]] = {
+        metric: []
+        for metric in sunburst.metrics
+    }
+
+    for leaf in leaves:
+        ids.append(leaf.segment_id)
+        names.append(leaf.name)
+        parents.append(leaf.parent.node_id if leaf.parent is not None else "")
+        values.append(getattr(leaf, value_attribute))
+
+        for metric, metric_column in metric_values.items():
+            metric_column.append(get_metric_value(leaf, metric))
+
+    sunburst.extend(
+        {
+            sunburst.names_key(): names,
+            sunburst.ids_key(): ids,
+            sunburst.parent_key(): parents,
+            sunburst.values_key(): values,
+            **metric_values
+        },
+        trace_name=trace_name
+    )
+    return sunburst
+
+
+def add_other_segment(
+    sunburst: Sunburst,
+    parent_id: str,
+    folded: typing.Sequence[typing.Union[ProcessNode, ProcessLeaf]],
+    value_attribute: str,
+    trace_name: str = None
+) -> Sunburst:
+    """
+    Add a single segment standing in for children that were left out
+
+    :param sunburst: The sunburst data to add to
+    :param parent_id: The ID of the segment the children belong to
+    :param folded: The children that were left out
+    :param value_attribute: The attribute used as the value of each entry
+    :param trace_name: The name of the trace to add to. The main data is added to if not given
+    :return: The updated sunburst data
+    """
+    process_count = sum(child.count for child in folded)
+    name = f"other ({process_count} processes)"
+    metric_values = {
+        metric: sum(getattr(child, metric) or 0 for child in folded)
+        for metric in sunburst.metrics
+    }
+
+    sunburst.add(
+        {
+            sunburst.names_key(): name,
+            sunburst.ids_key(): f"{parent_id}{SEPARATOR}{name}" if parent_id else name,
+            sunburst.parent_key(): parent_id,
+            sunburst.values_key(): sum(getattr(child, value_attribute) or 0 for child in folded),
+            **metric_values
+        },
+        trace_name=trace_name
+    )
+    return sunburst
+
+
+class CollapsedNode(typing.NamedTuple):
+    """
+    How a node looks once chains of single directories have been collapsed into it
+    """
+    node_id: str
+    """The ID of the collapsed node, which is the ID of the deepest node in its chain"""
+    name: str
+    """The names of every node in the chain joined by the separator"""
+    parent_id: str
+    """The ID of the collapsed node's parent"""
+    node: ProcessNode
+    """The deepest node in the chain, which holds the children of the collapsed node"""
+
+
+class ProcessNode(ProcessBranch):
+    """
+    A directory along the path to executables, holding the directories and processes beneath it
+
+    Nodes are slotted and unvalidated since they are built on every sample. Call `to_model` for a validated,
+    serializable copy
+    """
+    __slots__ = ("node_id", "name", "depth")
+
+    def __init__(
+        self,
+        node_id: str,
+        name: str,
+        depth: typing.Optional[int] = 1,
+        children: typing.List[typing.Union[ProcessNode, ProcessLeaf]] = None
+    ):
+        self.node_id = node_id
+        self.name = name
+        self.depth = depth if depth is not None else 1
+        super().__init__(children=children)
+
+    def to_model(self) -> ProcessNodeModel:
+        """
+        Create a validated, serializable copy of the node and everything beneath it
+        """
+        return ProcessNodeModel(
+            node_id=self.node_id,
+            name=self.name,
+            depth=self.depth,
+            cpu_percent=self.cpu_percent,
+            memory_usage=self.memory_usage,
+            count=self.count,
+            children=[child.to_model() for child in self.children]
+        )
 
     def duplicate(self, parent: typing.Union[ProcessNode, ProcessTree] = None) -> ProcessNode:
         new_node = ProcessNode(node_id=self.node_id, name=self.name, depth=self.depth)
@@ -462,9 +1591,7 @@ class ProcessNode(BaseModel):
         if isinstance(parent, (ProcessNode, ProcessTree)):
             new_node.parent = parent
 
-        for child in self.children:
-            new_node.children.append(child.duplicate(new_node))
-
+        self._copy_children(new_node)
         return new_node
 
     @classmethod
@@ -499,6 +1626,7 @@ class ProcessNode(BaseModel):
 
     @classmethod
     def sunburst(cls, value_attribute: str = None) -> graph_objects.Figure:
+        require_plotly("build a figure")
         tree = cls.load()
         return express.sunburst(
             tree.get_sunburst_data(value_attribute=value_attribute),
@@ -522,15 +1650,21 @@ class ProcessNode(BaseModel):
             {
                 sunburst.names_key(): self.name,
                 sunburst.ids_key(): self.node_id,
-                sunburst.parent_key(): self._parent.node_id if self._parent else '',
-                sunburst.values_key(): getattr(self, value_attribute)
+                sunburst.parent_key(): self._parent.node_id if self._parent is not None else '',
+                sunburst.values_key(): getattr(self, value_attribute),
+                **sunburst.get_metric_values(self)
             },
             trace_name=trace_name
         )
 
         return sunburst
 
-    def get_sunburst_data(self, value_attribute: str = None, trace_name: str = None) -> Sunburst:
+    def get_sunburst_data(
+        self,
+        value_attribute: str = None,
+        trace_name: str = None,
+        limits: DetailLimits = None
+    ) -> Sunburst:
         if value_attribute is None:
             value_attribute = "memory_usage"
 
@@ -538,22 +1672,165 @@ class ProcessNode(BaseModel):
             raise ValueError(f"Cannot add a node to sunburst data - it has no '{value_attribute}' value")
 
         sunburst_data = Sunburst()
+        self.add_collapsed_sunburst_data(
+            sunburst=sunburst_data,
+            value_attribute=value_attribute,
+            trace_name=trace_name,
+            limits=limits
+        )
+        return sunburst_data
+
+    def walk_collapsed(
+        self,
+        parent_id: str = '',
+        where: typing.Callable[[ProcessNode], bool] = None
+    ) -> typing.Iterator[CollapsedNode]:
+        """
+        Visit this node and every node beneath it as they would look after `collapse`, without changing
+        or copying anything
 
-        duplicate = self.duplicate()
+        Nodes are visited in the same order that `walk` would visit a collapsed copy
 
-        duplicate.collapse()
+        :param parent_id: The ID of the parent of this node
+        :param where: Only visit nodes, and what is beneath them, that this returns True for. Checked after the
+            collapsed node above them has been handled
+        :return: A generator yielding each collapsed node
+        """
+        # `collapse` only reaches beneath nodes at the second level and below, so a node above that only absorbs
+        # its direct child while everything beneath it is left alone
+        collapse_descendants = self.depth >= 2
+
+        for node in self.walk_preorder(where=where):
+            if node is self:
+                steps_remaining = None if collapse_descendants else 1
+                node_parent_id = parent_id
+            elif (collapse_descendants or node._parent is self) and node._parent.__has_only_child_node():
+                # The node was already folded into the collapsed node above it
+                continue
+            else:
+                steps_remaining = None if collapse_descendants else 0
+                node_parent_id = node._parent.node_id
+
+            name = node.name
+
+            while steps_remaining != 0 and node.__has_only_child_node():
+                node = node.children[0]
+                name = f"{name}{SEPARATOR}{node.name}"
+                steps_remaining = steps_remaining - 1 if steps_remaining is not None else None
+
+            yield CollapsedNode(node_id=node.node_id, name=name, parent_id=node_parent_id, node=node)
+
+    def add_collapsed_sunburst_data(
+        self,
+        sunburst: Sunburst,
+        value_attribute: str = None,
+        trace_name: str = None,
+        parent_id: str = '',
+        limits: DetailLimits = None,
+        subtree_root: ProcessNode = None
+    ) -> Sunburst:
+        """
+        Add this node and everything beneath it to sunburst data as if it were collapsed, without changing
+        or copying the node
+
+        :param sunburst: The sunburst data to add to
+        :param value_attribute: The attribute used as the value of each entry
+        :param trace_name: The name of the trace to add to. The main data is added to if not given
+        :param parent_id: The ID of the parent of this node
+        :param limits: How many children to keep beneath each node and how deep to go. Everything is kept if not given
+        :param subtree_root: A node beneath this one to start from instead. Nodes are collapsed just as they are
+            when starting from this node, so the IDs match those sent for this node
+        :return: The updated sunburst data
+        """
+        if value_attribute is None:
+            value_attribute = "memory_usage"
 
-        for current_node, _, leaves in duplicate.walk():
-            current_node.add_sunburst_data(
-                sunburst=sunburst_data,
+        if limits is None:
+            limits = DetailLimits()
+
+        folded_nodes: typing.Set[ProcessNode] = set()
+
+        # How far each collapsed node that was added is from the first, keyed by ID
+        levels: typing.Dict[str, int] = {}
+
+        # Only the path down to the root of the subtree and what lies beneath that root are visited
+        path_to_subtree: typing.Set[ProcessBranch] = set()
+        within_subtree: typing.Set[ProcessBranch] = set()
+
+        if subtree_root is not None:
+            branch = subtree_root
+
+            while branch is not None and branch is not self:
+                path_to_subtree.add(branch)
+                branch = branch.parent
+
+            if branch is None:
+                raise ValueError(f"Cannot start sunburst data from '{subtree_root.node_id}' - it is not beneath {self}")
+
+            path_to_subtree.add(self)
+            within_subtree.add(subtree_root)
+
+        def should_visit(node: ProcessNode) -> bool:
+            if node in folded_nodes:
+                return False
+
+            if subtree_root is not None:
+                if node._parent in within_subtree:
+                    within_subtree.add(node)
+                elif node not in path_to_subtree:
+                    return False
+
+            parent_level = levels.get(node._parent.node_id)
+            return parent_level is None or limits.max_depth is None or parent_level < limits.max_depth
+
+        for index, collapsed_node in enumerate(self.walk_collapsed(parent_id=parent_id, where=should_visit)):
+            if collapsed_node.node is subtree_root or (subtree_root is None and index == 0):
+                level = 0
+            elif collapsed_node.parent_id in levels:
+                level = levels[collapsed_node.parent_id] + 1
+            else:
+                # Nodes on the way down to the root of the subtree are only visited to collapse them the same way
+                continue
+
+            levels[collapsed_node.node_id] = level
+
+            sunburst.add(
+                {
+                    sunburst.names_key(): collapsed_node.name,
+                    sunburst.ids_key(): collapsed_node.node_id,
+                    sunburst.parent_key(): collapsed_node.parent_id,
+                    sunburst.values_key(): getattr(collapsed_node.node, value_attribute),
+                    **sunburst.get_metric_values(collapsed_node.node)
+                },
+                trace_name=trace_name
+            )
+
+            if limits.max_depth is not None and level >= limits.max_depth:
+                if collapsed_node.node.children:
+                    sunburst.mark_expandable(collapsed_node.node_id, trace_name=trace_name)
+                continue
+
+            kept, folded = limits.split(collapsed_node.node.children, value_attribute)
+            folded_nodes.update(child for child in folded if isinstance(child, ProcessNode))
+
+            # Leaves already belong to the deepest node in the chain, so their parent ID matches the collapsed ID
+            add_leaf_segments(
+                sunburst=sunburst,
+                leaves=[child for child in kept if isinstance(child, ProcessLeaf)],
                 value_attribute=value_attribute,
                 trace_name=trace_name
             )
 
-            for leaf in leaves:
-                leaf.add_sunburst_data(sunburst=sunburst_data, value_attribute=value_attribute, trace_name=trace_name)
+            if folded:
+                add_other_segment(
+                    sunburst=sunburst,
+                    parent_id=collapsed_node.node_id,
+                    folded=folded,
+                    value_attribute=value_attribute,
+                    trace_name=trace_name
+                )
 
-        return sunburst_data
+        return sunburst
 
     @property
     def parent(self) -> typing.Optional[typing.Union[ProcessNode, ProcessTree]]:
@@ -578,14 +1855,6 @@ class ProcessNode(BaseModel):
         ]
         return candidates[0] if candidates else None
 
-    def get_child_node_by_name(self, name: str) -> typing.Optional[ProcessNode]:
-        candidates = [
-            child
-            for child in self.nodes
-            if child.name == name
-        ]
-        return candidates[0] if candidates else None
-
     def collapse(self) -> bool:
         """
         Shrink single value nodes
@@ -593,22 +1862,37 @@ class ProcessNode(BaseModel):
 
         shrank = False
 
-        if self.depth >= 2:
-            for child in self.nodes:
-                child_shrank = child.collapse()
-                shrank = shrank or child_shrank
+        # Nodes beneath the first level are collapsed before the nodes above them so that whole chains of single
+        # directories fold into the top of the chain
+        for node in self.walk_postorder(max_depth=None if self.depth >= 2 else 0):
+            shrank = node.__absorb_only_child() or shrank
 
-        if len(self.children) == 1 and len(self.nodes) == 1:
-            collapsing_node = self.children.pop()
-            self.node_id = collapsing_node.node_id
-            self.name = f"{self.name}{SEPARATOR}{collapsing_node.name}"
-            for child in collapsing_node.children:
-                self.children.append(child)
-                child.parent = self
+        return shrank
 
-            shrank = True
+    def __absorb_only_child(self) -> bool:
+        """
+        Merge this node with its child if that child is the only thing beneath it and is also a node
 
-        return shrank
+        :return: Whether the child was merged into this node
+        """
+        if not self.__has_only_child_node():
+            return False
+
+        collapsing_node = self.children.pop()
+        self.reindex()
+        self.node_id = collapsing_node.node_id
+        self.name = f"{self.name}{SEPARATOR}{collapsing_node.name}"
+        for child in collapsing_node.children:
+            self.add_child(child)
+
+        # The parent finds this node by name, which just changed
+        if self._parent is not None:
+            self._parent.reindex()
+
+        return True
+
+    def __has_only_child_node(self) -> bool:
+        return len(self.children) == 1 and isinstance(self.children[0], ProcessNode)
 
     @classmethod
     def from_entry(cls, entry: ProcessEntry) -> ProcessNode:
@@ -621,64 +1905,30 @@ class ProcessNode(BaseModel):
         node.add_entry(entry)
         return node
 
-    def add_entry(self, entry: ProcessEntry):
-        if self.depth == len(entry.executable_parts) - 1 and entry.executable_parts[self.depth] == entry.name:
-            copy = next((
-                process
-                for process in self.leaves
-                if process.parent_process_id == entry.parent_process_id
-                   and process.command == entry.executable
-                   and process.arguments == entry.arguments
-            ), None)
-
-            if copy is None:
-                leaf = ProcessLeaf.from_entry(entry)
-                leaf.parent = self
-                self.children.append(leaf)
-            else:
-                copy.add_instance(entry=entry)
-        elif self.depth >= len(entry.executable_parts):
-            leaf = ProcessLeaf.from_entry(entry)
-            leaf.parent = self
-            self.children.append(leaf)
-        else:
-            name = entry.executable_parts[self.depth]
-            matching_child_node = self.get_child_node_by_name(name)
+    def add_entry(self, entry: ProcessEntry) -> ProcessLeaf:
+        """
+        Place a process beneath this node
 
-            if matching_child_node:
-                matching_child_node.add_entry(entry)
-            else:
-                new_node_id = f"{self.node_id}{SEPARATOR}{name}"
-                new_node = ProcessNode(node_id=new_node_id, name=name, depth=self.depth + 1)
-                new_node.parent = self
-                self.children.append(new_node)
-                new_node.add_entry(entry)
+        :param entry: The process to add
+        :return: The leaf that now holds the process
+        """
+        return self._place_entry(entry)
 
     @property
     def count(self) -> int:
-        child_count = sum([
-            child.count
-            for child in self.children
-        ])
-        return child_count
+        return self.aggregates.count
 
     @property
     def cpu_percent(self) -> typing.Union[int, float]:
-        percent = sum([
-            child.cpu_percent
-            for child in self.children
-            if isinstance(child.cpu_percent, (int, float))
-        ])
-        return percent
+        return self.aggregates.cpu_percent
 
     @property
     def memory_usage(self) -> typing.Union[int, float]:
-        usage = sum([
-            child.memory_usage
-            for child in self.children
-            if isinstance(child.memory_usage, (int, float))
-        ])
-        return usage
+        return self.aggregates.memory_usage
+
+    @property
+    def memory_percent(self) -> typing.Union[int, float]:
+        return self.aggregates.memory_percent
 
     @property
     def leaves(self) -> typing.Sequence[ProcessLeaf]:
@@ -702,28 +1952,6 @@ class ProcessNode(BaseModel):
             return self
         return self._parent.top
 
-    def walk(self) -> typing.Sequence[
-        typing.Tuple[
-            ProcessNode,
-            typing.Sequence[ProcessNode],
-            typing.Sequence[ProcessLeaf]
-        ]
-    ]:
-        entries = [
-            (self, self.nodes, self.leaves),
-        ]
-
-        for node in self.nodes:
-            entries.extend(node.walk())
-
-        return entries
-
-    @property
-    def height(self) -> int:
-        if not self.nodes:
-            return 1
-        return max([node.height for node in self.nodes]) + 1
-
     def __len__(self):
         return self.count
 
@@ -735,11 +1963,42 @@ class ProcessNode(BaseModel):
 
 
 # TODO: Can this be collapsed into the process node?
-class ProcessTree(BaseModel):
+class ProcessTree(ProcessBranch):
+    """
+    Every process on the host arranged by the path to its executable
+
+    The tree is slotted and unvalidated since it is built on every sample. Call `to_model` for a validated,
+    serializable copy
+    """
+    __slots__ = ("depth", "_entries", "_leaves_by_process_id")
+
+    def __init__(self, children: typing.List[typing.Union[ProcessNode, ProcessLeaf]] = None, depth: int = 1):
+        self.depth = depth
+        self._entries: typing.Dict[int, ProcessEntry] = {}
+        """Every process added through `add_entry` keyed by ID"""
+        self._leaves_by_process_id: typing.Dict[int, ProcessLeaf] = {}
+        """The leaf holding each process added through `add_entry`"""
+        super().__init__(children=children)
+
+    def to_model(self) -> ProcessTreeModel:
+        """
+        Create a validated, serializable copy of the tree
+        """
+        return ProcessTreeModel(
+            depth=self.depth,
+            cpu_percent=self.cpu_percent,
+            memory_usage=self.memory_usage,
+            count=self.count(),
+            children=[child.to_model() for child in self.children]
+        )
+
     @classmethod
-    def load(cls, include_self: bool = None, **kwargs) -> ProcessTree:
-        entries = ProcessStatus(include_self=include_self)
+    def load(cls, include_self: bool = None, collector: Collector = None, **kwargs) -> ProcessTree:
+        entries = ProcessStatus(include_self=include_self, collector=collector)
+        return cls.from_status(entries, **kwargs)
 
+    @classmethod
+    def from_status(cls, entries: ProcessStatus, **kwargs) -> ProcessTree:
         tree = cls(**kwargs)
 
         for entry in entries:
@@ -753,56 +2012,128 @@ class ProcessTree(BaseModel):
 
     def duplicate(self) -> ProcessTree:
         new_tree = ProcessTree()
-        for child in self.children:
-            new_tree.children.append(child.duplicate(new_tree))
-        return new_tree
+        self._copy_children(new_tree)
+
+        new_tree._entries.update(self._entries)
+
+        for _, _, leaves in new_tree.walk():
+            for leaf in leaves:
+                new_tree._leaves_by_process_id.update(
+                    (process_id, leaf)
+                    for process_id in leaf.process_ids
+                    if process_id in new_tree._entries
+                )
 
-    children: typing.List[typing.Union[ProcessNode, ProcessLeaf]] = Field(default_factory=list)
-    depth: int = Field(default=1)
+        return new_tree
 
     def count(self) -> int:
-        child_count = sum([
-            child.count
-            for child in self.children
-        ])
-        return child_count
+        return self.aggregates.count
 
     @property
     def top(self) -> ProcessTree:
         return self
 
-    def add_entry(self, entry: ProcessEntry):
-        if self.depth == len(entry.executable_parts) - 1 and entry.executable_parts[self.depth] == entry.name:
-            copy = next((
-                process
-                for process in self.leaves
-                if process.parent_process_id == entry.parent_process_id
-                   and process.command == entry.executable
-                   and process.arguments == entry.arguments
-            ), None)
-
-            if copy is None:
-                leaf = ProcessLeaf.from_entry(entry)
-                leaf.parent = self
-                self.children.append(leaf)
-            else:
-                copy.add_instance(entry=entry)
-        elif self.depth >= len(entry.executable_parts):
-            leaf = ProcessLeaf.from_entry(entry)
-            leaf.parent = self
-            self.children.append(leaf)
-        else:
-            name = entry.executable_parts[self.depth]
-            matching_child_node = self.get_child_node_by_name(name)
+    def add_entry(self, entry: ProcessEntry) -> ProcessLeaf:
+        """
+        Place a process within the tree and remember where it went so that it may be updated later
+
+        :param entry: The process to add
+        :return: The leaf that now holds the process
+        """
+        leaf = self._place_entry(entry)
+        self._entries[entry.process_id] = entry
+        self._leaves_by_process_id[entry.process_id] = leaf
+        return leaf
+
+    def remove_entry(self, process_id: int) -> ProcessEntry:
+        """
+        Take a process out of the tree, dropping its leaf and any directories left empty
+
+        :param process_id: The ID of a process added through `add_entry`
+        :return: The entry for the process that was removed
+        """
+        if process_id not in self._entries:
+            raise KeyError(f"Process {process_id} is not within the tree")
+
+        entry = self._entries.pop(process_id)
+        leaf = self._leaves_by_process_id.pop(process_id)
+        remaining_entries = [
+            self._entries[leaf_process_id]
+            for leaf_process_id in leaf.process_ids
+            if leaf_process_id != process_id
+        ]
+
+        if remaining_entries:
+            leaf.reset(remaining_entries)
+            return entry
+
+        child = leaf
+        parent = leaf.parent
 
-            if matching_child_node:
-                matching_child_node.add_entry(entry)
+        # A full rebuild never creates empty directories, so they are pruned on the way up
+        while parent is not None:
+            parent.remove_child(child)
+
+            if parent.children or not isinstance(parent, ProcessNode):
+                break
+
+            child = parent
+            parent = parent.parent
+
+        return entry
+
+    def apply_diff(self, diff: SnapshotDiff) -> ProcessTree:
+        """
+        Update the tree in place so that it matches the snapshot a diff leads to
+
+        Only the leaves holding processes within the diff, and the totals above them, are touched, so the cost
+        follows the number of processes that changed rather than the number on the host. The result holds the
+        same processes, leaves, and totals as a tree built from scratch, though children may be in another order.
+        Trees that have been collapsed or trimmed may not be updated
+
+        :param diff: The processes that started, exited, or changed since the tree was built or last updated
+        :return: The updated tree
+        """
+        for entry in diff.removed:
+            self.remove_entry(entry.process_id)
+
+        for previous_entry, current_entry in diff.changed:
+            leaf = self._leaves_by_process_id.get(previous_entry.process_id)
+
+            if leaf is None:
+                raise KeyError(f"Process {previous_entry.process_id} is not within the tree")
+
+            is_placed_alike = (
+                previous_entry.executable == current_entry.executable
+                and previous_entry.name == current_entry.name
+                and previous_entry.parent_process_id == current_entry.parent_process_id
+                and previous_entry.arguments == current_entry.arguments
+            )
+
+            if is_placed_alike:
+                # The process stays in its leaf, so only the leaf's totals need to be formed again
+                self._entries[current_entry.process_id] = current_entry
+                leaf.reset([self._entries[process_id] for process_id in leaf.process_ids])
             else:
-                new_node_id = name
-                new_node = ProcessNode(node_id=new_node_id, name=name, depth=self.depth + 1)
-                new_node.parent = self
-                self.children.append(new_node)
-                new_node.add_entry(entry)
+                self.remove_entry(previous_entry.process_id)
+                self.__insert_entry(current_entry)
+
+        for entry in diff.added:
+            self.__insert_entry(entry)
+
+        return self
+
+    def __insert_entry(self, entry: ProcessEntry):
+        """
+        Add a process while keeping the processes of its leaf in order of ID
+
+        Collectors report processes in order of ID, so a leaf from a full rebuild is described by its lowest ID
+        """
+        leaf = self.add_entry(entry)
+        process_ids = leaf.process_ids
+
+        if len(process_ids) > 1 and process_ids[-1] == entry.process_id and process_ids[-2] > entry.process_id:
+            leaf.reset([self._entries[process_id] for process_id in sorted(process_ids)])
 
     @property
     def leaves(self) -> typing.Sequence[ProcessLeaf]:
@@ -822,11 +2153,7 @@ class ProcessTree(BaseModel):
 
     @property
     def cpu_percent(self) -> typing.Union[int, float]:
-        accumulated_percent = sum([
-            child.cpu_percent
-            for child in self.children
-            if isinstance(child.cpu_percent, (int, float))
-        ])
+        accumulated_percent = self.aggregates.cpu_percent
 
         max_possible_percent = os.cpu_count() * 100.0
         percent = accumulated_percent / max_possible_percent
@@ -835,12 +2162,11 @@ class ProcessTree(BaseModel):
 
     @property
     def memory_usage(self) -> typing.Union[int, float]:
-        usage = sum([
-            child.memory_usage
-            for child in self.children
-            if isinstance(child.memory_usage, (int, float))
-        ])
-        return usage
+        return self.aggregates.memory_usage
+
+    @property
+    def memory_percent(self) -> typing.Union[int, float]:
+        return self.aggregates.memory_percent
 
     def collapse(self) -> bool:
         shrank = False
@@ -858,14 +2184,6 @@ class ProcessTree(BaseModel):
         ]
         return candidates[0] if candidates else None
 
-    def get_child_node_by_name(self, name: str) -> typing.Optional[ProcessNode]:
-        candidates = [
-            child
-            for child in self.nodes
-            if child.name == name
-        ]
-        return candidates[0] if candidates else None
-
     def add_sunburst_data(self, sunburst: Sunburst, value_attribute: str = None, trace_name: str = None) -> Sunburst:
         if value_attribute is None:
             value_attribute = "memory_usage"
@@ -876,17 +2194,16 @@ class ProcessTree(BaseModel):
         value = {
             sunburst.names_key(): self.node_id,
             sunburst.parent_key(): "",
-            sunburst.values_key(): getattr(self, value_attribute),
-            sunburst.ids_key(): self.node_id
+            sunburst.values_key(): get_metric_value(self, value_attribute),
+            sunburst.ids_key(): self.node_id,
+            **sunburst.get_metric_values(self)
         }
         sunburst.add(values=value, trace_name=trace_name)
         return sunburst
 
     def plot_json(self, value_attribute: str = None, **kwargs) -> str:
         sunburst = self.get_sunburst_data(value_attribute=value_attribute)
-        figure = sunburst.to_figure()
-        json_data = figure.to_json()
-        return json_data
+        return json.dumps(sunburst.to_figure_dict())
 
     def trim_empty_nodes(self):
         self.children = [
@@ -899,40 +2216,134 @@ class ProcessTree(BaseModel):
                        and child.memory_usage != 0
                )
         ]
+        self.reindex()
+
+    def get_sunburst_data(
+        self,
+        value_attribute: str = None,
+        limits: DetailLimits = None,
+        metrics: typing.Sequence[str] = None
+    ) -> Sunburst:
+        """
+        Create the data for a sunburst of the whole tree along with a trace for each large top level directory
 
-    def get_sunburst_data(self, value_attribute: str = None) -> Sunburst:
+        :param value_attribute: The attribute used as the value of each entry
+        :param limits: How many children to keep beneath each segment and how many levels to draw beneath the root
+            of each trace. Everything is kept if not given
+        :param metrics: Other attributes to record for each segment in the same pass. See `SUNBURST_METRICS`
+        :return: The sunburst data for the tree
+        """
         if value_attribute is None:
             value_attribute = "memory_usage"
 
-        sunburst_data = Sunburst()
+        if limits is None:
+            limits = DetailLimits()
+
+        sunburst_data = Sunburst(metrics=get_extra_metrics(value_attribute, metrics))
 
-        duplicate = self.duplicate()
+        # Skip the nodes that `trim_empty_nodes` would remove
+        top_level_children = [
+            child
+            for child in self.children
+            if isinstance(child, ProcessLeaf) or (child.memory_usage is not None and child.memory_usage != 0)
+        ]
+        kept, folded = limits.split(top_level_children, value_attribute)
+        kept_leaves = [child for child in kept if isinstance(child, ProcessLeaf)]
+
+        # The tree is read as if it were collapsed rather than collapsing a copy, so nothing is copied per render
+        self.add_sunburst_data(sunburst=sunburst_data, value_attribute=value_attribute)
+
+        add_leaf_segments(sunburst=sunburst_data, leaves=kept_leaves, value_attribute=value_attribute)
+
+        # Each directory is also where its own trace starts, so it is drawn as deep as a trace would draw it. The
+        # main trace only shows a few levels at a time anyway
+        for node in kept:
+            if isinstance(node, ProcessNode):
+                node.add_collapsed_sunburst_data(
+                    sunburst=sunburst_data,
+                    value_attribute=value_attribute,
+                    parent_id=self.node_id,
+                    limits=limits
+                )
 
-        duplicate.collapse()
-        duplicate.trim_empty_nodes()
+        if folded:
+            add_other_segment(
+                sunburst=sunburst_data,
+                parent_id=self.node_id,
+                folded=folded,
+                value_attribute=value_attribute
+            )
 
-        duplicate.add_sunburst_data(sunburst=sunburst_data, value_attribute=value_attribute)
+        total = get_metric_value(self, value_attribute)
+        kept_nodes = [child for child in kept if isinstance(child, ProcessNode)]
 
-        for leaf in self.leaves:
-            leaf.add_sunburst_data(sunburst=sunburst_data, value_attribute=value_attribute)
+        # Traces only refer to the segments above rather than copying them, so every segment is sent once
+        for child in sorted(kept_nodes, key=lambda node: node.memory_usage, reverse=True):
+            percent_of_total = (getattr(child, value_attribute) / total) * 100.0 if total else 0.0
+            trace_name = child.name if percent_of_total > 10.0 else 'Other'
+            root = next(child.walk_collapsed(parent_id=self.node_id))
+            sunburst_data.reference_trace(name=trace_name, root_id=root.node_id)
 
-        for current_node, child_nodes, leaves in duplicate.walk():
-            current_node.add_sunburst_data(sunburst=sunburst_data, value_attribute=value_attribute)
-            for leaf in leaves:
-                leaf.add_sunburst_data(sunburst=sunburst_data, value_attribute=value_attribute)
+        return sunburst_data
 
-        traces = {}
+    def get_node(self, node_id: str) -> ProcessNode:
+        """
+        Find a directory within the tree by its ID
 
-        for child in sorted(self.nodes, key=lambda node: node.memory_usage, reverse=True):
-            percent_of_total = (getattr(child, value_attribute) / getattr(self, value_attribute)) * 100.0
-            child_sunburst = child.get_sunburst_data(value_attribute=value_attribute)
-            trace_name = child.name if percent_of_total > 10.0 else 'Other'
+        :param node_id: The ID of the node, which is its path from the root of the tree
+        :return: The node with the given ID
+        """
+        branch: ProcessBranch = self
 
-            sunburst_data.insert_trace(name=trace_name, data=child_sunburst)
+        for name in node_id.split(SEPARATOR):
+            branch = branch.get_child_node_by_name(name)
 
-        #for node in sorted(self.nodes, key=lambda node: node.memory_usage, reverse=True):
-        #    child_sunburst = node.get_sunburst_data(value_attribute=value_attribute)
-        #    sunburst_data.insert_trace(name=node.name, data=child_sunburst)
+            if branch is None:
+                raise KeyError(f"There is no '{node_id}' node within the tree")
+
+        return branch
+
+    def get_subtree_sunburst_data(
+        self,
+        node_id: str,
+        value_attribute: str = None,
+        limits: DetailLimits = None,
+        metrics: typing.Sequence[str] = None
+    ) -> Sunburst:
+        """
+        Create the data for the part of the sunburst beneath a single segment, such as one that was marked as
+        expandable because it was at the last level drawn
+
+        The segment itself comes first and everything is identified just as it is within `get_sunburst_data`,
+        so the result may be added to data that was already sent
+
+        :param node_id: The ID of the segment to start from
+        :param value_attribute: The attribute used as the value of each entry
+        :param limits: How many children to keep beneath each segment and how many levels to draw beneath the
+            given segment. Everything is kept if not given
+        :param metrics: Other attributes to record for each segment in the same pass. See `SUNBURST_METRICS`
+        :return: The sunburst data for the segment and what lies beneath it
+        """
+        if value_attribute is None:
+            value_attribute = "memory_usage"
+
+        subtree_root = self.get_node(node_id)
+        top_level_node = subtree_root
+
+        while top_level_node.parent is not self:
+            top_level_node = top_level_node.parent
+
+        sunburst_data = top_level_node.add_collapsed_sunburst_data(
+            sunburst=Sunburst(metrics=get_extra_metrics(value_attribute, metrics)),
+            value_attribute=value_attribute,
+            parent_id=self.node_id,
+            limits=limits,
+            subtree_root=subtree_root
+        )
+
+        # Directories folded into the one beneath them are never drawn, so there is nothing to start from
+        if len(sunburst_data) == 0:
+            raise KeyError(f"The '{node_id}' node is not drawn on its own")
 
         return sunburst_data
 
@@ -941,31 +2352,68 @@ class ProcessTree(BaseModel):
         return sunburst_data.plot(div_id=div_id, **kwargs)
 
     def plot_dict(self, value_attribute: str = None, **kwargs) -> typing.Dict[str, typing.Any]:
+        """
+        Create the figure data for the tree without building a plotly figure
+
+        :param value_attribute: The attribute used as the value of each segment
+        :return: Every trace along with the layout of the figure
+        """
         sunburst_data = self.get_sunburst_data(value_attribute=value_attribute)
-        figure = sunburst_data.to_figure()
-        return figure.to_dict()
+        return sunburst_data.to_figure_dict()
+
+    def compact_dict(
+        self,
+        value_attribute: str = None,
+        limits: DetailLimits = None,
+        metrics: typing.Sequence[str] = None
+    ) -> typing.Dict[str, typing.Any]:
+        """
+        Create the figure data in the compact form expanded by the client
 
-    def walk(self) -> typing.Sequence[
-        typing.Tuple[
-            ProcessNode,
-            typing.Sequence[ProcessNode],
-            typing.Sequence[ProcessLeaf]
-        ]
-    ]:
-        entries = [
-            (self, self.nodes, self.leaves),
-        ]
+        Every segment and label is sent once, traces refer to the segments they start from, and rows refer to their
+        parents by position instead of by full path, which is far smaller than `plot_dict` for hosts with many
+        processes. See `Sunburst.to_compact`
 
-        for node in self.nodes:
-            entries.extend(node.walk())
+        :param value_attribute: The attribute used as the value of each segment
+        :param limits: How many children to keep beneath each segment. Every child is kept if not given
+        :param metrics: Other attributes to send for each segment so that the client may switch between them
+        :return: The compact segments and traces along with the layout of the figure and the name of the value's
+            attribute
+        """
+        sunburst_data = self.get_sunburst_data(value_attribute=value_attribute, limits=limits, metrics=metrics)
+        return {
+            **sunburst_data.to_compact(),
+            "layout": get_figure_layout(),
+            "metric": value_attribute or "memory_usage",
+        }
 
-        return entries
+    def compact_subtree_dict(
+        self,
+        node_id: str,
+        value_attribute: str = None,
+        limits: DetailLimits = None,
+        metrics: typing.Sequence[str] = None
+    ) -> typing.Dict[str, typing.Any]:
+        """
+        Create the data beneath a single segment in the compact form expanded by the client
 
-    @property
-    def height(self) -> int:
-        if not self.nodes:
-            return 1
-        return max([child.height for child in self.nodes]) + 1
+        :param node_id: The ID of the segment to start from
+        :param value_attribute: The attribute used as the value of each segment
+        :param limits: How many children to keep beneath each segment and how many levels to draw
+        :param metrics: Other attributes to send for each segment so that the client may switch between them
+        :return: The compact segments for the segment and what lies beneath it
+        """
+        sunburst_data = self.get_subtree_sunburst_data(
+            node_id,
+            value_attribute=value_attribute,
+            limits=limits,
+            metrics=metrics
+        )
+        return {
+            "node_id": node_id,
+            "segments": sunburst_data.to_compact()["segments"],
+            "metric": value_attribute or "memory_usage",
+        }
 
     def __len__(self):
         return self.count()
\ No newline at end of file
@@ -4,6 +4,7 @@
 """
 from __future__ import annotations
 
+import logging
 import sys
 
 from aiohttp import web
@@ -14,24 +15,50 @@ from application_details import INDEX_PAGE
 
 from handlers import Index
 from handlers import GetProcessView
+from handlers import GetSubtreeView
 from handlers import PS
 from handlers import KillProcess
 from handlers import register_resource_handlers
+from handlers.ps import build_tree_payload
 from launch_parameters import ApplicationArguments
+from utilities.collectors import get_collector
+from utilities.executors import create_executor
+from utilities.sampler import Sampler
 
 
 def serve(arguments: ApplicationArguments):
-    application = LocalApplication(include_self=arguments.include_self)
+    collector = get_collector(name=arguments.collector, fold_mode=arguments.fold_mode)
+    executor = create_executor(kind=arguments.render_executor, workers=arguments.render_workers)
+    sampler = Sampler(
+        collector=collector,
+        build_payload=build_tree_payload,
+        interval=arguments.sample_interval,
+        capacity=arguments.snapshot_count,
+        include_self=arguments.include_self,
+        executor=executor,
+        reuse_tree=True
+    )
+    application = LocalApplication(
+        include_self=arguments.include_self,
+        collector=collector,
+        sampler=sampler,
+        executor=executor
+    )
 
     application.add_routes([
         GetProcessView.create_route(method="get", path="/pid/{pid:\d+}"),
         Index.create_route(method="get", path=f"/{INDEX_PAGE}"),
         KillProcess.create_route(method="get", path="/kill/{pid:\d+}"),
         PS.create_route(method="get", path="/ps"),
+        GetSubtreeView.create_route(method="get", path="/tree/{node_id:.+}"),
     ])
 
     register_resource_handlers(application)
 
+    logging.info(f"Collecting process data with {application.collector} every {sampler.interval} seconds")
+    logging.info(
+        f"Building process trees {'on the event loop' if executor is None else f'with a {type(executor).__name__}'}"
+    )
     print(f"Access {APPLICATION_NAME} from http://0.0.0.0:{arguments.port}/{INDEX_PAGE}")
 
     web.run_app(application, port=arguments.port)
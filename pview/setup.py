@@ -9,5 +9,11 @@ setup(
     license='MIT',
     author='christopher.tubbs',
     author_email='',
-    description='A simple local application used to show and explore local process utilization '
+    description='A simple local application used to show and explore local process utilization ',
+    extras_require={
+        # Only needed to draw figures on the server - the client draws everything sent to it
+        'figures': ['plotly~=5.18.0'],
+        # Encodes responses faster - the standard library's json module is used without it
+        'orjson': ['orjson~=3.8'],
+    },
 )
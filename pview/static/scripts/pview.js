@@ -7,6 +7,14 @@ import {Communicator} from "./communication.js";
 import {ProcessView} from "./views/process.js";
 import {ProcessInformationResponse} from "./messaging/response.js";
 import {ProcessInformation} from "./process.js";
+import {
+    METRIC_NAMES,
+    applyMetric,
+    expandSegments,
+    mergeSubtree,
+    pickRows,
+    sliceTrace
+} from "./sunburst.js";
 
 function initializeBackingVariables() {
     const connected = BooleanValue.True;
@@ -79,6 +87,7 @@ function initializeModals() {
 
 async function initialize() {
     $("#root-selector").on("change", rootChanged);
+    $("#metric-selector").on("change", metricChanged);
 
     initializeBackingVariables();
     initializeModals();
@@ -115,28 +124,84 @@ async function resample() {
     }
 }
 
+/**
+ * Build an address used to load the process tree, passing along how much of the tree to draw if the page was
+ * asked for something other than the defaults, such as `?top=20&min_percent=1&depth=3`
+ *
+ * @param path {string} The path to load the data from
+ */
+function getTreeAddress(path) {
+    const pageParameters = new URLSearchParams(window.location.search);
+    const parameters = new URLSearchParams();
+
+    for (const name of ["top", "min_percent", "depth"]) {
+        if (pageParameters.has(name)) {
+            parameters.set(name, pageParameters.get(name));
+        }
+    }
+
+    const query = parameters.toString();
+    return query ? `${path}?${query}` : path;
+}
+
 async function loadPS() {
     return await pview.communicate(
-        "/ps",
+        getTreeAddress("/ps"),
         function(psData) {
             $("#total-cpu-used").text(psData.cpu_percent);
             $("#total-memory-used").text(psData.memory_usage);
 
+            if (psData.collector) {
+                const collectionTime = psData.collector.last_collection_duration;
+                const description = typeof collectionTime === "number"
+                    ? `${psData.collector.name} (${describeNumber(collectionTime * 1000)}ms)`
+                    : psData.collector.name;
+                $("#collector-name").text(description);
+            }
+
+            if (psData.snapshot) {
+                const sampledAt = new Date(psData.snapshot.created_at);
+                $("#snapshot-time").text(sampledAt.toLocaleTimeString());
+            }
+
             pview.diagnostics['plotData'] = psData;
 
             $("#root-selector > *").remove()
             const rootSelector = $("#root-selector");
 
-            for (let dataIndex = 0; dataIndex < psData.data.length; dataIndex++) {
-                let name = psData.data[dataIndex].name;
+            const metricSelector = $("#metric-selector");
+            const segments = expandSegments(psData.segments, psData.metric);
+
+            $("#metric-selector > *").remove()
+
+            for (const metric of Object.keys(segments.metricValues)) {
+                metricSelector.append(`<option value="${metric}">${METRIC_NAMES[metric] || metric}</option>`);
+            }
+
+            if (!pview.currentMetric || !Object.hasOwn(segments.metricValues, pview.currentMetric)) {
+                pview.currentMetric = psData.metric;
+            }
+
+            metricSelector.val(pview.currentMetric);
+
+            if (pview.currentMetric !== psData.metric) {
+                applyMetric(segments, pview.currentMetric);
+            }
+
+            // Every trace is cut from the same segments when it is selected rather than being sent on its own
+            pview.segments = segments;
+            pview.traces = {};
+
+            for (const traceReference of psData.traces) {
+                const name = traceReference.name;
                 pview.traces[name] = {
-                    data: [psData.data[dataIndex]],
+                    reference: traceReference,
                     layout: psData.layout
                 }
                 rootSelector.append(`<option value="${name}">${name}</option>`)
             }
 
-            const firstName = psData.data[0].name;
+            const firstName = psData.traces[0].name;
 
             rootSelector.val(firstName).change();
         }
@@ -148,10 +213,42 @@ async function rootChanged(event) {
     await selectTrace(selectedTraceName)
 }
 
+/**
+ * Size every trace by the newly selected metric and redraw the current one in place
+ */
+async function metricChanged(event) {
+    const metric = $(event.target).val();
+    pview.currentMetric = metric;
+
+    if (!pview.segments) {
+        return;
+    }
+
+    applyMetric(pview.segments, metric);
+
+    if (pview.traces[pview.currentTraceName]) {
+        const values = pickRows(pview.segments.values, pview.currentRows);
+        const text = pickRows(pview.segments.text, pview.currentRows);
+        await Plotly.restyle("content", {values: [values], text: [text]}, [0]);
+    }
+}
+
+/**
+ * Cut a trace out of the segments shared by every trace
+ *
+ * @param traceName {string} The name of the trace
+ * @returns {{data: Object[], layout: Object}} The figure to draw for the trace
+ */
+function createFigure(traceName) {
+    const {trace, rows} = sliceTrace(pview.segments, pview.traces[traceName].reference);
+    pview.currentRows = rows;
+    return {data: [trace], layout: pview.traces[traceName].layout};
+}
+
 async function selectTrace(traceName) {
-    const trace = pview.traces[traceName];
+    pview.currentTraceName = traceName;
     $("#content > *").remove()
-    pview.currentPlot = await Plotly.newPlot("content", trace);
+    pview.currentPlot = await Plotly.newPlot("content", createFigure(traceName));
     $("#content").on("plotly_click", onPlotClick)
 }
 
@@ -167,6 +264,7 @@ async function onPlotClick(event, clickEventAndPoints) {
 
     const point = points[0];
     if (typeof point.id !== "number") {
+        await expandSegment(point.id);
         return;
     }
 
@@ -181,6 +279,34 @@ async function onPlotClick(event, clickEventAndPoints) {
     );
 }
 
+/**
+ * Load and draw what lies beneath a segment that was drawn without its children
+ *
+ * @param segmentID {string} The ID of the segment that was clicked
+ */
+async function expandSegment(segmentID) {
+    const traceName = pview.currentTraceName;
+
+    if (!pview.segments || !pview.segments.expandable.has(segmentID)) {
+        return;
+    }
+
+    await pview.communicate(
+        getTreeAddress(`/tree/${encodeURIComponent(segmentID)}`),
+        async function(response) {
+            mergeSubtree(pview.segments, expandSegments(response.segments, response.metric));
+
+            if (pview.currentTraceName === traceName) {
+                const figure = createFigure(traceName);
+
+                // Zoom into the segment now that there is something beneath it
+                figure.data[0].level = segmentID;
+                pview.currentPlot = await Plotly.react("content", figure);
+            }
+        }
+    );
+}
+
 function loadProcessInformation(processInfo) {
     if (processInfo.can_modify) {
         $("#process-toolbar").show();
@@ -0,0 +1,236 @@
+import {describeKilobytes} from "./utility.js";
+
+/**
+ * The name shown for each metric segments may be sized by
+ */
+export const METRIC_NAMES = Object.freeze({
+    memory_usage: "Memory",
+    cpu_percent: "CPU %",
+    memory_percent: "Memory %",
+    count: "Processes"
+});
+
+/**
+ * Describe the value of a segment for its hover text
+ *
+ * @param metric {string} The metric the value belongs to
+ * @param value {number} The value of the segment
+ * @returns {string} A readable description of the value
+ */
+export function describeMetric(metric, value) {
+    if (typeof value !== 'number') {
+        return "??";
+    }
+
+    switch (metric) {
+        case "memory_usage":
+            return describeKilobytes(value);
+        case "cpu_percent":
+        case "memory_percent":
+            return `${value.toFixed(2)}%`;
+        case "count":
+            return `${value} process${value === 1 ? "" : "es"}`;
+        default:
+            return value.toLocaleString();
+    }
+}
+
+/**
+ * Turn the compact segments from the server into the columns Plotly draws, shared by every trace
+ *
+ * Labels arrive once in a table and parents arrive as row positions, so full IDs are rebuilt here.
+ * An ID is only sent when it isn't the parent's ID and the label joined by a '/'
+ *
+ * @param compactSegments {{labels: string[], label_indices: number[], parents: number[], ids: (string|number|null)[], values: number[], expandable: number[], metrics: Object<string, number[]>?}}
+ * @param metric {string?} The metric the values of the segments belong to. Memory is assumed if not given
+ * @returns {{labels: string[], ids: (string|number)[], parents: (string|number)[], parentRows: number[], values: number[], text: string[], metric: string, metricValues: Object<string, number[]>, expandable: Set<string|number>}}
+ */
+export function expandSegments(compactSegments, metric) {
+    metric = metric || "memory_usage";
+
+    const rowCount = compactSegments.parents.length;
+    const labels = new Array(rowCount);
+    const ids = new Array(rowCount);
+    const parents = new Array(rowCount);
+
+    // Parents always come before their children, so each parent's ID is known by the time it is needed
+    for (let row = 0; row < rowCount; row++) {
+        const parentRow = compactSegments.parents[row];
+        const label = compactSegments.labels[compactSegments.label_indices[row]];
+
+        labels[row] = label;
+        parents[row] = parentRow < 0 ? "" : ids[parentRow];
+
+        if (compactSegments.ids[row] !== null) {
+            ids[row] = compactSegments.ids[row];
+        }
+        else if (parentRow < 0) {
+            ids[row] = label;
+        }
+        else {
+            ids[row] = `${ids[parentRow]}/${label}`;
+        }
+    }
+
+    const metricValues = getMetricValues(compactSegments, metric);
+
+    return {
+        labels: labels,
+        ids: ids,
+        parents: parents,
+        parentRows: compactSegments.parents,
+        values: compactSegments.values,
+        text: compactSegments.values.map(value => describeMetric(metric, value)),
+        metric: metric,
+        metricValues: metricValues,
+        expandable: new Set((compactSegments.expandable || []).map(row => ids[row]))
+    };
+}
+
+/**
+ * Gather every set of values sent for the segments, including the values they are drawn with
+ *
+ * @param compactSegments {{values: number[], metrics: Object<string, number[]>?}} The compact segments sent by the server
+ * @param metric {string?} The metric the values of the segments belong to. Memory is assumed if not given
+ * @returns {Object<string, number[]>} The value of each row for every metric, keyed by metric
+ */
+export function getMetricValues(compactSegments, metric) {
+    return Object.assign({[metric || "memory_usage"]: compactSegments.values}, compactSegments.metrics || {});
+}
+
+/**
+ * Find the rows of the segments that a trace holds
+ *
+ * A trace holds the rows it starts from and everything beneath them
+ *
+ * @param segments {{parentRows: number[]}} The segments made by `expandSegments`
+ * @param roots {number[]?} The rows the trace starts from. Every row is held if not given
+ * @returns {number[]?} The position of every row in the trace, or nothing if the trace holds every row
+ */
+export function selectRows(segments, roots) {
+    if (!Array.isArray(roots)) {
+        return null;
+    }
+
+    const rootRows = new Set(roots);
+    const selected = new Array(segments.parentRows.length);
+    const rows = [];
+
+    for (let row = 0; row < segments.parentRows.length; row++) {
+        const parentRow = segments.parentRows[row];
+        selected[row] = rootRows.has(row) || (parentRow >= 0 && parentRow < row && selected[parentRow]);
+
+        if (selected[row]) {
+            rows.push(row);
+        }
+    }
+
+    return rows;
+}
+
+/**
+ * Take the values of some rows from a column of the segments
+ *
+ * @param column {Array} A column of the segments
+ * @param rows {number[]?} The rows to take. The whole column is used if not given
+ * @returns {Array} The values of the rows, in order
+ */
+export function pickRows(column, rows) {
+    return rows ? rows.map(row => column[row]) : column;
+}
+
+/**
+ * Cut a trace Plotly can draw out of the segments shared by every trace
+ *
+ * @param segments {Object} The segments made by `expandSegments`
+ * @param traceReference {{name: string, roots: number[]?, maxdepth: number?}} A trace as sent by the server
+ * @returns {{trace: Object, rows: number[]?}} The trace for Plotly along with the rows it was cut from
+ */
+export function sliceTrace(segments, traceReference) {
+    const rows = selectRows(segments, traceReference.roots);
+    const trace = {
+        type: "sunburst",
+        name: traceReference.name,
+        labels: pickRows(segments.labels, rows),
+        ids: pickRows(segments.ids, rows),
+        parents: pickRows(segments.parents, rows),
+        values: pickRows(segments.values, rows),
+        text: pickRows(segments.text, rows),
+        hovertemplate: "%{label}<br>%{text}"
+    };
+
+    if (typeof traceReference.maxdepth === "number") {
+        trace.maxdepth = traceReference.maxdepth;
+    }
+
+    return {trace: trace, rows: rows};
+}
+
+/**
+ * Size the segments by another metric without asking the server for anything
+ *
+ * Traces that were already cut from the segments keep their old values until they are cut again or restyled
+ * with `pickRows`
+ *
+ * @param segments {Object} The segments made by `expandSegments`
+ * @param metric {string} The metric to size the segments by
+ * @returns {Object} The segments, which now hold the new values and hover text
+ */
+export function applyMetric(segments, metric) {
+    const values = segments.metricValues[metric];
+
+    if (!Array.isArray(values)) {
+        throw new Error(`There are no values for the '${metric}' metric`);
+    }
+
+    segments.metric = metric;
+    segments.values = values;
+    segments.text = values.map(value => describeMetric(metric, value));
+    return segments;
+}
+
+/**
+ * Add the segments beneath a segment that was expanded to the segments shared by every trace
+ *
+ * The first row of the subtree is the segment that was expanded, which the segments already hold. Every trace
+ * holding that segment holds what was added beneath it once it is cut again
+ *
+ * @param segments {Object} The segments made by `expandSegments`
+ * @param subtreeSegments {Object} The segments made by `expandSegments` from the subtree sent by the server
+ * @returns {Object} The segments that were added to
+ */
+export function mergeSubtree(segments, subtreeSegments) {
+    const expandedID = subtreeSegments.ids[0];
+    const expandedRow = segments.ids.indexOf(expandedID);
+
+    if (expandedRow < 0) {
+        throw new Error(`There is no '${expandedID}' segment to add to`);
+    }
+
+    if (subtreeSegments.metric !== segments.metric) {
+        applyMetric(subtreeSegments, segments.metric);
+    }
+
+    // Rows of the subtree after the first are added to the end, so their parents move by the same amount
+    const offset = segments.ids.length - 1;
+    const parentRows = subtreeSegments.parentRows.slice(1).map(
+        parentRow => parentRow <= 0 ? expandedRow : parentRow + offset
+    );
+
+    for (const key of ["labels", "ids", "parents", "values", "text"]) {
+        segments[key] = segments[key].concat(subtreeSegments[key].slice(1));
+    }
+
+    segments.parentRows = segments.parentRows.concat(parentRows);
+
+    for (const metric of Object.keys(segments.metricValues)) {
+        segments.metricValues[metric] = segments.metricValues[metric].concat(
+            (subtreeSegments.metricValues[metric] || []).slice(1)
+        );
+    }
+
+    segments.expandable.delete(expandedID);
+    subtreeSegments.expandable.forEach(segmentID => segments.expandable.add(segmentID));
+
+    return segments;
+}
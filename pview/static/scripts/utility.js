@@ -110,4 +110,44 @@ export function describeMemory(amount, unit) {
 
     let described_amount = describeNumber(current_amount);
     return `${described_amount}${current_unit}`;
-}
\ No newline at end of file
+}
+
+export const KILOBYTE_UNITS = Object.freeze(["B", "KB", "MB", "GB"]);
+
+/**
+ * Describe an amount of memory given in kilobytes the same way the server does, in powers of 1024
+ *
+ * @param kilobytes {number|null} The amount of memory in kilobytes
+ * @returns {string}
+ */
+export function describeKilobytes(kilobytes) {
+    if (typeof kilobytes !== 'number') {
+        return "??";
+    }
+
+    let amount = kilobytes * 1024;
+    let unitIndex = 0;
+
+    while (amount > 1024 && unitIndex < KILOBYTE_UNITS.length - 1) {
+        amount /= 1024;
+        unitIndex += 1;
+    }
+
+    // The server rounds exact ties to the even digit while `toFixed` rounds them up, so whole kilobytes are
+    // rounded to hundredths with integer arithmetic to keep both descriptions identical
+    const numerator = kilobytes * 1024 * 100;
+    if (!Number.isSafeInteger(numerator) || numerator < 0) {
+        return `${amount.toFixed(2)}${KILOBYTE_UNITS[unitIndex]}`;
+    }
+
+    const denominator = 1024 ** unitIndex;
+    let hundredths = Math.floor(numerator / denominator);
+    const remainder = numerator - hundredths * denominator;
+
+    if (remainder * 2 > denominator || (remainder * 2 === denominator && hundredths % 2 === 1)) {
+        hundredths += 1;
+    }
+
+    const fraction = String(hundredths % 100).padStart(2, "0");
+    return `${Math.floor(hundredths / 100)}.${fraction}${KILOBYTE_UNITS[unitIndex]}`;
+}
@@ -0,0 +1,260 @@
+"""
+Interchangeable backends used to gather a sample of every process on the host
+"""
+from __future__ import annotations
+
+import abc
+import asyncio
+import functools
+import threading
+import time
+import typing
+from datetime import datetime
+
+from utilities.proc import ProcTableGenerator
+from utilities.ps import FoldMode
+from utilities.ps import ProcessSnapshot
+from utilities.ps import PSTableGenerator
+from utilities.ps import PsutilTableGenerator
+
+AUTOMATIC_COLLECTOR: typing.Final[str] = "auto"
+"""The name used to request the cheapest collector available on the host"""
+
+COLLECTION_POLL_INTERVAL: typing.Final[float] = 0.01
+"""How many seconds a collection on the event loop waits before checking again whether a blocking one has finished"""
+
+
+class Collector(abc.ABC):
+    """
+    Gathers a sample of every process on the host
+
+    Only one sample is collected at a time. Collectors measure CPU usage against their previous sample, so two
+    collections running at once would each overwrite what the other compares against
+    """
+    @classmethod
+    @abc.abstractmethod
+    def get_name(cls) -> str:
+        """
+        The name used to select this collector
+        """
+        pass
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """
+        Whether this collector may be used on the current host
+        """
+        return True
+
+    def __init__(self):
+        self.__last_collection_time: typing.Optional[datetime] = None
+        self.__last_collection_duration: typing.Optional[float] = None
+        self.__lock = threading.Lock()
+        self.__async_lock = asyncio.Lock()
+
+    @property
+    def name(self) -> str:
+        return self.get_name()
+
+    @property
+    def last_collection_time(self) -> typing.Optional[datetime]:
+        """
+        When the last sample was collected
+        """
+        return self.__last_collection_time
+
+    @property
+    def last_collection_duration(self) -> typing.Optional[float]:
+        """
+        The number of seconds it took to collect the last sample
+        """
+        return self.__last_collection_duration
+
+    @abc.abstractmethod
+    def _collect(self) -> ProcessSnapshot:
+        """
+        Read the details of every process
+        """
+        pass
+
+    def collect(self) -> ProcessSnapshot:
+        """
+        Gather a sample of every process and record how long it took
+
+        :return: The details of every process on the host. Iterating over it yields a `ProcessEntry` per process
+        """
+        with self.__lock:
+            started_at = time.perf_counter()
+            snapshot = self._collect()
+            self.__record_collection(started_at)
+
+        return snapshot
+
+    async def _collect_async(self) -> ProcessSnapshot:
+        """
+        Read the details of every process without blocking the event loop
+
+        The blocking collection is moved to a worker thread unless a collector can do better
+        """
+        return await asyncio.to_thread(self._collect)
+
+    async def collect_async(self) -> ProcessSnapshot:
+        """
+        Gather a sample of every process without blocking the event loop and record how long it took
+
+        :return: The details of every process on the host. Iterating over it yields a `ProcessEntry` per process
+        """
+        async with self.__async_lock:
+            # A blocking collection may be running on another thread, but waiting on its lock would block the loop
+            while not self.__lock.acquire(blocking=False):
+                await asyncio.sleep(COLLECTION_POLL_INTERVAL)
+
+            try:
+                started_at = time.perf_counter()
+                snapshot = await self._collect_async()
+                self.__record_collection(started_at)
+            finally:
+                self.__lock.release()
+
+        return snapshot
+
+    def __record_collection(self, started_at: float):
+        self.__last_collection_duration = time.perf_counter() - started_at
+        self.__last_collection_time = datetime.now()
+
+    def describe(self) -> typing.Dict[str, typing.Any]:
+        """
+        Describe the collector and the last collection it performed
+        """
+        return {
+            "name": self.name,
+            "last_collection_time": self.last_collection_time.isoformat() if self.last_collection_time else None,
+            "last_collection_duration": self.last_collection_duration,
+        }
+
+    def __str__(self):
+        return f"{self.__class__.__name__} ({self.name})"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class TableCollector(Collector, abc.ABC):
+    """
+    A collector that gathers its entries through a table generator
+    """
+    @classmethod
+    @abc.abstractmethod
+    def create_table_generator(cls, fold_mode: typing.Union[FoldMode, str] = None) -> PSTableGenerator:
+        """
+        Create the generator used to form process entries
+
+        :param fold_mode: How the usage of child processes should be folded into their parents
+        """
+        pass
+
+    def __init__(self, table_generator: PSTableGenerator = None, fold_mode: typing.Union[FoldMode, str] = None):
+        super().__init__()
+
+        if table_generator is None:
+            table_generator = self.create_table_generator(fold_mode=fold_mode)
+
+        self.__table_generator = table_generator
+
+    @property
+    def table_generator(self) -> PSTableGenerator:
+        return self.__table_generator
+
+    def _collect(self) -> ProcessSnapshot:
+        return self.__table_generator.create_snapshot()
+
+    async def _collect_async(self) -> ProcessSnapshot:
+        return await self.__table_generator.create_snapshot_async()
+
+
+class PSCollector(TableCollector):
+    """
+    Collects process data by calling the `ps` command
+    """
+    @classmethod
+    def get_name(cls) -> str:
+        return "ps"
+
+    @classmethod
+    def create_table_generator(cls, fold_mode: typing.Union[FoldMode, str] = None) -> PSTableGenerator:
+        return PSTableGenerator(fold_mode=fold_mode)
+
+
+class PsutilCollector(TableCollector):
+    """
+    Collects process data through psutil
+    """
+    @classmethod
+    def get_name(cls) -> str:
+        return "psutil"
+
+    @classmethod
+    def create_table_generator(cls, fold_mode: typing.Union[FoldMode, str] = None) -> PSTableGenerator:
+        return PsutilTableGenerator(fold_mode=fold_mode)
+
+
+class ProcCollector(TableCollector):
+    """
+    Collects process data by reading the `/proc` filesystem
+    """
+    @classmethod
+    def get_name(cls) -> str:
+        return "proc"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return ProcTableGenerator.is_available()
+
+    @classmethod
+    def create_table_generator(cls, fold_mode: typing.Union[FoldMode, str] = None) -> PSTableGenerator:
+        return ProcTableGenerator(fold_mode=fold_mode)
+
+
+COLLECTORS: typing.Final[typing.Mapping[str, typing.Type[Collector]]] = {
+    collector.get_name(): collector
+    for collector in (ProcCollector, PsutilCollector, PSCollector)
+}
+"""Every available collector keyed by name, in order of preference"""
+
+
+def get_collector(name: str = None, fold_mode: typing.Union[FoldMode, str] = None) -> Collector:
+    """
+    Create the collector with the given name
+
+    :param name: The name of the collector. The cheapest collector available on the host is used if none is given
+    :param fold_mode: How the usage of child processes should be folded into their parents
+    :return: A new collector
+    """
+    if not name or name == AUTOMATIC_COLLECTOR:
+        collector_type = next(
+            collector
+            for collector in COLLECTORS.values()
+            if collector.is_available()
+        )
+        return collector_type(fold_mode=fold_mode)
+
+    if name not in COLLECTORS:
+        raise KeyError(f"'{name}' is not a valid collector. Valid options are: {', '.join(COLLECTORS)}")
+
+    collector_type = COLLECTORS[name]
+
+    if not collector_type.is_available():
+        raise ValueError(f"The '{name}' collector is not available on this host")
+
+    return collector_type(fold_mode=fold_mode)
+
+
+@functools.lru_cache(maxsize=None)
+def get_default_collector() -> Collector:
+    """
+    The collector shared by everything that reads process data without being handed a collector
+
+    Collectors measure CPU usage against their previous sample, so sharing one keeps those readings current
+    instead of averaging them over the life of each process
+    """
+    return get_collector()
@@ -6,8 +6,10 @@ Anything else may result in circular references.
 """
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
+import shlex
 import typing
 import inspect
 import re
@@ -18,6 +20,8 @@ from aiohttp import web
 from pydantic import BaseModel
 
 from pview.application_details import ALLOW_REMOTE
+from pview.application_details import COMMAND_OUTPUT_LIMIT
+from pview.application_details import COMMAND_TIMEOUT
 
 
 _CLASS_TYPE = typing.TypeVar("_CLASS_TYPE")
@@ -184,6 +188,89 @@ def run_shell_command(command: typing.Union[str, typing.Sequence[str]], *args) -
     )
 
 
+async def run_shell_command_async(
+    command: typing.Union[str, typing.Sequence[str]],
+    *args,
+    timeout: float = None,
+    output_limit: int = None
+) -> ProcessOutput:
+    """
+    Run a command without blocking the event loop
+
+    Unlike `run_shell_command`, the command is run directly rather than through a shell, so a string command
+    is split into its arguments first. The process is killed if it runs past its deadline, writes more than
+    the allowed amount to stdout or stderr, or if the awaiting task is cancelled.
+
+    Example:
+        >>> output = await run_shell_command_async("echo 'look at this example'")
+        >>> print(output.stdout)
+        look at this example
+
+    :param command: The command to call
+    :param timeout: The number of seconds the command may run before it is killed
+    :param output_limit: The maximum number of bytes that will be read from stdout, and separately from stderr
+    :return: Output data from the command
+    """
+    if isinstance(command, bytes):
+        command = command.decode()
+
+    if isinstance(command, str):
+        command = shlex.split(command)
+    else:
+        command = [str(entry) for entry in command]
+
+    command = command + [str(argument) for argument in args]
+
+    if timeout is None:
+        timeout = COMMAND_TIMEOUT
+
+    if output_limit is None:
+        output_limit = COMMAND_OUTPUT_LIMIT
+
+    shell_process = await asyncio.create_subprocess_exec(
+        *command,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+
+    async def read_output(stream: asyncio.StreamReader, stream_name: str) -> bytes:
+        output = bytearray()
+
+        # Read one byte past the limit so that output of exactly the limit isn't mistaken for too much
+        while len(output) <= output_limit:
+            chunk = await stream.read(output_limit + 1 - len(output))
+
+            if not chunk:
+                return bytes(output)
+
+            output.extend(chunk)
+
+        raise ValueError(f"'{shlex.join(command)}' wrote more than {output_limit} bytes to {stream_name}")
+
+    try:
+        async with asyncio.timeout(timeout):
+            stdout, stderr = await asyncio.gather(
+                read_output(shell_process.stdout, "stdout"),
+                read_output(shell_process.stderr, "stderr")
+            )
+            await shell_process.wait()
+    except TimeoutError as exception:
+        raise TimeoutError(f"'{shlex.join(command)}' did not finish within {timeout} seconds") from exception
+    finally:
+        # Leaving early for any reason, cancellation included, must not leave the command running
+        if shell_process.returncode is None:
+            shell_process.kill()
+            await shell_process.wait()
+
+    return ProcessOutput(
+        process_id=shell_process.pid,
+        stdout=stdout,
+        stderr=stderr,
+        return_code=shell_process.returncode,
+        command=shlex.join(command)
+    )
+
+
 def to_bool(value: typing.Union[int, str, float, bool, bytes] = None) -> bool:
     """
     Interpret the intention of given value to a matching boolean
@@ -0,0 +1,95 @@
+"""
+Executors used to keep CPU heavy work, like building and rendering process trees, off of the event loop
+"""
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import enum
+import functools
+import typing
+
+from utilities.ps import ProcessSnapshot
+from utilities.serialization import dumps
+
+_RESULT = typing.TypeVar("_RESULT")
+"""The result of a function run within an executor"""
+
+PAYLOAD_BUILDER = typing.Callable[[ProcessSnapshot, typing.Dict[str, typing.Any]], typing.Dict[str, typing.Any]]
+"""
+A function that turns a snapshot of process data and details about how it was collected into the payload sent to
+clients. Must be defined at the top level of a module so that it may be sent to a process pool
+"""
+
+
+class ExecutorKind(str, enum.Enum):
+    """
+    Where CPU heavy work is run
+    """
+    INLINE = "inline"
+    """Run on the event loop itself"""
+    THREAD = "thread"
+    """Run on a pool of threads"""
+    PROCESS = "process"
+    """Run on a pool of processes, which only receive raw snapshots and only return serialized payloads"""
+
+
+def create_executor(
+    kind: typing.Union[ExecutorKind, str] = None,
+    workers: int = None
+) -> typing.Optional[concurrent.futures.Executor]:
+    """
+    Create an executor for CPU heavy work
+
+    :param kind: The type of executor to create. A thread pool is created if none is given
+    :param workers: The number of workers in the pool. The executor's default is used if none is given
+    :return: A new executor, or nothing if work should be run on the event loop
+    """
+    kind = ExecutorKind(kind) if kind else ExecutorKind.THREAD
+
+    if workers is not None and workers < 1:
+        raise ValueError(f"An executor needs at least one worker - received {workers}")
+
+    if kind == ExecutorKind.INLINE:
+        return None
+    elif kind == ExecutorKind.PROCESS:
+        return concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+
+    return concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pview-render")
+
+
+async def run_in_executor(
+    executor: typing.Optional[concurrent.futures.Executor],
+    function: typing.Callable[..., _RESULT],
+    *args,
+    **kwargs
+) -> _RESULT:
+    """
+    Run a function within an executor without blocking the event loop
+
+    :param executor: The executor to run the function in. The function is called directly if there isn't one
+    :param function: The function to call
+    :return: The result of the function
+    """
+    if executor is None:
+        return function(*args, **kwargs)
+
+    return await asyncio.get_running_loop().run_in_executor(executor, functools.partial(function, *args, **kwargs))
+
+
+def render_payload(
+    build_payload: PAYLOAD_BUILDER,
+    snapshot: ProcessSnapshot,
+    details: typing.Dict[str, typing.Any]
+) -> bytes:
+    """
+    Build the payload for a snapshot and serialize it so that it may be sent to clients as is
+
+    :param build_payload: The function that creates the payload
+    :param snapshot: The process data to render
+    :param details: Information about how the snapshot was collected, added to the payload as is
+    :return: The payload as UTF-8 encoded JSON
+    """
+    payload = build_payload(snapshot, details)
+    payload.update(details)
+    return dumps(payload)
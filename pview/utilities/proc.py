@@ -0,0 +1,258 @@
+"""
+Reads process data directly from a `/proc` filesystem so that no `ps` subprocess is needed
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import pathlib
+import pwd
+import typing
+
+from typing_extensions import ParamSpec
+from typing_extensions import Concatenate
+
+from utilities.common import ProcessOutput
+from utilities.ps import FoldMode
+from utilities.ps import PSTableGenerator
+
+ARGS_AND_KWARGS = ParamSpec("ARGS_AND_KWARGS")
+
+DEFAULT_PROC_ROOT: typing.Final[pathlib.Path] = pathlib.Path("/proc")
+"""The location of the process filesystem on Linux"""
+
+STAT_STATE_INDEX: typing.Final[int] = 0
+"""The index of the process state in the portion of `/proc/[pid]/stat` that follows the command name"""
+
+STAT_PARENT_PROCESS_ID_INDEX: typing.Final[int] = 1
+"""The index of the parent process ID in the portion of `/proc/[pid]/stat` that follows the command name"""
+
+STAT_USER_TIME_INDEX: typing.Final[int] = 11
+"""The index of the user mode CPU time in the portion of `/proc/[pid]/stat` that follows the command name"""
+
+STAT_SYSTEM_TIME_INDEX: typing.Final[int] = 12
+"""The index of the kernel mode CPU time in the portion of `/proc/[pid]/stat` that follows the command name"""
+
+STAT_START_TIME_INDEX: typing.Final[int] = 19
+"""The index of the process start time in the portion of `/proc/[pid]/stat` that follows the command name"""
+
+
+class ProcTableGenerator(PSTableGenerator):
+    """
+    Structure used to form the same results as the `ps` command by reading `/proc` directly
+
+    Every value is read from `/proc/[pid]/stat`, `/proc/[pid]/statm`, `/proc/[pid]/status`, and
+    `/proc/[pid]/cmdline`, so no subprocess is created when collecting a sample
+    """
+    @classmethod
+    def is_available(cls, proc_root: os.PathLike = None) -> bool:
+        """
+        Whether process data may be read from the given process filesystem
+
+        :param proc_root: The root of the process filesystem. `/proc` is used if none is given
+        :return: True if the process filesystem exists and may be read
+        """
+        proc_root = pathlib.Path(proc_root) if proc_root else DEFAULT_PROC_ROOT
+        return (proc_root / "uptime").is_file() and (proc_root / "meminfo").is_file()
+
+    def __init__(
+        self,
+        run_command: typing.Callable[Concatenate[str, ARGS_AND_KWARGS], ProcessOutput] = None,
+        fold_mode: typing.Union[FoldMode, str] = None,
+        proc_root: os.PathLike = None,
+        page_size: int = None,
+        clock_ticks: int = None
+    ):
+        """
+        Constructor
+
+        :param run_command: Unused - accepted so that the generator may be created like any other table generator
+        :param fold_mode: How the usage of child processes should be folded into their parents
+        :param proc_root: The root of the process filesystem. `/proc` is used if none is given
+        :param page_size: The number of bytes in a page of memory. The value for the host is used if none is given
+        :param clock_ticks: The number of clock ticks per second. The value for the host is used if none is given
+        """
+        super().__init__(run_command=run_command, fold_mode=fold_mode)
+        self.__proc_root = pathlib.Path(proc_root) if proc_root else DEFAULT_PROC_ROOT
+        self.__page_size = page_size or os.sysconf("SC_PAGE_SIZE")
+        self.__clock_ticks = clock_ticks or os.sysconf("SC_CLK_TCK")
+        self.__usernames: typing.Dict[int, str] = {}
+
+    @classmethod
+    def start_time_tolerance(cls) -> float:
+        return 0.0
+
+    @property
+    def proc_root(self) -> pathlib.Path:
+        """
+        The root of the process filesystem that data is read from
+        """
+        return self.__proc_root
+
+    def _get_username(self, user_id: int) -> str:
+        """
+        Get the name of a user, falling back to the raw ID like `ps` does if the user is not known
+
+        :param user_id: The ID of the user
+        :return: The name of the user
+        """
+        if user_id not in self.__usernames:
+            try:
+                self.__usernames[user_id] = pwd.getpwuid(user_id).pw_name
+            except KeyError:
+                self.__usernames[user_id] = str(user_id)
+
+        return self.__usernames[user_id]
+
+    def _read_uptime(self) -> float:
+        """
+        Get the number of seconds that the system has been running
+        """
+        return float((self.__proc_root / "uptime").read_text().split()[0])
+
+    def _read_total_memory(self) -> int:
+        """
+        Get the total amount of memory on the system in KB
+        """
+        with open(self.__proc_root / "meminfo") as meminfo:
+            for line in meminfo:
+                if line.startswith("MemTotal:"):
+                    return int(line.split()[1])
+
+        raise ValueError(f"The total amount of memory could not be read from {self.__proc_root / 'meminfo'}")
+
+    def _read_process(
+        self,
+        process_directory: pathlib.Path,
+        uptime: float,
+        total_memory: int
+    ) -> typing.Optional[typing.Tuple[typing.Dict[str, typing.Any], str]]:
+        """
+        Read the details for a single process
+
+        :param process_directory: The `/proc/[pid]` directory for the process
+        :param uptime: The number of seconds that the system has been running
+        :param total_memory: The total amount of memory on the system in KB
+        :return: The row for the process keyed by column name and the command that started it.
+            Nothing is returned if the process ended while it was being read
+        """
+        try:
+            stat = (process_directory / "stat").read_text()
+            statm = (process_directory / "statm").read_text().split()
+            raw_command_line = (process_directory / "cmdline").read_bytes()
+
+            user_id: typing.Optional[int] = None
+
+            with open(process_directory / "status") as status:
+                for line in status:
+                    if line.startswith("Uid:"):
+                        # The second value is the effective user ID, which is what `ps` reports
+                        user_id = int(line.split()[2])
+                        break
+        except (FileNotFoundError, ProcessLookupError, PermissionError):
+            return None
+
+        # The command name is wrapped in parentheses and may itself contain spaces and parentheses
+        name_start = stat.index("(")
+        name_end = stat.rindex(")")
+        process_id = int(stat[:name_start])
+        name = stat[name_start + 1:name_end]
+        fields = stat[name_end + 2:].split()
+
+        cpu_seconds = (int(fields[STAT_USER_TIME_INDEX]) + int(fields[STAT_SYSTEM_TIME_INDEX])) / self.__clock_ticks
+        start_time = int(fields[STAT_START_TIME_INDEX]) / self.__clock_ticks
+        elapsed_seconds = uptime - start_time
+        cpu_percent = cpu_seconds / elapsed_seconds * 100.0 if elapsed_seconds > 0 else 0.0
+
+        memory = int(statm[1]) * self.__page_size // 1024
+        memory_percent = memory / total_memory * 100.0 if total_memory else 0.0
+
+        command_line = [
+            part.decode(errors="replace")
+            for part in raw_command_line.split(b"\0")
+            if part
+        ]
+
+        # Kernel threads and zombies have no command line, so they are identified by their name alone
+        if command_line and command_line[0].startswith("/"):
+            command = command_line[0]
+        else:
+            command = name
+
+        row = {
+            self.user_column(): self._get_username(user_id) if user_id is not None else "?",
+            self.process_id_column(): process_id,
+            self.parent_process_id_column(): int(fields[STAT_PARENT_PROCESS_ID_INDEX]),
+            self.cpu_percent_column(): round(cpu_percent, 1),
+            self.memory_percent_column(): round(memory_percent, 1),
+            self.memory_column(): memory,
+            self.state_column(): fields[STAT_STATE_INDEX],
+            self.cpu_time_column(): cpu_seconds,
+            # Measured in seconds since boot, which is stable between samples unlike a wall clock time
+            self.start_time_column(): start_time,
+            self.command_and_args_column(): " ".join(command_line) if command_line else command,
+            # The command line is already split, so the arguments are everything after argv[0]
+            self.arguments_column(): " ".join(command_line[1:]),
+        }
+
+        return row, command
+
+    def _load_processes(self) -> typing.Tuple[
+        typing.Optional[int],
+        typing.List[typing.Dict[str, typing.Any]],
+        typing.Dict[int, str]
+    ]:
+        """
+        Gather the raw rows for every process along with the command behind every process ID
+
+        :return: Nothing for the ID of the process used to gather data since no process is created,
+            the raw rows keyed by column name, and a map of process IDs to their commands
+        """
+        uptime = self._read_uptime()
+        total_memory = self._read_total_memory()
+
+        rows: typing.List[typing.Dict[str, typing.Any]] = []
+        commands: typing.Dict[int, str] = {}
+
+        for process_directory in self.__proc_root.iterdir():
+            if not process_directory.name.isdigit():
+                continue
+
+            process_data = self._read_process(
+                process_directory=process_directory,
+                uptime=uptime,
+                total_memory=total_memory
+            )
+
+            if process_data is None:
+                continue
+
+            row, command = process_data
+            rows.append(row)
+            commands[row[self.process_id_column()]] = command
+
+        return None, rows, commands
+
+    def look_up_commands(self) -> typing.Dict[int, str]:
+        """
+        Map the command name to their process ID for every active process
+        """
+        _, _, commands = self._load_processes()
+        return commands
+
+    async def _load_processes_async(self) -> typing.Tuple[
+        typing.Optional[int],
+        typing.List[typing.Dict[str, typing.Any]],
+        typing.Dict[int, str]
+    ]:
+        """
+        Gather the raw rows for every process on a worker thread so that the event loop isn't blocked
+        """
+        return await asyncio.to_thread(self._load_processes)
+
+    async def look_up_commands_async(self) -> typing.Dict[int, str]:
+        """
+        Map the command name to their process ID for every active process on a worker thread
+        """
+        return await asyncio.to_thread(self.look_up_commands)
+
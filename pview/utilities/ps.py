@@ -3,22 +3,32 @@
 """
 from __future__ import annotations
 
+import asyncio
+import collections
 import dataclasses
 import enum
 import json
+import logging
 import os
+import time
 import typing
 from typing import Iterator
 
 from typing_extensions import ParamSpec
 from typing_extensions import Concatenate
 
+import numpy
 import pandas
 import psutil
 from psutil import Process
 
 from utilities.common import ProcessOutput
 from utilities.common import run_shell_command
+from utilities.common import run_shell_command_async
+from utilities.rates import CPURateEngine
+
+if typing.TYPE_CHECKING:
+    from utilities.collectors import Collector
 
 ARGS_AND_KWARGS = ParamSpec("ARGS_AND_KWARGS")
 
@@ -36,6 +46,10 @@ class SizeUnit(enum.IntEnum):
     GB = 1024**3
 
 
+ORDERED_SIZE_UNITS: typing.Final[typing.Tuple[SizeUnit, ...]] = tuple(sorted(SizeUnit))
+"""Every unit of memory from smallest to largest"""
+
+
 def convert_memory_size(
     amount: typing.Union[float, int, None],
     from_unit: SizeUnit,
@@ -64,9 +78,8 @@ def describe_memory(amount: typing.Union[float, int, None], from_unit: SizeUnit,
         current_unit = SizeUnit.B
         current_amount = convert_memory_size(amount=amount, from_unit=from_unit, to_unit=current_unit)
 
-        while current_amount > 1024 and unit_index < len(SizeUnit) - 1:
-            next_unit_name = SizeUnit._member_names_[unit_index + 1]
-            next_unit = SizeUnit[next_unit_name]
+        while current_amount > 1024 and unit_index < len(ORDERED_SIZE_UNITS) - 1:
+            next_unit = ORDERED_SIZE_UNITS[unit_index + 1]
             current_amount = convert_memory_size(amount=current_amount, from_unit=current_unit, to_unit=next_unit)
             current_unit = next_unit
             unit_index += 1
@@ -77,6 +90,95 @@ def describe_memory(amount: typing.Union[float, int, None], from_unit: SizeUnit,
     return f"{current_amount:.2f}{current_unit.name}"
 
 
+def describe_memory_values(
+    amounts: typing.Union[typing.Sequence[typing.Union[float, int, None]], numpy.ndarray],
+    from_unit: SizeUnit,
+    to_unit: SizeUnit = None
+) -> typing.List[str]:
+    """
+    Describe many amounts of memory at once, just as `describe_memory` describes each one
+
+    The unit and scaled amount of every value are found in a single pass over the whole array, leaving only the
+    text itself to be formed per value
+
+    Example:
+        >>> describe_memory_values([512, 2048, None], SizeUnit.KB)
+        ['512.00KB', '2.00MB', '??']
+
+    :param amounts: The amounts to describe. `None` and `NaN` mark missing amounts
+    :param from_unit: The unit the amounts are in
+    :param to_unit: The unit to describe every amount in. The largest unit that keeps an amount above 1024 is
+        used for each amount if not given
+    :return: A readable description of each amount
+    """
+    byte_amounts = numpy.asarray(amounts, dtype=numpy.float64) * int(from_unit)
+
+    if to_unit is None:
+        # An amount moves up a unit for every unit it is larger than, just like the loop in `describe_memory`
+        unit_indices = numpy.zeros(byte_amounts.shape, dtype=numpy.intp)
+
+        for unit in ORDERED_SIZE_UNITS[1:]:
+            unit_indices += byte_amounts > unit
+
+        unit_sizes = numpy.array(ORDERED_SIZE_UNITS, dtype=numpy.float64)
+        scaled_amounts = byte_amounts / unit_sizes[unit_indices]
+        unit_names = [unit.name for unit in ORDERED_SIZE_UNITS]
+        names = [unit_names[unit_index] for unit_index in unit_indices.tolist()]
+        missing_description = "??"
+    else:
+        scaled_amounts = byte_amounts / int(to_unit)
+        names = [to_unit.name] * len(scaled_amounts)
+        missing_description = f"??{to_unit.name}"
+
+    return [
+        missing_description if amount != amount else f"{amount:.2f}{name}"
+        for amount, name in zip(scaled_amounts.tolist(), names)
+    ]
+
+
+def parse_duration(duration: str) -> float:
+    """
+    Convert a duration reported by `ps` into seconds
+
+    Example:
+        >>> parse_duration("01:02")
+        62.0
+        >>> parse_duration("2-03:04:05")
+        183845.0
+        >>> parse_duration("0:01.50")
+        1.5
+
+    :param duration: A duration formatted like `[[dd-]hh:]mm:ss[.ss]`
+    :return: The number of seconds in the duration
+    """
+    days = 0
+
+    if "-" in duration:
+        day_text, duration = duration.split("-", maxsplit=1)
+        days = int(day_text)
+
+    seconds = 0.0
+
+    for part in duration.split(":"):
+        seconds = seconds * 60 + float(part)
+
+    return days * 86400 + seconds
+
+
+class FoldMode(str, enum.Enum):
+    """
+    How the resource usage of child processes is folded into their parents
+    """
+    NONE = "none"
+    """Every process is reported on its own"""
+
+    CHILDREN = "children"
+    """Root processes absorb the usage of their direct children, while deeper descendants are reported on their own"""
+
+    SUBTREE = "subtree"
+    """Processes absorb the usage of every one of their descendants"""
+
+
 @dataclasses.dataclass
 class PSField:
     keyword: str
@@ -111,8 +213,22 @@ class PSField:
         return f"name: {self.name}, keyword: {self.keyword}, used in average: {self.average}, is last: {self.is_last}"
 
 
-@dataclasses.dataclass
-class ProcessEntry:
+class _CachedEntryParts:
+    """
+    Holds what `ProcessEntry` works out from its own fields outside of those fields so that the cache is never
+    compared, hashed, or serialized along with them
+    """
+    __slots__ = ("_executable_parts",)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class ProcessEntry(_CachedEntryParts):
+    """
+    The details of a single process
+
+    Entries are immutable, hashable, and slotted so that they may be shared between statuses, trees, and snapshots
+    without being copied
+    """
     process_id: int
     parent_process_id: int
     name: str
@@ -122,22 +238,26 @@ class ProcessEntry:
     memory_percent: float
     status: str
     executable: str
-    arguments: typing.Optional[typing.List[str]] = dataclasses.field(default_factory=list)
+    arguments: typing.Optional[typing.Union[typing.Tuple[str, ...], str]] = dataclasses.field(default=())
+    """The arguments passed to the executable, either one by one or as they were written on the command line"""
+    start_time: typing.Optional[float] = dataclasses.field(default=None)
+    """When the process started, in seconds. Only comparable between entries from the same collector"""
+    cpu_time: typing.Optional[float] = dataclasses.field(default=None)
+    """The total number of seconds of CPU time the process has used"""
+
+    def __post_init__(self):
+        if self.arguments is not None and not isinstance(self.arguments, (str, tuple)):
+            # Lists would leave the entry open to change and keep it from being hashed
+            object.__setattr__(self, "arguments", tuple(self.arguments))
+
+        object.__setattr__(self, "_executable_parts", None)
 
     @property
-    def copy(self):
-        return ProcessEntry(
-            process_id=self.process_id,
-            parent_process_id=self.parent_process_id,
-            name=self.name,
-            current_cpu_percent=self.current_cpu_percent,
-            user=self.user,
-            memory_percent=self.memory_percent,
-            memory_usage=self.memory_usage,
-            status=self.status,
-            executable=self.executable,
-            arguments=self.arguments
-        )
+    def copy(self) -> ProcessEntry:
+        """
+        Entries can't be changed, so the entry itself is safe to share
+        """
+        return self
 
     @property
     def memory_amount(self) -> str:
@@ -153,7 +273,7 @@ class ProcessEntry:
         cpu_percent = round(safe_data['cpu_percent'], 2) if safe_data['cpu_percent'] is not None else None
         memory_usage = safe_data['memory_info'].rss if safe_data['memory_info'] is not None else None
         memory_percent = round(safe_data['memory_percent'], 2) if safe_data['memory_percent'] is not None else None
-        arguments = safe_data['cmdline'][1:] if safe_data['cmdline'] is not None else []
+        arguments = safe_data['cmdline'][1:] if safe_data['cmdline'] is not None else ()
         exe = safe_data.get("exe")
 
         if isinstance(exe, str) and "/" in exe:
@@ -166,22 +286,18 @@ class ProcessEntry:
         pid = safe_data.get("pid")
         status = safe_data.get("status")
 
-        try:
-            return cls(
-                process_id=pid,
-                parent_process_id=ppid,
-                name=name,
-                current_cpu_percent=cpu_percent,
-                user=username,
-                memory_usage=memory_usage,
-                memory_percent=memory_percent,
-                status=status,
-                executable=exe,
-                arguments=arguments
-            )
-        except Exception as e:
-            print(process.as_dict())
-            raise
+        return cls(
+            process_id=pid,
+            parent_process_id=ppid,
+            name=name,
+            current_cpu_percent=cpu_percent,
+            user=username,
+            memory_usage=memory_usage,
+            memory_percent=memory_percent,
+            status=status,
+            executable=exe,
+            arguments=arguments
+        )
 
     @classmethod
     def from_pid(cls, pid: typing.Union[str, int, float]) -> ProcessEntry:
@@ -194,9 +310,524 @@ class ProcessEntry:
 
     @property
     def executable_parts(self) -> typing.Sequence[str]:
-        if not self.executable:
-            return []
-        return self.executable.strip().strip("/").split("/")
+        """
+        Each part of the path to the executable. Only split once since trees ask for it at every level
+        """
+        # Entries that were unpickled only get their fields back, so the cache may be missing entirely
+        parts = getattr(self, "_executable_parts", None)
+
+        if parts is None:
+            parts = tuple(self.executable.strip().strip("/").split("/")) if self.executable else tuple()
+            object.__setattr__(self, "_executable_parts", parts)
+
+        return parts
+
+
+class StringTable:
+    """
+    Stores each distinct string once and refers to it by an integer code
+    """
+    __slots__ = ("__values", "__codes")
+
+    def __init__(self):
+        self.__values: typing.List[str] = []
+        self.__codes: typing.Dict[str, int] = {}
+
+    def intern(self, value: str) -> int:
+        """
+        Get the code for a string, adding it to the table if it hasn't been seen yet
+
+        :param value: The string to store
+        :return: The code for the string
+        """
+        code = self.__codes.get(value)
+
+        if code is None:
+            code = len(self.__values)
+            self.__codes[value] = code
+            self.__values.append(value)
+
+        return code
+
+    def decode(self, codes: numpy.ndarray) -> numpy.ndarray:
+        """
+        Convert an array of codes back into their strings
+
+        :param codes: Codes issued by this table
+        :return: An object array of the matching strings
+        """
+        values = numpy.empty(len(self.__values), dtype=object)
+        values[:] = self.__values
+        return values[codes]
+
+    @property
+    def values(self) -> typing.Sequence[str]:
+        return self.__values
+
+    def __getitem__(self, code: int) -> str:
+        return self.__values[code]
+
+    def __len__(self) -> int:
+        return len(self.__values)
+
+
+class ProcessSnapshotBuilder:
+    """
+    Accumulates process data one process at a time before it is packed into a `ProcessSnapshot`
+    """
+    def __init__(self):
+        self.__process_ids: typing.List[int] = []
+        self.__parent_process_ids: typing.List[int] = []
+        self.__cpu_percents: typing.List[float] = []
+        self.__memory_usages: typing.List[int] = []
+        self.__memory_percents: typing.List[float] = []
+        self.__start_times: typing.List[float] = []
+        self.__cpu_times: typing.List[float] = []
+        self.__user_codes: typing.List[int] = []
+        self.__name_codes: typing.List[int] = []
+        self.__executable_codes: typing.List[int] = []
+        self.__state_codes: typing.List[int] = []
+        self.__arguments: typing.List[typing.Any] = []
+        self.__users = StringTable()
+        self.__commands = StringTable()
+        self.__states = StringTable()
+
+    def add(
+        self,
+        process_id: int,
+        parent_process_id: int,
+        name: str,
+        current_cpu_percent: typing.Optional[float],
+        user: str,
+        memory_usage: typing.Optional[float],
+        memory_percent: typing.Optional[float],
+        status: str,
+        executable: str,
+        arguments: typing.Any = None,
+        start_time: float = None,
+        cpu_time: float = None
+    ) -> ProcessSnapshotBuilder:
+        """
+        Add a process to the snapshot. Parameters match the fields of a `ProcessEntry`
+        """
+        self.__process_ids.append(process_id)
+        self.__parent_process_ids.append(parent_process_id)
+        self.__cpu_percents.append(numpy.nan if current_cpu_percent is None else current_cpu_percent)
+        self.__memory_usages.append(0 if memory_usage is None else memory_usage)
+        self.__memory_percents.append(numpy.nan if memory_percent is None else memory_percent)
+        self.__start_times.append(numpy.nan if start_time is None else start_time)
+        self.__cpu_times.append(numpy.nan if cpu_time is None else cpu_time)
+        self.__user_codes.append(self.__users.intern(user))
+        self.__name_codes.append(self.__commands.intern(name))
+        self.__executable_codes.append(self.__commands.intern(executable))
+        self.__state_codes.append(self.__states.intern(status))
+        self.__arguments.append(arguments)
+        return self
+
+    def add_entry(self, entry: ProcessEntry) -> ProcessSnapshotBuilder:
+        return self.add(
+            process_id=entry.process_id,
+            parent_process_id=entry.parent_process_id,
+            name=entry.name,
+            current_cpu_percent=entry.current_cpu_percent,
+            user=entry.user,
+            memory_usage=entry.memory_usage,
+            memory_percent=entry.memory_percent,
+            status=entry.status,
+            executable=entry.executable,
+            arguments=entry.arguments,
+            start_time=entry.start_time,
+            cpu_time=entry.cpu_time
+        )
+
+    def build(self) -> ProcessSnapshot:
+        """
+        Pack everything that was added into columns
+        """
+        return ProcessSnapshot(
+            process_ids=numpy.array(self.__process_ids, dtype=numpy.int64),
+            parent_process_ids=numpy.array(self.__parent_process_ids, dtype=numpy.int64),
+            cpu_percents=numpy.array(self.__cpu_percents, dtype=numpy.float64),
+            memory_usages=numpy.array(self.__memory_usages, dtype=numpy.int64),
+            memory_percents=numpy.array(self.__memory_percents, dtype=numpy.float64),
+            start_times=numpy.array(self.__start_times, dtype=numpy.float64),
+            cpu_times=numpy.array(self.__cpu_times, dtype=numpy.float64),
+            user_codes=numpy.array(self.__user_codes, dtype=numpy.int32),
+            name_codes=numpy.array(self.__name_codes, dtype=numpy.int32),
+            executable_codes=numpy.array(self.__executable_codes, dtype=numpy.int32),
+            state_codes=numpy.array(self.__state_codes, dtype=numpy.int32),
+            arguments=self.__arguments,
+            users=self.__users,
+            commands=self.__commands,
+            states=self.__states
+        )
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class SnapshotDiff:
+    """
+    The processes that started, exited, or changed between two snapshots
+
+    Processes are matched by both their ID and their start time, so a recycled process ID shows up as one
+    process exiting and another starting
+    """
+    added: typing.Sequence[ProcessEntry] = ()
+    """Processes that only appear in the newer snapshot"""
+    removed: typing.Sequence[ProcessEntry] = ()
+    """Processes that only appear in the older snapshot"""
+    changed: typing.Sequence[typing.Tuple[ProcessEntry, ProcessEntry]] = ()
+    """The older and newer entries for processes in both snapshots whose details differ"""
+
+    @property
+    def churn(self) -> int:
+        """
+        The number of processes that started, exited, or changed
+        """
+        return len(self.added) + len(self.removed) + len(self.changed)
+
+    def __bool__(self) -> bool:
+        return self.churn > 0
+
+
+class ProcessSnapshot:
+    """
+    A columnar record of every process from a single sample
+
+    Numbers are held in NumPy arrays and repeated strings (users, commands, and states) are held once in
+    string tables, so a snapshot costs far less memory than a `ProcessEntry` per process.
+    `ProcessEntry` objects are only created when a row is asked for.
+    """
+    @classmethod
+    def from_entries(cls, entries: typing.Iterable[ProcessEntry]) -> ProcessSnapshot:
+        builder = ProcessSnapshotBuilder()
+
+        for entry in entries:
+            if entry is not None:
+                builder.add_entry(entry)
+
+        return builder.build()
+
+    def __init__(
+        self,
+        process_ids: numpy.ndarray,
+        parent_process_ids: numpy.ndarray,
+        cpu_percents: numpy.ndarray,
+        memory_usages: numpy.ndarray,
+        memory_percents: numpy.ndarray,
+        start_times: numpy.ndarray,
+        cpu_times: numpy.ndarray,
+        user_codes: numpy.ndarray,
+        name_codes: numpy.ndarray,
+        executable_codes: numpy.ndarray,
+        state_codes: numpy.ndarray,
+        arguments: typing.Sequence[typing.Any],
+        users: StringTable,
+        commands: StringTable,
+        states: StringTable
+    ):
+        self.__process_ids = process_ids
+        self.__parent_process_ids = parent_process_ids
+        self.__cpu_percents = cpu_percents
+        self.__memory_usages = memory_usages
+        self.__memory_percents = memory_percents
+        self.__start_times = start_times
+        self.__cpu_times = cpu_times
+        self.__user_codes = user_codes
+        self.__name_codes = name_codes
+        self.__executable_codes = executable_codes
+        self.__state_codes = state_codes
+        self.__arguments = arguments
+        self.__users = users
+        self.__commands = commands
+        self.__states = states
+        self.__indices: typing.Optional[typing.Dict[int, int]] = None
+        self.__children_order: typing.Optional[numpy.ndarray] = None
+        self.__sorted_parent_process_ids: typing.Optional[numpy.ndarray] = None
+
+    @property
+    def process_ids(self) -> numpy.ndarray:
+        return self.__process_ids
+
+    @property
+    def parent_process_ids(self) -> numpy.ndarray:
+        return self.__parent_process_ids
+
+    @property
+    def cpu_percents(self) -> numpy.ndarray:
+        return self.__cpu_percents
+
+    @property
+    def memory_usages(self) -> numpy.ndarray:
+        """
+        The resident memory of every process in kilobytes
+        """
+        return self.__memory_usages
+
+    @property
+    def memory_percents(self) -> numpy.ndarray:
+        return self.__memory_percents
+
+    @property
+    def start_times(self) -> numpy.ndarray:
+        return self.__start_times
+
+    @property
+    def cpu_times(self) -> numpy.ndarray:
+        return self.__cpu_times
+
+    @property
+    def users(self) -> numpy.ndarray:
+        """
+        The user of every process
+        """
+        return self.__users.decode(self.__user_codes)
+
+    @property
+    def names(self) -> numpy.ndarray:
+        """
+        The name of every process
+        """
+        return self.__commands.decode(self.__name_codes)
+
+    @property
+    def executables(self) -> numpy.ndarray:
+        """
+        The command behind every process
+        """
+        return self.__commands.decode(self.__executable_codes)
+
+    @property
+    def states(self) -> numpy.ndarray:
+        """
+        The state of every process
+        """
+        return self.__states.decode(self.__state_codes)
+
+    @property
+    def arguments(self) -> typing.Sequence[typing.Any]:
+        return self.__arguments
+
+    def index_of(self, process_id: int) -> typing.Optional[int]:
+        """
+        Find the row for a process
+
+        :param process_id: The ID of the process
+        :return: The index of the row for the process, if it is present
+        """
+        if self.__indices is None:
+            self.__indices = {
+                process_id: index
+                for index, process_id in enumerate(self.__process_ids.tolist())
+            }
+
+        return self.__indices.get(process_id)
+
+    def child_indices(self, parent_id: int) -> numpy.ndarray:
+        """
+        Find the rows for every process directly started by the given process
+
+        :param parent_id: The ID of the parent process
+        :return: The indices of the rows for each child process
+        """
+        if self.__children_order is None:
+            self.__children_order = numpy.argsort(self.__parent_process_ids, kind="stable")
+            self.__sorted_parent_process_ids = self.__parent_process_ids[self.__children_order]
+
+        first = numpy.searchsorted(self.__sorted_parent_process_ids, parent_id, side="left")
+        last = numpy.searchsorted(self.__sorted_parent_process_ids, parent_id, side="right")
+        return self.__children_order[first:last]
+
+    def entry(self, index: int) -> ProcessEntry:
+        """
+        Create a `ProcessEntry` for a single row
+        """
+        return ProcessEntry(
+            process_id=int(self.__process_ids[index]),
+            parent_process_id=int(self.__parent_process_ids[index]),
+            name=self.__commands[self.__name_codes[index]],
+            current_cpu_percent=_optional_number(self.__cpu_percents[index]),
+            user=self.__users[self.__user_codes[index]],
+            memory_usage=int(self.__memory_usages[index]),
+            memory_percent=_optional_number(self.__memory_percents[index]),
+            status=self.__states[self.__state_codes[index]],
+            executable=self.__commands[self.__executable_codes[index]],
+            arguments=self.__arguments[index],
+            start_time=_optional_number(self.__start_times[index]),
+            cpu_time=_optional_number(self.__cpu_times[index])
+        )
+
+    def get(self, process_id: int) -> typing.Optional[ProcessEntry]:
+        index = self.index_of(process_id)
+        return self.entry(index) if index is not None else None
+
+    def take(self, indices: typing.Union[numpy.ndarray, typing.Sequence[int]]) -> ProcessSnapshot:
+        """
+        Create a snapshot containing only the given rows. String tables are shared rather than copied
+
+        :param indices: The indices of the rows to keep, or a boolean mask of the rows to keep
+        :return: A new snapshot with just the given rows
+        """
+        indices = numpy.asarray(indices)
+
+        if indices.dtype == bool:
+            indices = numpy.flatnonzero(indices)
+
+        return ProcessSnapshot(
+            process_ids=self.__process_ids[indices],
+            parent_process_ids=self.__parent_process_ids[indices],
+            cpu_percents=self.__cpu_percents[indices],
+            memory_usages=self.__memory_usages[indices],
+            memory_percents=self.__memory_percents[indices],
+            start_times=self.__start_times[indices],
+            cpu_times=self.__cpu_times[indices],
+            user_codes=self.__user_codes[indices],
+            name_codes=self.__name_codes[indices],
+            executable_codes=self.__executable_codes[indices],
+            state_codes=self.__state_codes[indices],
+            arguments=[self.__arguments[index] for index in indices.tolist()],
+            users=self.__users,
+            commands=self.__commands,
+            states=self.__states
+        )
+
+    def exclude(self, process_ids: typing.Collection[int]) -> ProcessSnapshot:
+        """
+        Create a snapshot without the given processes
+
+        :param process_ids: The IDs of the processes to leave out
+        :return: A new snapshot without the given processes
+        """
+        if not process_ids:
+            return self
+
+        return self.take(~numpy.isin(self.__process_ids, list(process_ids)))
+
+    def diff(self, previous: ProcessSnapshot, start_time_tolerance: float = None) -> SnapshotDiff:
+        """
+        Find the processes that started, exited, or changed since an older snapshot
+
+        Columns are compared all at once, so `ProcessEntry` objects are only created for processes that differ.
+        CPU time is not compared since it only feeds the CPU percentage, which is compared instead
+
+        :param previous: The older snapshot
+        :param start_time_tolerance: How many seconds two start times may differ while still referring to the
+            same process. Needed when start times are derived from coarse elapsed times
+        :return: What changed between the older snapshot and this one
+        """
+        start_time_tolerance = start_time_tolerance or 0.0
+
+        _, previous_indices, current_indices = numpy.intersect1d(
+            previous.__process_ids,
+            self.__process_ids,
+            assume_unique=True,
+            return_indices=True
+        )
+
+        previous_start_times = previous.__start_times[previous_indices]
+        current_start_times = self.__start_times[current_indices]
+        is_same_process = numpy.abs(previous_start_times - current_start_times) <= start_time_tolerance
+        is_same_process |= numpy.isnan(previous_start_times) & numpy.isnan(current_start_times)
+
+        previous_indices = previous_indices[is_same_process]
+        current_indices = current_indices[is_same_process]
+
+        is_changed = numpy.zeros(len(previous_indices), dtype=bool)
+
+        for previous_column, current_column in (
+            (previous.__parent_process_ids, self.__parent_process_ids),
+            (previous.__cpu_percents, self.__cpu_percents),
+            (previous.__memory_usages, self.__memory_usages),
+            (previous.__memory_percents, self.__memory_percents),
+        ):
+            previous_values = previous_column[previous_indices]
+            current_values = current_column[current_indices]
+            differs = previous_values != current_values
+
+            # A missing value is stored as NaN, which never equals itself
+            if previous_values.dtype.kind == "f":
+                differs &= ~(numpy.isnan(previous_values) & numpy.isnan(current_values))
+
+            is_changed |= differs
+
+        # Codes from different snapshots may come from different tables, so the strings themselves are compared
+        for previous_table, previous_codes, current_table, current_codes in (
+            (previous.__users, previous.__user_codes, self.__users, self.__user_codes),
+            (previous.__commands, previous.__name_codes, self.__commands, self.__name_codes),
+            (previous.__commands, previous.__executable_codes, self.__commands, self.__executable_codes),
+            (previous.__states, previous.__state_codes, self.__states, self.__state_codes),
+        ):
+            if previous_table is current_table:
+                is_changed |= previous_codes[previous_indices] != current_codes[current_indices]
+            else:
+                is_changed |= (
+                    previous_table.decode(previous_codes[previous_indices])
+                    != current_table.decode(current_codes[current_indices])
+                )
+
+        is_changed |= numpy.fromiter(
+            (
+                previous.__arguments[previous_index] != self.__arguments[current_index]
+                for previous_index, current_index in zip(previous_indices.tolist(), current_indices.tolist())
+            ),
+            dtype=bool,
+            count=len(previous_indices)
+        )
+
+        is_removed = numpy.ones(len(previous), dtype=bool)
+        is_removed[previous_indices] = False
+        is_added = numpy.ones(len(self), dtype=bool)
+        is_added[current_indices] = False
+
+        return SnapshotDiff(
+            added=tuple(self.entry(index) for index in numpy.flatnonzero(is_added).tolist()),
+            removed=tuple(previous.entry(index) for index in numpy.flatnonzero(is_removed).tolist()),
+            changed=tuple(
+                (previous.entry(previous_index), self.entry(current_index))
+                for previous_index, current_index in zip(
+                    previous_indices[is_changed].tolist(),
+                    current_indices[is_changed].tolist()
+                )
+            )
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The number of bytes held by the numeric columns
+        """
+        return sum(
+            column.nbytes
+            for column in (
+                self.__process_ids,
+                self.__parent_process_ids,
+                self.__cpu_percents,
+                self.__memory_usages,
+                self.__memory_percents,
+                self.__start_times,
+                self.__cpu_times,
+                self.__user_codes,
+                self.__name_codes,
+                self.__executable_codes,
+                self.__state_codes,
+            )
+        )
+
+    def __len__(self) -> int:
+        return len(self.__process_ids)
+
+    def __contains__(self, process_id: int) -> bool:
+        return self.index_of(process_id) is not None
+
+    def __iter__(self) -> Iterator[ProcessEntry]:
+        return (self.entry(index) for index in range(len(self)))
+
+
+def _optional_number(value: numpy.floating) -> typing.Optional[float]:
+    """
+    Convert a value from a numeric column back into a plain number, with `NaN` marking a missing value
+    """
+    value = float(value)
+    return None if value != value else value
 
 
 class ProcessStatus:
@@ -204,71 +835,111 @@ class ProcessStatus:
     A programmatic implementation of the `ps` command
     """
     @classmethod
-    def latest(cls) -> ProcessStatus:
-        return cls()
+    def latest(cls, collector: Collector = None) -> ProcessStatus:
+        return cls(collector=collector)
 
-    def __init__(self, include_self: bool = None):
-        recorded_processes: typing.Dict[int, ProcessEntry] = PSTableGenerator.get_entries()
+    def __init__(self, include_self: bool = None, collector: Collector = None, snapshot: ProcessSnapshot = None):
+        """
+        Constructor
 
-        self.__processes: typing.Dict[int, ProcessEntry] = {
-            pid: process
-            for pid, process in recorded_processes.items()
-            if process is not None
-        }
+        :param include_self: Whether to keep this application and its ancestors within the results
+        :param collector: The collector used to read process data. The shared default collector is used if none
+            is given
+        :param snapshot: Previously collected process data to use instead of collecting new data
+        """
+        if snapshot is None and collector is None:
+            # Imported here since collectors are built on top of this module
+            from utilities.collectors import get_default_collector
+            snapshot = get_default_collector().collect()
+        elif snapshot is None:
+            snapshot = collector.collect()
 
         if not include_self:
+            ignored_ids: typing.List[int] = []
             current_pid = os.getpid()
 
-            while current_pid != 1 and current_pid in self.__processes:
-                current_process = self.__processes.pop(current_pid, None)
-                print(f"Ignoring {current_process}")
-                if current_process is None:
-                    current_pid = 1
-                else:
-                    current_pid = current_process.parent_process_id
+            while current_pid != 1 and current_pid in snapshot and current_pid not in ignored_ids:
+                current_process = snapshot.get(current_pid)
+                logging.debug(f"Ignoring {current_process}")
+                ignored_ids.append(current_pid)
+                current_pid = current_process.parent_process_id
+
+            snapshot = snapshot.exclude(ignored_ids)
+
+        self.__snapshot = snapshot
+
+    @property
+    def snapshot(self) -> ProcessSnapshot:
+        """
+        The columnar process data behind this status
+        """
+        return self.__snapshot
+
+    def get_direct_child_processes(self, parent_id: int) -> typing.Sequence[ProcessEntry]:
+        """
+        Get the processes whose parent is the given process
+
+        :param parent_id: The ID of the parent process
+        :return: Every process that was directly started by the parent
+        """
+        return [
+            self.__snapshot.entry(index)
+            for index in self.__snapshot.child_indices(parent_id).tolist()
+        ]
 
     def get_child_processes(self, parent_id: int) -> typing.Iterable[ProcessEntry]:
+        """
+        Get every descendant of a process
+
+        :param parent_id: The ID of the process whose descendants to find
+        :return: Every process that descends from the given process
+        """
         ids_to_check: typing.List[int] = [parent_id]
-        checked_ids: typing.List[int] = []
-        child_processes: typing.List[ProcessEntry] = []
+        checked_ids: typing.Set[int] = {parent_id}
+        child_indices: typing.List[int] = []
+        process_ids = self.__snapshot.process_ids
 
         while ids_to_check:
             id_to_check = ids_to_check.pop()
 
-            for process in self.processes:
-                if process.parent_process_id == id_to_check and process not in child_processes:
-                    child_processes.append(process)
-                    ids_to_check.append(process.process_id)
+            for index in self.__snapshot.child_indices(id_to_check).tolist():
+                process_id = int(process_ids[index])
 
-            checked_ids.append(id_to_check)
+                # A process reported as its own ancestor would otherwise be visited forever
+                if process_id not in checked_ids:
+                    checked_ids.add(process_id)
+                    child_indices.append(index)
+                    ids_to_check.append(process_id)
 
-        return child_processes
+        return [self.__snapshot.entry(index) for index in child_indices]
 
     def __contains__(self, item):
-        return item in self.__processes
+        return item in self.__snapshot
 
     def __getitem__(self, __k: int) -> ProcessEntry:
-        return self.__processes[__k]
+        entry = self.__snapshot.get(__k)
+
+        if entry is None:
+            raise KeyError(__k)
+
+        return entry
 
     def __len__(self) -> int:
-        return len(self.__processes)
+        return len(self.__snapshot)
 
     def __iter__(self) -> Iterator[ProcessEntry]:
-        return iter(self.__processes.values())
+        return iter(self.__snapshot)
 
     @property
     def processes(self) -> typing.Sequence[ProcessEntry]:
-        return [
-            process.copy
-            for process in self.__processes.values()
-        ]
+        return list(self.__snapshot)
 
     @property
     def pids(self) -> typing.Sequence[int]:
-        return [pid for pid in self.__processes.keys()]
+        return self.__snapshot.process_ids.tolist()
 
     def get_by_pid(self, pid: int) -> typing.Optional[ProcessEntry]:
-        return self.__processes.get(pid)
+        return self.__snapshot.get(pid)
 
 
 def interpret_state(state: str) -> str:
@@ -284,6 +955,12 @@ def interpret_state(state: str) -> str:
     - U       Marks a process in uninterruptible wait.
     - Z       Marks a dead process (a “zombie”).
 
+    Linux reports a few additional run states:
+
+    - D       Marks a process in uninterruptible sleep (usually IO).
+    - t       Marks a process stopped by a debugger during tracing.
+    - X       Marks a dead process.
+
     Additional characters after these, if any, indicate additional state information:
 
     - +       The process is in the foreground process group of its control terminal.
@@ -312,6 +989,9 @@ def interpret_state(state: str) -> str:
         "S": "Sleeping",
         "T": "Stopped",
         "U": "Waiting",
+        "D": "Waiting",
+        "t": "Stopped",
+        "X": "Dead",
         "Z": "Zombie"
     }
 
@@ -330,7 +1010,7 @@ def interpret_state(state: str) -> str:
         "X": "Currently debugging"
     }
 
-    status = overall_map[state[0]]
+    status = overall_map.get(state[0], state[0])
 
     for character in state[1:]:
         if character in additional_status_map:
@@ -451,6 +1131,44 @@ class PSTableGenerator:
     def memory_format(cls) -> str:
         return f"rss={cls.memory_column()}"
 
+    @classmethod
+    def cpu_time_column(cls) -> str:
+        """
+        The name of the column containing the total CPU time used by a process
+        """
+        return "TIME"
+
+    @classmethod
+    def cpu_time_format(cls) -> str:
+        return f"time={cls.cpu_time_column()}"
+
+    @classmethod
+    def elapsed_time_column(cls) -> str:
+        """
+        The name of the column containing how long a process has been running
+        """
+        return "ELAPSED"
+
+    @classmethod
+    def elapsed_time_format(cls) -> str:
+        return f"etime={cls.elapsed_time_column()}"
+
+    @classmethod
+    def start_time_column(cls) -> str:
+        """
+        The name of the column containing when a process started
+        """
+        return "START"
+
+    @classmethod
+    def start_time_tolerance(cls) -> float:
+        """
+        How many seconds two start times for the same process may differ between samples
+
+        `ps` only reports elapsed time to the second, so start times derived from it may drift by a second or two
+        """
+        return 2.0
+
     @classmethod
     def arguments_column(cls) -> str:
         """
@@ -485,20 +1203,45 @@ class PSTableGenerator:
                f"{cls.memory_percent_format()}," \
                f"{cls.memory_format()}," \
                f"{cls.state_format()}," \
+               f"{cls.cpu_time_format()}," \
+               f"{cls.elapsed_time_format()}," \
                f"{cls.command_and_args_format()}"
 
-    def __init__(self, run_command: typing.Callable[Concatenate[str, ARGS_AND_KWARGS], ProcessOutput] = None):
+    def __init__(
+        self,
+        run_command: typing.Callable[Concatenate[str, ARGS_AND_KWARGS], ProcessOutput] = None,
+        fold_mode: typing.Union[FoldMode, str] = None,
+        run_command_async: typing.Callable[
+            Concatenate[str, ARGS_AND_KWARGS],
+            typing.Awaitable[ProcessOutput]
+        ] = None
+    ):
         """
         Constructor
 
         Prepare the generator to run `ps` and interpret the results
 
         :param run_command: The function used to call the `ps` Shell command
+        :param fold_mode: How the usage of child processes should be folded into their parents
+        :param run_command_async: The coroutine function used to call the `ps` Shell command without blocking
         """
         if run_command is None:
             run_command = run_shell_command
 
+        if run_command_async is None:
+            run_command_async = run_shell_command_async
+
         self.__run_command = run_command
+        self.__run_command_async = run_command_async
+        self.__fold_mode = FoldMode(fold_mode) if fold_mode else FoldMode.CHILDREN
+        self.__cpu_rates = CPURateEngine(start_time_tolerance=self.start_time_tolerance())
+
+    @property
+    def fold_mode(self) -> FoldMode:
+        """
+        How the usage of child processes is folded into their parents
+        """
+        return self.__fold_mode
 
     def _parse_ps(self, command: str = None) -> typing.Tuple[int, typing.List[typing.Dict[str, typing.Any]]]:
         """
@@ -507,8 +1250,30 @@ class PSTableGenerator:
         :param command: The shell command that will yield data to be parsed
         :return: A list of all the rows returned by `ps` with each column value matched to its column name
         """
-        ps_output = self.__run_command(command=command)
+        return self._interpret_ps_output(self.__run_command(command=command))
 
+    async def _parse_ps_async(
+        self,
+        command: str = None
+    ) -> typing.Tuple[int, typing.List[typing.Dict[str, typing.Any]]]:
+        """
+        Call `ps` without blocking the event loop and interpret the result individual lines
+
+        :param command: The shell command that will yield data to be parsed
+        :return: A list of all the rows returned by `ps` with each column value matched to its column name
+        """
+        return self._interpret_ps_output(await self.__run_command_async(command=command))
+
+    def _interpret_ps_output(
+        self,
+        ps_output: ProcessOutput
+    ) -> typing.Tuple[int, typing.List[typing.Dict[str, typing.Any]]]:
+        """
+        Split the output of `ps` into rows keyed by column name
+
+        :param ps_output: The output of a call to `ps`
+        :return: The ID of the `ps` process and a list of all the rows returned by `ps`
+        """
         # Split stdout from `ps` into the individual lines represented on screen
         output = ps_output.stdout.splitlines()
 
@@ -568,6 +1333,16 @@ class PSTableGenerator:
             }
         """
         command_id, result = self._parse_ps(self.command_shell_command())
+        return self._map_commands(command_id, result)
+
+    async def look_up_commands_async(self) -> typing.Dict[int, str]:
+        """
+        Map the command name to their process ID for every active process without blocking the event loop
+        """
+        command_id, result = await self._parse_ps_async(self.command_shell_command())
+        return self._map_commands(command_id, result)
+
+    def _map_commands(self, command_id: int, result: typing.Sequence[typing.Dict[str, str]]) -> typing.Dict[int, str]:
         command_map = {
             int(float(pid_and_command[self.process_id_column()])): pid_and_command[self.command_column()]
             for pid_and_command in result
@@ -575,6 +1350,40 @@ class PSTableGenerator:
         }
         return command_map
 
+    def _load_processes(self) -> typing.Tuple[
+        typing.Optional[int],
+        typing.List[typing.Dict[str, typing.Any]],
+        typing.Dict[int, str]
+    ]:
+        """
+        Gather the raw rows for every process along with the command behind every process ID
+
+        :return: The ID of the process used to gather the data (if any), the raw rows keyed by column name,
+            and a map of process IDs to their commands
+        """
+        command_id, all_processes = self._parse_ps(self.ps_shell_command())
+        commands = self.look_up_commands()
+        return command_id, all_processes, commands
+
+    async def _load_processes_async(self) -> typing.Tuple[
+        typing.Optional[int],
+        typing.List[typing.Dict[str, typing.Any]],
+        typing.Dict[int, str]
+    ]:
+        """
+        Gather the raw rows for every process along with the command behind every process ID without blocking
+
+        Both calls to `ps` are made at the same time
+
+        :return: The ID of the process used to gather the data (if any), the raw rows keyed by column name,
+            and a map of process IDs to their commands
+        """
+        (command_id, all_processes), commands = await asyncio.gather(
+            self._parse_ps_async(self.ps_shell_command()),
+            self.look_up_commands_async()
+        )
+        return command_id, all_processes, commands
+
     def create_process_list(
         self,
         exclude_ids: typing.Union[int, typing.Collection[int]] = None
@@ -585,14 +1394,46 @@ class PSTableGenerator:
         :param exclude_ids: process IDs to exclude
         :return: A list of details for each process from a `ps` command invocation
         """
-        command_id, all_processes = self._parse_ps(self.ps_shell_command())
-        commands = self.look_up_commands()
+        command_id, all_processes, commands = self._load_processes()
+        return self._convert_processes(command_id, all_processes, commands, exclude_ids=exclude_ids)
 
-        final_processes: typing.Dict[int, typing.Dict[str, typing.Any]] = {}
+    async def create_process_list_async(
+        self,
+        exclude_ids: typing.Union[int, typing.Collection[int]] = None
+    ) -> typing.List[typing.Dict[str, typing.Any]]:
+        """
+        Get a list of each entry from a `ps` command without blocking the event loop
 
-        for process in all_processes:
-            process = {key: value for key, value in process.items()}
+        :param exclude_ids: process IDs to exclude
+        :return: A list of details for each process from a `ps` command invocation
+        """
+        command_id, all_processes, commands = await self._load_processes_async()
+        return self._convert_processes(command_id, all_processes, commands, exclude_ids=exclude_ids)
+
+    def _convert_processes(
+        self,
+        command_id: typing.Optional[int],
+        all_processes: typing.List[typing.Dict[str, typing.Any]],
+        commands: typing.Dict[int, str],
+        exclude_ids: typing.Union[int, typing.Collection[int]] = None
+    ) -> typing.List[typing.Dict[str, typing.Any]]:
+        """
+        Convert raw rows into typed values, then apply CPU rates and folding
+
+        :param command_id: The ID of the process used to gather the data, if any
+        :param all_processes: The raw rows for every process keyed by column name
+        :param commands: The command behind every process ID
+        :param exclude_ids: process IDs to exclude
+        :return: A list of details for each process
+        """
+        sampled_at = time.time()
+
+        if isinstance(exclude_ids, int):
+            exclude_ids = {exclude_ids}
+
+        processes: typing.Dict[int, typing.Dict[str, typing.Any]] = {}
 
+        for process in all_processes:
             process_id = int(float(process[self.process_id_column()]))
 
             if process_id == command_id:
@@ -606,13 +1447,15 @@ class PSTableGenerator:
             if not command:
                 continue
 
-            parent_process_id = int(float(process[self.parent_process_id_column()]))
-
             process[self.process_id_column()] = process_id
-            process[self.arguments_column()] = process[self.command_column()].replace(command, "").strip()
+
+            if self.arguments_column() not in process:
+                # `ps` only reports the whole command line, so the command has to be cut out of it
+                process[self.arguments_column()] = process[self.command_column()].replace(command, "").strip()
+
             process[self.command_column()] = command
             process[self.cpu_percent_column()] = float(process[self.cpu_percent_column()])
-            process[self.parent_process_id_column()] = parent_process_id
+            process[self.parent_process_id_column()] = int(float(process[self.parent_process_id_column()]))
             process[self.memory_column()] = int(float(process[self.memory_column()]))
             process[self.memory_percent_column()] = float(process[self.memory_percent_column()])
 
@@ -620,32 +1463,121 @@ class PSTableGenerator:
                 state = process[self.state_column()]
                 process[self.state_column()] = interpret_state(state)
 
-            if parent_process_id > 2 and parent_process_id in final_processes:
-                parent_process = final_processes.get(parent_process_id)
-                parent_process[self.cpu_percent_column()] += process[self.cpu_percent_column()]
-                parent_process[self.memory_column()] += process[self.memory_column()]
-                parent_process[self.memory_percent_column()] += process[self.memory_percent_column()]
+            if isinstance(process.get(self.cpu_time_column()), str):
+                process[self.cpu_time_column()] = parse_duration(process[self.cpu_time_column()])
+
+            if self.start_time_column() not in process and self.elapsed_time_column() in process:
+                process[self.start_time_column()] = sampled_at - parse_duration(process[self.elapsed_time_column()])
+
+            processes[process_id] = process
+
+        self.apply_cpu_rates(processes)
+
+        return self.fold_processes(processes)
+
+    def apply_cpu_rates(self, processes: typing.Dict[int, typing.Dict[str, typing.Any]]):
+        """
+        Replace the lifetime CPU percentages of processes with how much CPU they used since the previous sample
+
+        Processes that weren't present in the previous sample keep their lifetime average,
+        which covers the entire time since they started
+
+        :param processes: Converted rows for every process keyed by process ID
+        """
+        cpu_time_column = self.cpu_time_column()
+        start_time_column = self.start_time_column()
+
+        rates = self.__cpu_rates.update(
+            (process_id, process[start_time_column], process[cpu_time_column])
+            for process_id, process in processes.items()
+            if process.get(cpu_time_column) is not None and process.get(start_time_column) is not None
+        )
+
+        cpu_percent_column = self.cpu_percent_column()
+
+        for process_id, rate in rates.items():
+            if rate is not None:
+                processes[process_id][cpu_percent_column] = round(rate, 2)
+
+    def fold_processes(
+        self,
+        processes: typing.Dict[int, typing.Dict[str, typing.Any]]
+    ) -> typing.List[typing.Dict[str, typing.Any]]:
+        """
+        Fold the resource usage of child processes into their parents based on the generator's fold mode
+
+        A process may be folded into its parent as long as its parent is present and isn't `init` or `kthreadd`.
+        Processes that may not be folded are treated as roots. Every process is visited in breadth first order
+        starting from the roots, then usage is totalled from the bottom up, so the results do not depend
+        on the order that the processes were read in.
+
+        :param processes: Converted rows for every process keyed by process ID
+        :return: The rows that remain after folding
+        """
+        if self.__fold_mode == FoldMode.NONE:
+            return list(processes.values())
+
+        parent_process_id_column = self.parent_process_id_column()
+        children: typing.Dict[int, typing.List[int]] = collections.defaultdict(list)
+        roots: typing.List[int] = []
+
+        for process_id, process in processes.items():
+            parent_process_id = process[parent_process_id_column]
+
+            if parent_process_id > 2 and parent_process_id in processes and parent_process_id != process_id:
+                children[parent_process_id].append(process_id)
             else:
-                final_processes[process_id] = process
+                roots.append(process_id)
 
-                if process_id > 2:
-                    processes_to_remove: typing.List[typing.Dict[str, typing.Any]] = [
-                        existing_process
-                        for existing_process in final_processes.values()
-                        if existing_process[self.parent_process_id_column()] == process_id
-                    ]
+        # Each entry is a process ID paired with its distance from its root
+        ordered_processes: typing.List[typing.Tuple[int, int]] = [(process_id, 0) for process_id in roots]
+        order_index = 0
 
-                    for process_to_remove in processes_to_remove:
-                        process[self.cpu_percent_column()] += process_to_remove[self.cpu_percent_column()]
-                        process[self.memory_column()] += process_to_remove[self.memory_column()]
-                        process[self.memory_percent_column()] += process_to_remove[self.memory_percent_column()]
+        while order_index < len(ordered_processes):
+            process_id, depth = ordered_processes[order_index]
+            ordered_processes.extend(
+                (child_id, depth + 1)
+                for child_id in children.get(process_id, ())
+            )
+            order_index += 1
+
+        summed_columns = (self.cpu_percent_column(), self.memory_column(), self.memory_percent_column())
+        kept_processes: typing.List[typing.Dict[str, typing.Any]] = []
 
-                        del final_processes[process_to_remove[self.process_id_column()]]
+        # Children come after their parents, so walking backwards totals each subtree before its parent is reached
+        for process_id, depth in reversed(ordered_processes):
+            process = processes[process_id]
 
-        return list(final_processes.values())
+            if depth == 0:
+                kept_processes.append(process)
+            elif self.__fold_mode == FoldMode.SUBTREE or depth == 1:
+                # When only folding direct children, only the children of roots are folded and everything deeper
+                # stands on its own
+                parent_process = processes[process[parent_process_id_column]]
+
+                for column in summed_columns:
+                    parent_process[column] += process[column]
+            else:
+                kept_processes.append(process)
+
+        kept_processes.reverse()
+        return kept_processes
 
     def create_frame(self, exclude_ids: typing.Union[int, typing.Collection[int]] = None) -> pandas.DataFrame:
-        return pandas.DataFrame(self.create_process_list(exclude_ids=exclude_ids))
+        snapshot = self.create_snapshot(exclude_ids=exclude_ids)
+        return pandas.DataFrame({
+            self.user_column(): snapshot.users,
+            self.process_id_column(): snapshot.process_ids,
+            self.parent_process_id_column(): snapshot.parent_process_ids,
+            self.cpu_percent_column(): snapshot.cpu_percents,
+            self.memory_percent_column(): snapshot.memory_percents,
+            self.memory_column(): snapshot.memory_usages,
+            self.state_column(): snapshot.states,
+            self.cpu_time_column(): snapshot.cpu_times,
+            self.start_time_column(): snapshot.start_times,
+            self.command_column(): snapshot.executables,
+            self.arguments_column(): snapshot.arguments,
+        })
 
     @classmethod
     def get_frame(
@@ -689,12 +1621,56 @@ class PSTableGenerator:
                 memory_percent=process[self.memory_percent_column()],
                 status=process[self.state_column()],
                 executable=process[self.command_column()],
-                arguments=process[self.arguments_column()]
+                arguments=process[self.arguments_column()],
+                start_time=process.get(self.start_time_column()),
+                cpu_time=process.get(self.cpu_time_column())
             )
             entries[entry.process_id] = entry
 
         return entries
 
+    def create_snapshot(self, exclude_ids: typing.Union[int, typing.Collection[int]] = None) -> ProcessSnapshot:
+        """
+        Gather every process into a columnar snapshot
+
+        :param exclude_ids: process IDs to exclude
+        :return: A snapshot of every process
+        """
+        return self._pack_snapshot(self.create_process_list(exclude_ids=exclude_ids))
+
+    async def create_snapshot_async(
+        self,
+        exclude_ids: typing.Union[int, typing.Collection[int]] = None
+    ) -> ProcessSnapshot:
+        """
+        Gather every process into a columnar snapshot without blocking the event loop
+
+        :param exclude_ids: process IDs to exclude
+        :return: A snapshot of every process
+        """
+        return self._pack_snapshot(await self.create_process_list_async(exclude_ids=exclude_ids))
+
+    def _pack_snapshot(self, processes: typing.Iterable[typing.Dict[str, typing.Any]]) -> ProcessSnapshot:
+        builder = ProcessSnapshotBuilder()
+
+        for process in processes:
+            builder.add(
+                process_id=process[self.process_id_column()],
+                parent_process_id=process[self.parent_process_id_column()],
+                name=process[self.command_column()],
+                current_cpu_percent=process[self.cpu_percent_column()],
+                user=process[self.user_column()],
+                memory_usage=process[self.memory_column()],
+                memory_percent=process[self.memory_percent_column()],
+                status=process[self.state_column()],
+                executable=process[self.command_column()],
+                arguments=process[self.arguments_column()],
+                start_time=process.get(self.start_time_column()),
+                cpu_time=process.get(self.cpu_time_column())
+            )
+
+        return builder.build()
+
     @classmethod
     def get_entries(
         cls,
@@ -714,4 +1690,110 @@ class PSTableGenerator:
         exclude_ids: typing.Union[int, typing.Collection[int]] = None
     ) -> str:
         generator = cls(run_command=run_command)
-        return generator.create_json(exclude_ids=exclude_ids)
\ No newline at end of file
+        return generator.create_json(exclude_ids=exclude_ids)
+
+PSUTIL_STATES: typing.Final[typing.Mapping[str, str]] = {
+    psutil.STATUS_RUNNING: "R",
+    psutil.STATUS_SLEEPING: "S",
+    psutil.STATUS_DISK_SLEEP: "D",
+    psutil.STATUS_STOPPED: "T",
+    psutil.STATUS_TRACING_STOP: "t",
+    psutil.STATUS_ZOMBIE: "Z",
+    psutil.STATUS_DEAD: "X",
+    psutil.STATUS_IDLE: "I",
+}
+"""A mapping from the statuses reported by psutil to the state characters reported by `ps`"""
+
+
+class PsutilTableGenerator(PSTableGenerator):
+    """
+    Structure used to form the same results as the `ps` command through psutil
+    """
+    @classmethod
+    def start_time_tolerance(cls) -> float:
+        return 0.0
+
+    PROCESS_ATTRIBUTES: typing.Final[typing.Sequence[str]] = (
+        "pid",
+        "ppid",
+        "username",
+        "cpu_percent",
+        "memory_percent",
+        "memory_info",
+        "status",
+        "exe",
+        "name",
+        "cmdline",
+        "cpu_times",
+        "create_time",
+    )
+    """The attributes to read from every process"""
+
+    def _load_processes(self) -> typing.Tuple[
+        typing.Optional[int],
+        typing.List[typing.Dict[str, typing.Any]],
+        typing.Dict[int, str]
+    ]:
+        """
+        Gather the raw rows for every process along with the command behind every process ID
+
+        psutil keeps track of the processes it has already seen, so CPU percentages are measured
+        since the previous call on the same generator
+
+        :return: Nothing for the ID of the process used to gather data since no process is created,
+            the raw rows keyed by column name, and a map of process IDs to their commands
+        """
+        rows: typing.List[typing.Dict[str, typing.Any]] = []
+        commands: typing.Dict[int, str] = {}
+
+        for process in psutil.process_iter(attrs=self.PROCESS_ATTRIBUTES, ad_value=None):
+            process_data = process.info
+            command_line = process_data["cmdline"] or []
+            command = process_data["exe"] or process_data["name"]
+
+            if not command:
+                continue
+
+            memory_info = process_data["memory_info"]
+            cpu_times = process_data["cpu_times"]
+
+            rows.append({
+                self.user_column(): process_data["username"] or "?",
+                self.process_id_column(): process_data["pid"],
+                self.parent_process_id_column(): process_data["ppid"] or 0,
+                self.cpu_percent_column(): process_data["cpu_percent"] or 0.0,
+                self.memory_percent_column(): process_data["memory_percent"] or 0.0,
+                self.memory_column(): memory_info.rss // SizeUnit.KB if memory_info is not None else 0,
+                self.state_column(): PSUTIL_STATES.get(process_data["status"], ""),
+                self.cpu_time_column(): cpu_times.user + cpu_times.system if cpu_times is not None else None,
+                self.start_time_column(): process_data["create_time"],
+                self.command_and_args_column(): " ".join(command_line) if command_line else command,
+                # psutil splits the command line already, so the arguments are everything after argv[0]
+                self.arguments_column(): " ".join(command_line[1:]),
+            })
+            commands[process_data["pid"]] = command
+
+        return None, rows, commands
+
+    def look_up_commands(self) -> typing.Dict[int, str]:
+        """
+        Map the command name to their process ID for every active process
+        """
+        _, _, commands = self._load_processes()
+        return commands
+
+    async def _load_processes_async(self) -> typing.Tuple[
+        typing.Optional[int],
+        typing.List[typing.Dict[str, typing.Any]],
+        typing.Dict[int, str]
+    ]:
+        """
+        Gather the raw rows for every process on a worker thread so that the event loop isn't blocked
+        """
+        return await asyncio.to_thread(self._load_processes)
+
+    async def look_up_commands_async(self) -> typing.Dict[int, str]:
+        """
+        Map the command name to their process ID for every active process on a worker thread
+        """
+        return await asyncio.to_thread(self.look_up_commands)
@@ -0,0 +1,80 @@
+"""
+Tracks CPU time across samples so that usage may be reported for the time between samples
+rather than averaged over the lifetime of each process
+"""
+from __future__ import annotations
+
+import time
+import typing
+
+CPU_SAMPLE = typing.Tuple[int, float, float]
+"""The process ID, start time, and total seconds of CPU time used by a process"""
+
+
+class CPURateEngine:
+    """
+    Computes the percentage of a CPU used by each process since the previous sample
+
+    Processes are identified by both their ID and their start time so that a recycled process ID is
+    treated as a brand new process rather than a continuation of the one that used it before
+    """
+    def __init__(self, start_time_tolerance: float = None, clock: typing.Callable[[], float] = None):
+        """
+        Constructor
+
+        :param start_time_tolerance: How many seconds two start times may differ while still referring to the
+            same process. Needed when start times are derived from coarse elapsed times
+        :param clock: A monotonic clock used to time samples
+        """
+        self.__start_time_tolerance = start_time_tolerance or 0.0
+        self.__clock = clock or time.monotonic
+        self.__previous_samples: typing.Dict[int, typing.Tuple[float, float]] = {}
+        self.__previous_sample_time: typing.Optional[float] = None
+
+    @property
+    def tracked_process_count(self) -> int:
+        """
+        The number of processes that rates may be computed for on the next sample
+        """
+        return len(self.__previous_samples)
+
+    def update(
+        self,
+        samples: typing.Iterable[CPU_SAMPLE],
+        sampled_at: float = None
+    ) -> typing.Dict[int, typing.Optional[float]]:
+        """
+        Record a new sample and compute the CPU percentage of every process since the last one
+
+        Processes that exited since the last sample are forgotten
+
+        :param samples: The process ID, start time, and CPU seconds of every process
+        :param sampled_at: When the sample was taken according to the engine's clock. Now is used if not given
+        :return: The percentage of a CPU each process used since the previous sample. The value is `None` if the
+            process was not present in the previous sample
+        """
+        if sampled_at is None:
+            sampled_at = self.__clock()
+
+        elapsed = sampled_at - self.__previous_sample_time if self.__previous_sample_time is not None else None
+        rates: typing.Dict[int, typing.Optional[float]] = {}
+        current_samples: typing.Dict[int, typing.Tuple[float, float]] = {}
+
+        for process_id, start_time, cpu_time in samples:
+            previous = self.__previous_samples.get(process_id)
+            rate: typing.Optional[float] = None
+
+            if previous is not None and elapsed:
+                previous_start_time, previous_cpu_time = previous
+                is_same_process = abs(previous_start_time - start_time) <= self.__start_time_tolerance
+
+                # CPU time never goes down for a single process, so a decrease means the ID was reused
+                if is_same_process and cpu_time >= previous_cpu_time:
+                    rate = (cpu_time - previous_cpu_time) / elapsed * 100.0
+
+            rates[process_id] = rate
+            current_samples[process_id] = (start_time, cpu_time)
+
+        self.__previous_samples = current_samples
+        self.__previous_sample_time = sampled_at
+        return rates
@@ -0,0 +1,317 @@
+"""
+Samples process data in the background so that requests may be served from the newest snapshot
+"""
+from __future__ import annotations
+
+import asyncio
+import collections
+import concurrent.futures
+import functools
+import itertools
+import logging
+import threading
+import typing
+from dataclasses import dataclass
+from datetime import datetime
+
+from models.tree import ProcessTree
+from utilities.collectors import Collector
+from utilities.collectors import TableCollector
+from utilities.executors import PAYLOAD_BUILDER
+from utilities.executors import render_payload
+from utilities.executors import run_in_executor
+from utilities.ps import ProcessSnapshot
+from utilities.ps import ProcessStatus
+
+
+@dataclass
+class Snapshot:
+    """
+    A single sample of every process along with the payload built from it
+    """
+    snapshot_id: int
+    created_at: datetime
+    status: ProcessStatus
+    payload: bytes = b""
+    """The serialized data sent to clients, as UTF-8 encoded JSON"""
+
+    def describe(self) -> typing.Dict[str, typing.Any]:
+        """
+        Identify the snapshot for clients
+        """
+        return {
+            "snapshot_id": self.snapshot_id,
+            "created_at": self.created_at.isoformat(),
+        }
+
+
+class Sampler:
+    """
+    Collects process data on an interval and keeps the newest few snapshots
+    """
+    def __init__(
+        self,
+        collector: Collector,
+        build_payload: PAYLOAD_BUILDER,
+        interval: float = None,
+        capacity: int = None,
+        include_self: bool = False,
+        executor: concurrent.futures.Executor = None,
+        reuse_tree: bool = False
+    ):
+        """
+        Constructor
+
+        :param collector: The collector used to gather process data
+        :param build_payload: A function that creates the payload sent to clients from a sample
+        :param interval: The number of seconds to wait between samples
+        :param capacity: The number of snapshots to keep
+        :param include_self: Whether to keep this application and its ancestors within the results
+        :param executor: Where payloads are built when sampling in the background. Payloads are built on the
+            event loop if no executor is given
+        :param reuse_tree: Whether to keep a process tree between samples and pass it to `build_payload` as `tree`.
+            The tree is updated with only the processes that changed rather than built again, unless payloads are
+            built within a process pool, which cannot share it
+        """
+        if interval is not None and interval <= 0:
+            raise ValueError(f"Processes must be sampled on a positive interval - received {interval}")
+
+        if capacity is not None and capacity < 1:
+            raise ValueError(f"At least one snapshot must be kept - received {capacity}")
+
+        self.__collector = collector
+        self.__build_payload = build_payload
+        self.__interval = float(interval) if interval is not None else 5.0
+        self.__include_self = bool(include_self)
+        self.__executor = executor
+        self.__snapshots: collections.deque[Snapshot] = collections.deque(maxlen=capacity or 5)
+        self.__snapshot_ids: typing.Iterator[int] = itertools.count(1)
+        self.__task: typing.Optional[asyncio.Task] = None
+        self.__updates_tree = bool(reuse_tree) and not isinstance(executor, concurrent.futures.ProcessPoolExecutor)
+        self.__tree: typing.Optional[ProcessTree] = None
+        self.__tree_snapshot: typing.Optional[ProcessSnapshot] = None
+        self.__tree_lock = threading.Lock()
+
+    @property
+    def collector(self) -> Collector:
+        return self.__collector
+
+    @property
+    def executor(self) -> typing.Optional[concurrent.futures.Executor]:
+        """
+        Where payloads are built when sampling in the background
+        """
+        return self.__executor
+
+    @property
+    def tree(self) -> typing.Optional[ProcessTree]:
+        """
+        The process tree kept up to date between samples, if one is kept
+        """
+        return self.__tree
+
+    @property
+    def interval(self) -> float:
+        """
+        The number of seconds to wait between samples
+        """
+        return self.__interval
+
+    @property
+    def latest(self) -> typing.Optional[Snapshot]:
+        """
+        The newest snapshot, if one has been taken
+        """
+        return self.__snapshots[-1] if self.__snapshots else None
+
+    @property
+    def snapshots(self) -> typing.Sequence[Snapshot]:
+        """
+        Every snapshot that is still held, oldest first
+        """
+        return tuple(self.__snapshots)
+
+    @property
+    def is_running(self) -> bool:
+        return self.__task is not None and not self.__task.done()
+
+    def get(self, snapshot_id: int) -> typing.Optional[Snapshot]:
+        """
+        Get a snapshot that is still held by its ID
+
+        :param snapshot_id: The ID of the snapshot
+        :return: The matching snapshot, if it is still held
+        """
+        return next((snapshot for snapshot in self.__snapshots if snapshot.snapshot_id == snapshot_id), None)
+
+    def sample(self) -> Snapshot:
+        """
+        Collect process data and store it as the newest snapshot
+
+        :return: The new snapshot
+        """
+        status = ProcessStatus(include_self=self.__include_self, collector=self.__collector)
+        snapshot = self.__create_snapshot(status)
+
+        if self.__updates_tree:
+            snapshot.payload = self.__render_from_tree(snapshot)
+        else:
+            snapshot.payload = render_payload(self.__build_payload, status.snapshot, self.__describe(snapshot))
+
+        return self.__store(snapshot)
+
+    async def sample_async(self) -> Snapshot:
+        """
+        Collect process data without blocking the event loop and store it as the newest snapshot
+
+        :return: The new snapshot
+        """
+        process_snapshot = await self.__collector.collect_async()
+        status = ProcessStatus(include_self=self.__include_self, snapshot=process_snapshot)
+        snapshot = self.__create_snapshot(status)
+
+        if self.__updates_tree:
+            snapshot.payload = await run_in_executor(self.__executor, self.__render_from_tree, snapshot)
+        else:
+            # Only the raw process data travels to the executor so that it may be sent to another process
+            snapshot.payload = await run_in_executor(
+                self.__executor,
+                render_payload,
+                self.__build_payload,
+                status.snapshot,
+                self.__describe(snapshot)
+            )
+
+        return self.__store(snapshot)
+
+    async def render_async(self, snapshot: Snapshot, build_payload: PAYLOAD_BUILDER = None) -> bytes:
+        """
+        Build a payload for a snapshot that was already taken, such as one drawn differently than the default
+
+        When the sampler keeps a tree and the snapshot is the one the tree matches, the tree is passed to
+        `build_payload` as `tree` so that it isn't built again
+
+        :param snapshot: The snapshot to render
+        :param build_payload: The function that creates the payload. The sampler's own is used if not given
+        :return: The serialized payload for the snapshot
+        """
+        if self.__updates_tree:
+            return await run_in_executor(
+                self.__executor,
+                self.__render_with_tree,
+                snapshot,
+                build_payload or self.__build_payload
+            )
+
+        return await run_in_executor(
+            self.__executor,
+            render_payload,
+            build_payload or self.__build_payload,
+            snapshot.status.snapshot,
+            self.__describe(snapshot)
+        )
+
+    def __create_snapshot(self, status: ProcessStatus) -> Snapshot:
+        return Snapshot(
+            snapshot_id=next(self.__snapshot_ids),
+            created_at=datetime.now(),
+            status=status
+        )
+
+    def __render_from_tree(self, snapshot: Snapshot) -> bytes:
+        """
+        Bring the kept process tree up to date with a snapshot and build the snapshot's payload from it
+
+        The lock keeps samples taken at the same time, such as one requested while the background sample is
+        rendering, from updating the tree at once
+
+        :param snapshot: The newest snapshot
+        :return: The serialized payload for the snapshot
+        """
+        with self.__tree_lock:
+            tree = self.__update_tree(snapshot.status)
+            return render_payload(
+                functools.partial(self.__build_payload, tree=tree),
+                snapshot.status.snapshot,
+                self.__describe(snapshot)
+            )
+
+    def __render_with_tree(self, snapshot: Snapshot, build_payload: PAYLOAD_BUILDER) -> bytes:
+        """
+        Build a payload for a snapshot that was already taken from the kept tree, if the tree still matches it
+
+        :param snapshot: The snapshot to render
+        :param build_payload: The function that creates the payload
+        :return: The serialized payload for the snapshot
+        """
+        with self.__tree_lock:
+            if self.__tree is not None and self.__tree_snapshot is snapshot.status.snapshot:
+                build_payload = functools.partial(build_payload, tree=self.__tree)
+
+            return render_payload(build_payload, snapshot.status.snapshot, self.__describe(snapshot))
+
+    def __update_tree(self, status: ProcessStatus) -> ProcessTree:
+        process_snapshot = status.snapshot
+
+        if self.__tree is not None:
+            start_time_tolerance = None
+
+            if isinstance(self.__collector, TableCollector):
+                start_time_tolerance = self.__collector.table_generator.start_time_tolerance()
+
+            try:
+                self.__tree.apply_diff(process_snapshot.diff(self.__tree_snapshot, start_time_tolerance))
+                self.__tree_snapshot = process_snapshot
+                return self.__tree
+            except Exception as exception:
+                # A tree that failed partway through an update can't be trusted, so a new one is built instead
+                logging.warning(f"Could not update the process tree, so it will be built again: {exception}")
+
+        self.__tree = ProcessTree.from_status(status)
+        self.__tree_snapshot = process_snapshot
+        return self.__tree
+
+    def __describe(self, snapshot: Snapshot) -> typing.Dict[str, typing.Any]:
+        return {
+            "collector": self.__collector.describe(),
+            "snapshot": snapshot.describe(),
+        }
+
+    def __store(self, snapshot: Snapshot) -> Snapshot:
+        self.__snapshots.append(snapshot)
+        return snapshot
+
+    async def run(self):
+        """
+        Take a new snapshot every interval until cancelled
+        """
+        while True:
+            try:
+                await self.sample_async()
+            except Exception as exception:
+                logging.error(f"Could not sample process data with {self.__collector}: {exception}")
+
+            await asyncio.sleep(self.__interval)
+
+    def start(self):
+        """
+        Start sampling in the background on the running event loop
+        """
+        if not self.is_running:
+            self.__task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        """
+        Stop sampling in the background
+        """
+        if self.__task is None:
+            return
+
+        self.__task.cancel()
+
+        try:
+            await self.__task
+        except asyncio.CancelledError:
+            pass
+
+        self.__task = None
@@ -0,0 +1,212 @@
+"""
+Interchangeable JSON encoders used to serialize everything sent to clients
+
+The fastest encoder available on the host is used unless another is requested. Every encoder produces bytes and
+understands NumPy arrays and scalars, so payloads may be sent as is no matter which encoder built them
+"""
+from __future__ import annotations
+
+import abc
+import datetime
+import functools
+import json
+import typing
+
+import numpy
+from aiohttp import web
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    # orjson is only an optimization - the standard library is used if it isn't installed
+    orjson = None
+
+from application_details import JSON_ENCODER
+
+AUTOMATIC_ENCODER: typing.Final[str] = "auto"
+"""The name used to request the fastest encoder available on the host"""
+
+JSON_CONTENT_TYPE: typing.Final[str] = "application/json"
+"""The content type of every JSON response"""
+
+
+def to_serializable(value: typing.Any) -> typing.Any:
+    """
+    Convert a value that JSON encoders don't understand on their own into one that they do
+
+    :param value: The value that could not be encoded
+    :return: An equivalent value made of plain types
+    """
+    if isinstance(value, numpy.ndarray):
+        return value.tolist()
+    elif isinstance(value, numpy.generic):
+        return value.item()
+    elif isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    elif isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    elif isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+
+    raise TypeError(f"Objects of type '{type(value).__name__}' cannot be serialized as JSON")
+
+
+class JSONEncoder(abc.ABC):
+    """
+    Turns data into JSON
+    """
+    @classmethod
+    @abc.abstractmethod
+    def get_name(cls) -> str:
+        """
+        The name used to select this encoder
+        """
+        pass
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """
+        Whether this encoder may be used on the current host
+        """
+        return True
+
+    @property
+    def name(self) -> str:
+        return self.get_name()
+
+    @abc.abstractmethod
+    def encode(self, data: typing.Any) -> bytes:
+        """
+        Serialize data as UTF-8 encoded JSON
+
+        :param data: The data to serialize. NumPy arrays and scalars are written as plain lists and numbers
+        :return: The data as JSON
+        """
+        pass
+
+    def __str__(self):
+        return f"{self.__class__.__name__} ({self.name})"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class OrjsonEncoder(JSONEncoder):
+    """
+    Encodes data with orjson, which writes bytes directly and reads NumPy arrays without converting them to lists
+    """
+    @classmethod
+    def get_name(cls) -> str:
+        return "orjson"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return orjson is not None
+
+    def encode(self, data: typing.Any) -> bytes:
+        return orjson.dumps(
+            data,
+            default=to_serializable,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+
+
+class StandardEncoder(JSONEncoder):
+    """
+    Encodes data with the standard library
+    """
+    @classmethod
+    def get_name(cls) -> str:
+        return "json"
+
+    def encode(self, data: typing.Any) -> bytes:
+        return json.dumps(data, default=to_serializable, separators=(",", ":")).encode("utf-8")
+
+
+ENCODERS: typing.Final[typing.Mapping[str, typing.Type[JSONEncoder]]] = {
+    encoder.get_name(): encoder
+    for encoder in (OrjsonEncoder, StandardEncoder)
+}
+"""Every JSON encoder keyed by name, in order of preference"""
+
+
+def get_encoder(name: str = None) -> JSONEncoder:
+    """
+    Create the JSON encoder with the given name
+
+    :param name: The name of the encoder. The fastest encoder available on the host is used if none is given
+    :return: A new encoder
+    """
+    if not name or name == AUTOMATIC_ENCODER:
+        encoder_type = next(
+            encoder
+            for encoder in ENCODERS.values()
+            if encoder.is_available()
+        )
+        return encoder_type()
+
+    if name not in ENCODERS:
+        raise KeyError(f"'{name}' is not a valid JSON encoder. Valid options are: {', '.join(ENCODERS)}")
+
+    encoder_type = ENCODERS[name]
+
+    if not encoder_type.is_available():
+        raise ValueError(f"The '{name}' JSON encoder is not available on this host")
+
+    return encoder_type()
+
+
+@functools.lru_cache(maxsize=None)
+def get_default_encoder() -> JSONEncoder:
+    """
+    The encoder used for every response, as configured for the application
+    """
+    return get_encoder(JSON_ENCODER)
+
+
+def dumps(data: typing.Any, encoder: JSONEncoder = None) -> bytes:
+    """
+    Serialize data as JSON
+
+    :param data: The data to serialize
+    :param encoder: The encoder to use. The application's encoder is used if not given
+    :return: The data as UTF-8 encoded JSON
+    """
+    return (encoder or get_default_encoder()).encode(data)
+
+
+def json_response(data: typing.Any, status: int = 200, **kwargs) -> web.Response:
+    """
+    Create a response holding data serialized as JSON, in place of `aiohttp.web.json_response`
+
+    :param data: The data to send
+    :param status: The HTTP status of the response
+    :return: A response with the serialized data
+    """
+    return web.Response(body=dumps(data), status=status, content_type=JSON_CONTENT_TYPE, **kwargs)
+
+
+def payload_response(payload: typing.Union[str, bytes], status: int = 200, **kwargs) -> web.Response:
+    """
+    Create a response holding data that was already serialized as JSON
+
+    :param payload: The serialized data
+    :param status: The HTTP status of the response
+    :return: A response with the serialized data
+    """
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+
+    return web.Response(body=payload, status=status, content_type=JSON_CONTENT_TYPE, **kwargs)
+
+
+def model_response(model: BaseModel, status: int = 200, **kwargs) -> web.Response:
+    """
+    Create a response holding a model serialized straight to JSON by pydantic, without forming a dictionary first
+
+    :param model: The model to send
+    :param status: The HTTP status of the response
+    :return: A response with the serialized model
+    """
+    return payload_response(model.model_dump_json(), status=status, **kwargs)
@@ -0,0 +1,3 @@
+"""
+Scripts that time the data collection and rendering pipeline. Run them directly with `python -m`
+"""
@@ -0,0 +1,83 @@
+"""
+Measures the memory held by process entries with tracemalloc
+
+Usage::
+
+    $ PYTHONPATH=pview:. python -m test.benchmarks.bench_entries 10000
+"""
+from __future__ import annotations
+
+import dataclasses
+import sys
+import tracemalloc
+import typing
+
+from pview.utilities.ps import ProcessEntry
+
+UnslottedProcessEntry = dataclasses.make_dataclass(
+    "UnslottedProcessEntry",
+    [
+        (entry_field.name, entry_field.type, entry_field)
+        for entry_field in dataclasses.fields(ProcessEntry)
+        if entry_field.init
+    ]
+)
+"""A stand-in for `ProcessEntry` as it was before it was slotted, with a `__dict__` per instance"""
+
+
+def create_entries(entry_type: typing.Type, process_count: int) -> typing.List[typing.Any]:
+    """
+    Create entries with distinct numbers and shared strings, the way a collector would
+
+    :param entry_type: The type of entry to create
+    :param process_count: The number of entries to create
+    :return: The new entries
+    """
+    return [
+        entry_type(
+            process_id=process_id,
+            parent_process_id=process_id // 10,
+            name="worker",
+            current_cpu_percent=float(process_id % 100),
+            user="root",
+            memory_usage=process_id * 4,
+            memory_percent=0.1,
+            status="Sleeping",
+            executable="/usr/bin/worker",
+            arguments="--index",
+            start_time=float(process_id),
+            cpu_time=float(process_id) / 2
+        )
+        for process_id in range(process_count)
+    ]
+
+
+def measure(entry_type: typing.Type, process_count: int) -> int:
+    """
+    Find how many bytes are held after creating entries
+
+    :param entry_type: The type of entry to create
+    :param process_count: The number of entries to create
+    :return: The number of bytes still allocated once the entries exist
+    """
+    tracemalloc.start()
+    entries = create_entries(entry_type, process_count)
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del entries
+    return allocated
+
+
+def main(arguments: typing.Sequence[str]) -> None:
+    process_count = int(arguments[0]) if arguments else 10000
+
+    unslotted = measure(UnslottedProcessEntry, process_count)
+    slotted = measure(ProcessEntry, process_count)
+
+    print(f"Unslotted entries for {process_count} processes: {unslotted / 1024:.1f}KB ({unslotted / process_count:.1f}B each)")
+    print(f"Slotted entries for {process_count} processes: {slotted / 1024:.1f}KB ({slotted / process_count:.1f}B each)")
+    print(f"Saved {(unslotted - slotted) / process_count:.1f}B per entry")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
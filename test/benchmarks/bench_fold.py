@@ -0,0 +1,56 @@
+"""
+Times folding child processes into their parents for large synthetic process tables
+
+Usage::
+
+    $ PYTHONPATH=pview:. python -m test.benchmarks.bench_fold 10000 50000
+"""
+from __future__ import annotations
+
+import random
+import sys
+import timeit
+import typing
+
+from pview.utilities.ps import FoldMode
+from test.utilities.test_ps import StaticTableGenerator
+
+
+def create_rows(process_count: int, seed: int = 0) -> typing.List[typing.Tuple[int, int, int]]:
+    """
+    Create a random forest of processes with IDs in shuffled order
+
+    :param process_count: The number of processes to create
+    :param seed: The seed for the random number generator
+    :return: The process ID, parent process ID, and memory usage of every process
+    """
+    generator = random.Random(seed)
+    rows = [(1, 0, 100)]
+
+    for process_id in range(3, process_count + 2):
+        # Attach each process to a random earlier process so trees of varying depth form
+        parent_process_id = rows[generator.randrange(len(rows))][0]
+        rows.append((process_id, parent_process_id, generator.randrange(1, 100000)))
+
+    generator.shuffle(rows)
+    return rows
+
+
+def main(arguments: typing.Sequence[str]) -> None:
+    process_counts = [int(argument) for argument in arguments] or [10000, 50000]
+    repetitions = 3
+
+    for process_count in process_counts:
+        rows = create_rows(process_count)
+
+        for fold_mode in FoldMode:
+            table_generator = StaticTableGenerator(rows, fold_mode=fold_mode)
+            seconds = timeit.timeit(table_generator.create_process_list, number=repetitions) / repetitions
+            print(
+                f"{fold_mode.value:>8} fold of {process_count:>6} rows: {seconds * 1000:8.2f}ms "
+                f"({seconds / process_count * 1e6:.2f}us per row)"
+            )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,72 @@
+"""
+Compares reading a fake `/proc` filesystem against calling `ps`
+
+Usage::
+
+    $ PYTHONPATH=pview:. python -m test.benchmarks.bench_proc 10000
+"""
+from __future__ import annotations
+
+import pathlib
+import sys
+import tempfile
+import timeit
+import typing
+
+from pview.utilities.proc import ProcTableGenerator
+from pview.utilities.ps import PSTableGenerator
+
+FIXTURE_ROOT = pathlib.Path(__file__).parent.parent / "utilities" / "fixtures" / "proc"
+
+
+def write_fake_proc(root: pathlib.Path, process_count: int) -> pathlib.Path:
+    """
+    Copy the fixture `/proc` layout into a new directory and pad it out with synthetic processes
+
+    :param root: The directory to write the fake `/proc` into
+    :param process_count: The number of synthetic processes to add
+    :return: The root of the fake `/proc`
+    """
+    for filename in ("uptime", "meminfo"):
+        (root / filename).write_text((FIXTURE_ROOT / filename).read_text())
+
+    for process_id in range(1000, 1000 + process_count):
+        # Build shallow process trees so that folding has work to do
+        parent_process_id = 1 if process_id % 10 == 0 else process_id - process_id % 10
+        process_directory = root / str(process_id)
+        process_directory.mkdir()
+
+        (process_directory / "stat").write_text(
+            f"{process_id} (worker) S {parent_process_id} {process_id} {process_id} 0 -1 4194560 100 0 0 0 "
+            f"{process_id % 500} 10 0 0 20 0 1 0 5000 10000000 100\n"
+        )
+        (process_directory / "statm").write_text("2500 100 50 5 0 123 0\n")
+        (process_directory / "status").write_text("Name:\tworker\nUid:\t0\t0\t0\t0\n")
+        (process_directory / "cmdline").write_bytes(b"/usr/bin/worker\0--index\0" + str(process_id).encode() + b"\0")
+
+    return root
+
+
+def main(arguments: typing.Sequence[str]) -> None:
+    process_count = int(arguments[0]) if arguments else 10000
+    repetitions = 5
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        proc_root = write_fake_proc(pathlib.Path(temporary_directory), process_count)
+        generator = ProcTableGenerator(proc_root=proc_root, page_size=4096, clock_ticks=100)
+
+        seconds = timeit.timeit(generator._load_processes, number=repetitions) / repetitions
+        print(f"/proc read of {process_count} fake processes: {seconds * 1000:.2f}ms")
+
+    if ProcTableGenerator.is_available():
+        local_proc = ProcTableGenerator()
+        seconds = timeit.timeit(local_proc._load_processes, number=repetitions) / repetitions
+        print(f"/proc read on this host: {seconds * 1000:.2f}ms")
+
+    ps = PSTableGenerator()
+    seconds = timeit.timeit(ps._load_processes, number=repetitions) / repetitions
+    print(f"Two calls to `ps` on this host: {seconds * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
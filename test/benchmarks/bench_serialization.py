@@ -0,0 +1,53 @@
+"""
+Times encoding the `/ps` payload for large synthetic snapshots with every available JSON encoder, along with the
+`json.dumps` call aiohttp makes for `web.json_response`
+
+Usage::
+
+    $ PYTHONPATH=pview:. python -m test.benchmarks.bench_serialization 10000
+"""
+from __future__ import annotations
+
+import json
+import sys
+import timeit
+import typing
+
+from pview.handlers.ps import build_tree_payload
+from pview.models.tree import DetailLimits
+from pview.utilities.serialization import ENCODERS
+
+from .bench_tree import create_snapshot
+
+
+def main(arguments: typing.Sequence[str]) -> None:
+    process_counts = [int(argument) for argument in arguments] or [10000]
+    repetitions = 5
+
+    for process_count in process_counts:
+        snapshot = create_snapshot(process_count)
+
+        for limits in (DetailLimits(), DetailLimits(max_children=50, min_percent=0.5, max_depth=2)):
+            payload = build_tree_payload(snapshot, {}, limits=limits)
+
+            seconds = timeit.timeit(lambda: json.dumps(payload), number=repetitions) / repetitions
+            print(
+                f"Encoded the /ps payload for {process_count} processes with {limits} in {seconds * 1000:.2f}ms "
+                f"through aiohttp's default ({len(json.dumps(payload).encode('utf-8')) / 1024:.1f}KB)"
+            )
+
+            for name, encoder_type in ENCODERS.items():
+                if not encoder_type.is_available():
+                    print(f"Skipped the '{name}' encoder - it is not available on this host")
+                    continue
+
+                encoder = encoder_type()
+                seconds = timeit.timeit(lambda: encoder.encode(payload), number=repetitions) / repetitions
+                print(
+                    f"Encoded the /ps payload for {process_count} processes with {limits} in {seconds * 1000:.2f}ms "
+                    f"through '{name}' ({len(encoder.encode(payload)) / 1024:.1f}KB)"
+                )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
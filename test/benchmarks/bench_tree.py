@@ -0,0 +1,168 @@
+"""
+Times building process trees and their sunburst data from large synthetic snapshots, along with updating a tree
+from the processes that changed between two snapshots, drawing only the largest parts of a tree, sizing a tree
+by every metric at once, forming figure data with and without plotly, and describing memory for hover text
+
+Usage::
+
+    $ PYTHONPATH=pview:. python -m test.benchmarks.bench_tree 10000
+"""
+from __future__ import annotations
+
+import dataclasses
+import random
+import sys
+import timeit
+import typing
+
+from pview.models.tree import DetailLimits
+from pview.models.tree import ProcessTree
+from pview.models.tree import SUNBURST_METRICS
+from pview.utilities.ps import ProcessSnapshot
+from pview.utilities.ps import ProcessSnapshotBuilder
+from pview.utilities.ps import ProcessStatus
+from pview.utilities.ps import SizeUnit
+from pview.utilities.ps import describe_memory
+from pview.utilities.ps import describe_memory_values
+
+
+def create_snapshot(process_count: int, seed: int = 0) -> ProcessSnapshot:
+    """
+    Create a snapshot of processes spread across a realistic number of directories and executables
+
+    :param process_count: The number of processes to create
+    :param seed: The seed for the random number generator
+    :return: A snapshot with the given number of processes
+    """
+    generator = random.Random(seed)
+    builder = ProcessSnapshotBuilder()
+
+    for process_id in range(3, process_count + 3):
+        directory = f"/opt/application{generator.randrange(40)}/bin"
+        executable = f"{directory}/worker{generator.randrange(25)}"
+        builder.add(
+            process_id=process_id,
+            parent_process_id=generator.choice((1, max(3, process_id - generator.randrange(1, 50)))),
+            name=executable,
+            current_cpu_percent=generator.random() * 10,
+            user="root",
+            memory_usage=generator.randrange(1000, 500000),
+            memory_percent=generator.random(),
+            status="Sleeping",
+            executable=executable,
+            arguments=f"--index {process_id % 100}",
+        )
+
+    return builder.build()
+
+
+def create_churned_snapshot(snapshot: ProcessSnapshot, churn: float, seed: int = 0) -> ProcessSnapshot:
+    """
+    Create the snapshot that might follow another, where a share of processes exited, started, or changed
+
+    :param snapshot: The earlier snapshot
+    :param churn: The share of processes that exit, the share that start, and the share that change
+    :param seed: The seed for the random number generator
+    :return: A later snapshot
+    """
+    generator = random.Random(seed)
+    entries = list(snapshot)
+    changed_count = int(len(entries) * churn)
+
+    for index in generator.sample(range(len(entries)), changed_count):
+        entries[index] = dataclasses.replace(entries[index], memory_usage=entries[index].memory_usage + 1024)
+
+    for index in sorted(generator.sample(range(len(entries)), changed_count), reverse=True):
+        del entries[index]
+
+    next_process_id = int(snapshot.process_ids.max()) + 1
+    new_processes = create_snapshot(changed_count, seed=seed + 1)
+    entries.extend(
+        dataclasses.replace(entry, process_id=next_process_id + offset)
+        for offset, entry in enumerate(new_processes)
+    )
+
+    return ProcessSnapshot.from_entries(entries)
+
+
+def time_updates(snapshot: ProcessSnapshot, churn: float, repetitions: int) -> typing.Tuple[int, float, float]:
+    """
+    Time finding the differences between two snapshots and applying them to a tree
+
+    :return: The number of processes that changed, the seconds spent finding them, and the seconds spent
+        updating the tree with them
+    """
+    later_snapshot = create_churned_snapshot(snapshot, churn)
+    diff_seconds = timeit.timeit(lambda: later_snapshot.diff(snapshot), number=repetitions) / repetitions
+    diff = later_snapshot.diff(snapshot)
+
+    update_seconds = 0.0
+
+    for _ in range(repetitions):
+        tree = ProcessTree.from_status(ProcessStatus(include_self=True, snapshot=snapshot))
+        update_seconds += timeit.timeit(lambda: tree.apply_diff(diff), number=1)
+
+    return diff.churn, diff_seconds, update_seconds / repetitions
+
+
+def main(arguments: typing.Sequence[str]) -> None:
+    process_counts = [int(argument) for argument in arguments] or [10000]
+    repetitions = 3
+
+    for process_count in process_counts:
+        status = ProcessStatus(include_self=True, snapshot=create_snapshot(process_count))
+
+        seconds = timeit.timeit(lambda: ProcessTree.from_status(status), number=repetitions) / repetitions
+        print(f"Built a tree of {process_count} processes in {seconds * 1000:.2f}ms")
+
+        tree = ProcessTree.from_status(status)
+        seconds = timeit.timeit(tree.get_sunburst_data, number=repetitions) / repetitions
+        print(f"Formed sunburst data for {process_count} processes in {seconds * 1000:.2f}ms")
+
+        seconds = timeit.timeit(
+            lambda: tree.get_sunburst_data(metrics=SUNBURST_METRICS),
+            number=repetitions
+        ) / repetitions
+        print(f"Formed sunburst data for {process_count} processes with every metric in {seconds * 1000:.2f}ms")
+
+        sunburst_data = tree.get_sunburst_data()
+        plotly_seconds = timeit.timeit(lambda: sunburst_data.to_figure().to_dict(), number=repetitions) / repetitions
+        direct_seconds = timeit.timeit(sunburst_data.to_figure_dict, number=repetitions) / repetitions
+        print(
+            f"Formed figure data for {process_count} processes in {direct_seconds * 1000:.2f}ms directly and "
+            f"{plotly_seconds * 1000:.2f}ms through plotly"
+        )
+
+        values = sunburst_data.values
+        single_seconds = timeit.timeit(
+            lambda: [describe_memory(value, SizeUnit.KB) for value in values.tolist()],
+            number=repetitions
+        ) / repetitions
+        batch_seconds = timeit.timeit(lambda: describe_memory_values(values, SizeUnit.KB), number=repetitions) / repetitions
+        print(
+            f"Described {len(values)} memory values in {batch_seconds * 1000:.2f}ms at once and "
+            f"{single_seconds * 1000:.2f}ms one at a time"
+        )
+
+        for limits in (
+            DetailLimits(max_children=50, min_percent=0.5),
+            DetailLimits(max_children=10, min_percent=1),
+            DetailLimits(max_children=50, min_percent=0.5, max_depth=2),
+        ):
+            seconds = timeit.timeit(lambda: tree.get_sunburst_data(limits=limits), number=repetitions) / repetitions
+            segment_count = len(tree.compact_dict(limits=limits)["segments"]["values"])
+            print(
+                f"Formed sunburst data for {process_count} processes with {limits} in {seconds * 1000:.2f}ms "
+                f"({segment_count} segments)"
+            )
+
+        for churn in (0.001, 0.01, 0.1):
+            changed_count, diff_seconds, update_seconds = time_updates(status.snapshot, churn, repetitions)
+            print(
+                f"Updated a tree of {process_count} processes with {changed_count} changes in "
+                f"{update_seconds * 1000:.2f}ms after finding them in {diff_seconds * 1000:.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
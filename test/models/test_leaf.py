@@ -1,3 +1,4 @@
+import dataclasses
 import unittest
 
 from pview.utilities import ps
@@ -54,7 +55,7 @@ class TestProcessLeaf(unittest.TestCase):
         self.assertEqual(leaf.command, copied_leaf.command)
         self.assertEqual(leaf.arguments, copied_leaf.arguments)
 
-        process.process_id = 932923
+        process = dataclasses.replace(process, process_id=932923)
         leaf.add_instance(process)
 
         self.assertEqual(leaf.count, 2)
@@ -1,9 +1,68 @@
+import dataclasses
+import random
+import typing
 import unittest
+from unittest import mock
 
+import numpy
+
+from models import tree as tree_module
+from models.tree import DetailLimits
 from models.tree import ProcessTree
+from models.tree import SUNBURST_METRICS
+from models.tree import Sunburst
+from models.tree import get_figure_layout
 from pview.utilities import ps
 from pview.models.tree import ProcessNode
 
+
+def create_entry(process_id: int, executable: str = "/usr/bin/worker", **overrides) -> ps.ProcessEntry:
+    """
+    Create an entry for a process started by `init`, replacing any of its defaults through keyword arguments
+    """
+    fields = dict(
+        process_id=process_id,
+        parent_process_id=1,
+        name=executable.split("/")[-1],
+        current_cpu_percent=1.0,
+        user="user",
+        memory_usage=100,
+        memory_percent=0.5,
+        status="Sleeping",
+        executable=executable,
+        arguments=""
+    )
+    fields.update(overrides)
+    return ps.ProcessEntry(**fields)
+
+
+def create_random_tree(
+    generator: random.Random,
+    process_ids: typing.Iterable[int],
+    max_directories: int = 4,
+    max_memory: int = 1000
+) -> ProcessTree:
+    """
+    Create a tree of processes whose executables lie at random depths beneath a few shared directories
+    """
+    tree = ProcessTree()
+
+    for process_id in process_ids:
+        directories = [f"directory{generator.randrange(3)}" for _ in range(generator.randrange(1, max_directories + 1))]
+        executable = "/" + "/".join(directories) + f"/executable{generator.randrange(4)}"
+        tree.add_entry(
+            create_entry(
+                process_id,
+                executable,
+                current_cpu_percent=generator.random() * 5,
+                memory_usage=generator.randrange(1, max_memory),
+                memory_percent=generator.random()
+            )
+        )
+
+    return tree
+
+
 class ProcessTreeTest(unittest.TestCase):
     def test_something(self):
         latest_ps = ps.ProcessStatus()
@@ -20,6 +79,554 @@ class ProcessTreeTest(unittest.TestCase):
         markup = sunburst.plot()
         self.assertTrue(isinstance(markup, str))
 
+    def test_to_model(self):
+        snapshot = ps.ProcessSnapshot.from_entries([
+            create_entry(process_id, name="/usr/bin/worker", arguments=f"--index {process_id}")
+            for process_id in (10, 11, 12)
+        ])
+        tree = ProcessTree.from_status(ps.ProcessStatus(include_self=True, snapshot=snapshot))
+
+        self.assertFalse(hasattr(tree, "__dict__"))
+
+        model = tree.to_model()
+
+        self.assertEqual(model.count, 3)
+        self.assertEqual(model.memory_usage, 300)
+        self.assertEqual(model.children[0].node_id, "bin")
+        self.assertEqual(model.children[0].children[0].children[0].name, "worker")
+        self.assertEqual(model.model_dump()["children"][0]["count"], 3)
+
+    def test_indexes(self):
+        tree = ProcessTree()
+
+        for entry in (
+            create_entry(10, "/usr/bin/worker"),
+            create_entry(11, "/usr/bin/worker"),
+            create_entry(12, "/usr/bin/worker", arguments="--other"),
+            create_entry(13, "/opt/vendor/tool/run"),
+        ):
+            tree.add_entry(entry)
+
+        bin_node = tree.get_child_node_by_name("bin")
+        self.assertEqual(len(bin_node.leaves), 2)
+        self.assertEqual(bin_node.get_matching_leaf(create_entry(14, "/usr/bin/worker")).count, 2)
+
+        copied_tree = tree.duplicate()
+        copied_tree.collapse()
+
+        self.assertIsNone(copied_tree.get_child_node_by_name("vendor"))
+
+        collapsed_node = copied_tree.get_child_node_by_name("vendor/tool")
+        self.assertIsNotNone(collapsed_node)
+        self.assertIs(collapsed_node.leaves[0].parent, collapsed_node)
+        self.assertIsNotNone(collapsed_node.get_matching_leaf(create_entry(15, "/opt/vendor/tool/run")))
+
+        copied_leaf = copied_tree.get_child_node_by_name("bin").get_matching_leaf(create_entry(14, "/usr/bin/worker"))
+        self.assertIsNot(copied_leaf, bin_node.get_matching_leaf(create_entry(14, "/usr/bin/worker")))
+        self.assertEqual(copied_leaf.count, 2)
+
+        # The original tree is unaffected by collapsing its copy
+        self.assertIsNotNone(tree.get_child_node_by_name("vendor"))
+
+    def test_aggregates(self):
+        tree = ProcessTree()
+        tree.add_entry(create_entry(10, "/usr/bin/worker", current_cpu_percent=2.0, memory_usage=100))
+        tree.add_entry(create_entry(11, "/usr/lib/helper/run", current_cpu_percent=2.0, memory_usage=200))
+
+        bin_node = tree.get_child_node_by_name("bin")
+        self.assertEqual(tree.count(), 2)
+        self.assertEqual(tree.memory_usage, 300)
+        self.assertEqual(tree.memory_percent, 1.0)
+        self.assertEqual(bin_node.memory_usage, 100)
+
+        # Totals are kept until something beneath them changes
+        self.assertIs(tree.aggregates, tree.aggregates)
+        helper_aggregates = tree.get_child_node_by_name("lib").aggregates
+
+        tree.add_entry(create_entry(12, "/usr/bin/worker", current_cpu_percent=2.0, memory_usage=50))
+
+        self.assertEqual(tree.count(), 3)
+        self.assertEqual(tree.memory_usage, 350)
+        self.assertEqual(bin_node.memory_usage, 150)
+        self.assertEqual(bin_node.cpu_percent, 4.0)
+        self.assertIs(tree.get_child_node_by_name("lib").aggregates, helper_aggregates)
+
+        bin_node.remove_child(bin_node.leaves[0])
+        self.assertEqual(tree.memory_usage, 200)
+        self.assertEqual(tree.count(), 1)
+
+    def test_collapsed_sunburst_data(self):
+        tree = ProcessTree()
+
+        for process_id, executable in (
+            (10, "/usr/bin/worker"),
+            (11, "/opt/vendor/tool/bin/run"),
+            (12, "/opt/vendor/tool/lib/deep/nested/helper"),
+            (13, "/opt/other/single/path/run"),
+        ):
+            tree.add_entry(create_entry(process_id, executable, memory_usage=100 * process_id))
+
+        def collapse_and_walk(node: ProcessNode) -> typing.List[typing.Tuple[str, str, str, int]]:
+            copied_node = node.duplicate()
+            copied_node.collapse()
+            rows = []
+            for current_node, _, leaves in copied_node.walk():
+                parent = current_node.parent
+                rows.append((current_node.node_id, current_node.name, parent.node_id if parent else '', current_node.memory_usage))
+                rows.extend(
+                    (row["ids"], row["names"], row["parents"], row["values"])
+                    for leaf in leaves
+                    for row in leaf.get_sunburst_data()
+                )
+            return rows
+
+        for node in tree.nodes:
+            sunburst_data = node.get_sunburst_data()
+            rows = list(zip(sunburst_data.ids, sunburst_data.names, sunburst_data.parents, sunburst_data.values))
+
+            # Reading the tree as if it were collapsed must match collapsing a copy of it
+            self.assertEqual(rows, collapse_and_walk(node))
+
+        vendor_data = tree.get_child_node_by_name("vendor").get_sunburst_data()
+        self.assertEqual(vendor_data.names[0], "vendor/tool")
+        self.assertIn("lib/deep/nested", vendor_data.names)
+
+        # Emitting the collapsed view leaves the tree itself untouched
+        self.assertIsNotNone(tree.get_child_node_by_name("vendor"))
+        self.assertEqual(len(tree.get_child_node_by_name("vendor").nodes), 1)
+
+    def test_apply_diff(self):
+        generator = random.Random(7)
+
+        def create_random_entry(process_id: int) -> ps.ProcessEntry:
+            executable = f"/opt/app{generator.randrange(4)}/{generator.choice(('bin', 'lib/exec'))}/tool{generator.randrange(3)}"
+            return create_entry(
+                process_id,
+                executable,
+                parent_process_id=generator.choice((1, 2)),
+                current_cpu_percent=generator.choice((0.5, 1.25, 2.0)),
+                memory_usage=generator.randrange(1, 1000),
+                memory_percent=0.25,
+                arguments=generator.choice(("", "--fast")),
+                start_time=float(process_id)
+            )
+
+        def describe(branch) -> typing.Tuple:
+            nodes = []
+            leaves = []
+
+            for child in branch.children:
+                if hasattr(child, "children"):
+                    nodes.append((child.node_id, child.count, round(child.cpu_percent, 6), child.memory_usage, describe(child)))
+                else:
+                    leaves.append((
+                        tuple(sorted(child.process_ids)),
+                        child.key,
+                        child.state,
+                        child.count,
+                        round(child.cpu_percent, 6),
+                        child.memory_usage,
+                        round(child.memory_percent, 6)
+                    ))
+
+            return tuple(sorted(nodes)), tuple(sorted(leaves))
+
+        previous_entries = [create_random_entry(process_id) for process_id in range(10, 400)]
+        previous = ps.ProcessSnapshot.from_entries(previous_entries)
+        tree = ProcessTree.from_status(ps.ProcessStatus(include_self=True, snapshot=previous))
+
+        for round_number in range(5):
+            current_entries = []
+
+            for entry in previous_entries:
+                roll = generator.random()
+
+                if roll < 0.1:
+                    # The process exited
+                    continue
+                elif roll < 0.2:
+                    current_entries.append(dataclasses.replace(entry, memory_usage=entry.memory_usage + 5, status="Running"))
+                elif roll < 0.25:
+                    current_entries.append(dataclasses.replace(entry, arguments="--moved"))
+                else:
+                    current_entries.append(entry)
+
+            first_new_id = max(entry.process_id for entry in previous_entries) + 1
+            current_entries.extend(create_random_entry(process_id) for process_id in range(first_new_id, first_new_id + 30))
+            current = ps.ProcessSnapshot.from_entries(current_entries)
+
+            diff = current.diff(previous)
+            self.assertGreater(diff.churn, 0)
+            tree.apply_diff(diff)
+
+            rebuilt_tree = ProcessTree.from_status(ps.ProcessStatus(include_self=True, snapshot=current))
+            self.assertEqual(describe(tree), describe(rebuilt_tree))
+            self.assertEqual(tree.count(), rebuilt_tree.count())
+            self.assertEqual(tree.memory_usage, rebuilt_tree.memory_usage)
+            self.assertAlmostEqual(tree.cpu_percent, rebuilt_tree.cpu_percent)
+
+            previous_entries = current_entries
+            previous = current
+
+        # Removing every process leaves nothing behind, not even empty directories
+        for entry in previous_entries:
+            tree.remove_entry(entry.process_id)
+
+        self.assertEqual(tree.children, [])
+        self.assertEqual(tree.count(), 0)
+
+        with self.assertRaises(KeyError):
+            tree.remove_entry(previous_entries[0].process_id)
+
+    def test_traversal(self):
+        tree = ProcessTree()
+        tree.add_entry(create_entry(10, "/usr/bin/worker", memory_usage=10, memory_percent=0.1))
+        tree.add_entry(create_entry(11, "/usr/lib/helper/run", memory_usage=10, memory_percent=0.1))
+
+        self.assertEqual([branch.node_id for branch in tree.walk_preorder()], ["", "bin", "lib", "lib/helper"])
+        self.assertEqual([branch.node_id for branch in tree.walk_postorder()], ["bin", "lib/helper", "lib", ""])
+        self.assertEqual([branch.node_id for branch in tree.walk_preorder(max_depth=1)], ["", "bin", "lib"])
+        self.assertEqual(
+            [branch.node_id for branch in tree.walk_postorder(where=lambda branch: branch.node_id != "lib")],
+            ["bin", ""]
+        )
+        self.assertEqual([len(leaves) for _, _, leaves in tree.walk()], [0, 1, 0, 1])
+        self.assertEqual(tree.height, 3)
+
+        # Paths far deeper than the recursion limit are built, measured, and collapsed without recursing
+        deep_executable = "/" + "/".join(f"directory{index}" for index in range(3000)) + "/run"
+        deep_tree = ProcessTree()
+        deep_tree.add_entry(create_entry(12, deep_executable, memory_usage=10, memory_percent=0.1))
+
+        self.assertEqual(deep_tree.height, 3000)
+        self.assertEqual(deep_tree.count(), 1)
+
+        collapsed_tree = deep_tree.duplicate()
+        self.assertTrue(collapsed_tree.collapse())
+        self.assertEqual(collapsed_tree.height, 2)
+        self.assertEqual(
+            collapsed_tree.get_sunburst_data().names[-2],
+            deep_tree.get_sunburst_data().names[-2]
+        )
+
+    def test_compact(self):
+        tree = ProcessTree()
+
+        for process_id, executable in (
+            (10, "/usr/bin/worker"),
+            (11, "/usr/bin/worker"),
+            (12, "/usr/lib/helper/run"),
+            (13, "/opt/vendor/tool/bin/run"),
+            (14, "/init"),
+        ):
+            tree.add_entry(create_entry(process_id, executable, memory_usage=10 * process_id, memory_percent=0.1))
+
+        sunburst_data = tree.get_sunburst_data()
+        compact = sunburst_data.to_compact()
+        segments = compact["segments"]
+        figure = tree.plot_dict()
+
+        self.assertEqual([trace["name"] for trace in compact["traces"]], [trace["name"] for trace in figure["data"]])
+
+        # Expanding the segments the way the client does must give back the original columns
+        labels = [segments["labels"][index] for index in segments["label_indices"]]
+        ids = []
+
+        for row, label in enumerate(labels):
+            parent_row = segments["parents"][row]
+            self.assertLess(parent_row, row)
+
+            if segments["ids"][row] is not None:
+                ids.append(segments["ids"][row])
+            elif parent_row < 0:
+                ids.append(label)
+            else:
+                ids.append(f"{ids[parent_row]}/{label}")
+
+        parents = ["" if parent_row < 0 else ids[parent_row] for parent_row in segments["parents"]]
+
+        self.assertEqual(len(segments["labels"]), len(set(labels)))
+
+        # Every segment is sent once, no matter how many traces it is drawn in
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(ids, list(sunburst_data.ids))
+
+        # Slicing each trace out of the segments the way the client does must give the same traces as the figure
+        for trace, figure_trace in zip(compact["traces"], figure["data"]):
+            if trace["roots"] is None:
+                rows = list(range(len(ids)))
+            else:
+                selected = []
+
+                for row, parent_row in enumerate(segments["parents"]):
+                    selected.append(row in trace["roots"] or (parent_row >= 0 and selected[parent_row]))
+
+                rows = [row for row, is_selected in enumerate(selected) if is_selected]
+
+            self.assertEqual([labels[row] for row in rows], list(figure_trace["labels"]))
+            self.assertEqual([ids[row] for row in rows], list(figure_trace["ids"]))
+            self.assertEqual([parents[row] for row in rows], list(figure_trace["parents"]))
+            self.assertEqual([segments["values"][row] for row in rows], list(figure_trace["values"]))
+            self.assertEqual(figure_trace.get("maxdepth"), trace.get("maxdepth"))
+
+        self.assertEqual(tree.compact_dict()["layout"], figure["layout"])
+
+    def test_detail_limits(self):
+        tree = ProcessTree()
+
+        executables = {process_id: f"/usr/bin/worker{process_id}" for process_id in range(11, 17)}
+        executables.update({100: "/opt/vendor/run", 20: "/init"})
+
+        for process_id, executable in executables.items():
+            tree.add_entry(create_entry(process_id, executable, memory_usage=10 * process_id, memory_percent=0.1))
+
+        unlimited = tree.get_sunburst_data()
+        self.assertEqual(unlimited.to_compact(), tree.get_sunburst_data(limits=DetailLimits()).to_compact())
+
+        def get_rows(sunburst_data) -> typing.Dict[str, typing.Tuple[str, typing.Any]]:
+            trace = sunburst_data.to_figure().to_dict()["data"][0]
+            return {
+                label: (parent, value)
+                for label, parent, value in zip(trace["labels"], trace["parents"], trace["values"])
+            }
+
+        rows = get_rows(tree.get_sunburst_data(limits=DetailLimits(max_children=2)))
+        worker_parent = rows["worker16"][0]
+
+        self.assertIn("worker15", rows)
+        self.assertNotIn("worker14", rows)
+        self.assertNotIn("worker11", rows)
+        self.assertEqual(rows["other (4 processes)"], (worker_parent, 110 + 120 + 130 + 140))
+
+        # Only the smallest of the three top level segments would be left out, so nothing is folded there
+        self.assertIn("init", rows)
+        self.assertEqual(sum(1 for label in rows if label.startswith("other")), 1)
+
+        rows = get_rows(tree.get_sunburst_data(limits=DetailLimits(min_percent=18)))
+        self.assertIn("worker16", rows)
+        self.assertIn("worker15", rows)
+        self.assertNotIn("worker14", rows)
+        self.assertEqual(rows["other (4 processes)"][1], 500)
+
+        # Every segment still adds up to the same total
+        for trace in tree.get_sunburst_data(limits=DetailLimits(max_children=1)).to_figure().to_dict()["data"]:
+            # The first row for each ID is the one that is drawn
+            rows_by_id = {}
+
+            for segment_id, parent, value in zip(trace["ids"], trace["parents"], trace["values"]):
+                rows_by_id.setdefault(segment_id, (None if segment_id == parent else parent, value))
+
+            values_by_id = {segment_id: value for segment_id, (_, value) in rows_by_id.items()}
+            children_by_parent: typing.Dict[str, typing.List[float]] = {}
+
+            for parent, value in rows_by_id.values():
+                children_by_parent.setdefault(parent, []).append(value)
+
+            for parent, child_values in children_by_parent.items():
+                if parent in values_by_id:
+                    self.assertEqual(sum(child_values), values_by_id[parent])
+
+    def test_subtree(self):
+        tree = create_random_tree(random.Random(3), range(10, 400), max_directories=6)
+
+        def get_rows(sunburst_data) -> typing.Dict[typing.Union[str, int], typing.Tuple[str, str, float]]:
+            trace = sunburst_data.to_figure().to_dict()["data"][0]
+            rows = {}
+
+            for segment_id, parent, label, value in zip(trace["ids"], trace["parents"], trace["labels"], trace["values"]):
+                rows.setdefault(segment_id, (parent, label, value))
+
+            return rows
+
+        with self.assertRaises(KeyError):
+            tree.get_subtree_sunburst_data("not/a/directory")
+
+        for limits in (DetailLimits(), DetailLimits(max_children=3)):
+            complete_rows = get_rows(tree.get_sunburst_data(limits=limits))
+
+            for max_depth in (1, 2, 3):
+                limited_limits = limits._replace(max_depth=max_depth)
+                sunburst_data = tree.get_sunburst_data(limits=limited_limits)
+                rows = get_rows(sunburst_data)
+                expandable = list(sunburst_data.get_expandable())
+
+                self.assertTrue(expandable)
+                self.assertLess(len(rows), len(complete_rows))
+
+                # Expanding every segment the way the client does must draw the same thing as sending everything
+                while expandable:
+                    node_id = expandable.pop()
+                    subtree_data = tree.get_subtree_sunburst_data(node_id, limits=limited_limits)
+                    subtree_rows = get_rows(subtree_data)
+
+                    self.assertEqual(next(iter(subtree_rows)), node_id)
+                    self.assertEqual(subtree_rows[node_id], rows[node_id])
+
+                    rows.update(subtree_rows)
+                    expandable.extend(subtree_data.get_expandable())
+
+                self.assertEqual(rows, complete_rows)
+
+    def test_metrics(self):
+        tree = create_random_tree(random.Random(5), range(10, 200))
+
+        limits = DetailLimits(max_children=3)
+        combined = tree.compact_dict(limits=limits, metrics=SUNBURST_METRICS)
+
+        self.assertEqual(combined["metric"], "memory_usage")
+        self.assertEqual(tree.compact_dict(limits=limits)["segments"].get("metrics"), None)
+
+        # The structure is sent once along with the values of every other metric
+        segments = combined["segments"]
+        self.assertEqual(sorted(segments["metrics"]), ["count", "cpu_percent", "memory_percent"])
+
+        for values in segments["metrics"].values():
+            self.assertEqual(len(values), len(segments["values"]))
+
+        memory_only = tree.compact_dict(limits=limits)
+        self.assertEqual({key: value for key, value in segments.items() if key != "metrics"}, memory_only["segments"])
+        self.assertEqual(combined["traces"], memory_only["traces"])
+
+        # Leaves and directories read each metric the same way they are read when sized by that metric alone
+        sunburst_data = tree.get_sunburst_data(metrics=SUNBURST_METRICS)
+        main_segments = sunburst_data.to_compact()["segments"]
+
+        for metric in ("count", "cpu_percent", "memory_percent"):
+            single_metric = tree.get_sunburst_data(value_attribute=metric).to_compact()["segments"]
+            self.assertEqual(main_segments["metrics"][metric], single_metric["values"])
+
+        self.assertEqual(main_segments["metrics"]["count"][0], tree.count())
+        self.assertEqual(sunburst_data.metrics, ("cpu_percent", "memory_percent", "count"))
+
+        with self.assertRaises(ValueError):
+            sunburst_data.combine(tree.get_sunburst_data())
+
+    def test_multiple_instances(self):
+        tree = ProcessTree()
+
+        for process_id in (10, 11, 12):
+            tree.add_entry(create_entry(process_id))
+
+        tree.add_entry(create_entry(13, "/usr/bin/other", memory_usage=50))
+
+        # A leaf holding several processes is drawn once with its totals rather than once per process
+        segments = tree.compact_dict(metrics=SUNBURST_METRICS)["segments"]
+        leaf_rows = [row for row, segment_id in enumerate(segments["ids"]) if isinstance(segment_id, int)]
+
+        self.assertEqual([segments["ids"][row] for row in leaf_rows], [10, 13])
+        self.assertEqual([segments["values"][row] for row in leaf_rows], [300, 50])
+        self.assertEqual([segments["metrics"]["count"][row] for row in leaf_rows], [3, 1])
+        self.assertEqual(sum(segments["values"][row] for row in leaf_rows), tree.memory_usage)
+
+    def test_figure_dict(self):
+        tree = create_random_tree(random.Random(7), range(10, 150), max_memory=100000)
+
+        # The data is formed without plotly, so plotly's own output is the reference
+        for value_attribute in ("memory_usage", "cpu_percent", "count"):
+            for limits in (None, DetailLimits(max_children=3, max_depth=2)):
+                sunburst_data = tree.get_sunburst_data(value_attribute=value_attribute, limits=limits)
+                self.assertEqual(sunburst_data.to_figure_dict()["data"], sunburst_data.to_figure().to_dict()["data"])
+
+        self.assertEqual(
+            sunburst_data.to_figure_dict(branchvalues="total")["data"],
+            sunburst_data.to_figure(branchvalues="total").to_dict()["data"]
+        )
+        self.assertEqual(tree.plot_dict()["data"], tree.get_sunburst_data().to_figure().to_dict()["data"])
+
+        # The layout is fixed rather than taken from plotly's template, so payloads are the same on every host
+        self.assertEqual(tree.plot_dict()["layout"], get_figure_layout())
+        self.assertEqual(tree.compact_dict()["layout"], {"margin": dict(t=0, l=0, r=0, b=0)})
+
+        # Only drawing figures on the server needs plotly
+        with mock.patch.object(tree_module, "graph_objects", None):
+            self.assertEqual(tree.compact_dict()["layout"], get_figure_layout())
+            self.assertEqual(len(tree.plot_dict()["data"]), len(sunburst_data.to_figure_dict()["data"]))
+
+            with self.assertRaises(ImportError):
+                tree.plot()
+
+    def test_columns(self):
+        rows = [
+            {"names": f"process{index}", "ids": index, "parents": "bin", "values": index * 10, "count": 1}
+            for index in range(3000)
+        ]
+        rows.append({"names": "missing", "ids": "missing", "parents": "", "values": None, "count": None})
+
+        one_at_a_time = Sunburst(metrics=("count",))
+
+        for row in rows:
+            one_at_a_time.add(row)
+
+        batched = Sunburst(metrics=("count",))
+        batched.extend({key: [row[key] for row in rows[:1000]] for key in batched.column_keys()})
+        batched.extend({key: [row[key] for row in rows[1000:]] for key in batched.column_keys()})
+
+        self.assertEqual(len(batched), len(rows))
+        self.assertEqual(batched.to_dict(), one_at_a_time.to_dict())
+        self.assertEqual(batched.to_dict()["values"][-1], None)
+        self.assertEqual(list(batched.to_entries()), rows)
+
+        # Views share the buffers rather than copying them
+        self.assertTrue(numpy.shares_memory(batched.values, batched["values"]))
+        self.assertIsNotNone(batched.names.base)
+        self.assertIs(batched.names.base, batched["names"].base)
+        self.assertEqual(batched.values.dtype, numpy.float64)
+        self.assertEqual(batched.ids[5], 5)
+
+        self.assertEqual(batched.copy().to_dict(), batched.to_dict())
+        self.assertEqual(len(Sunburst.merge(batched, one_at_a_time)), len(rows) * 2)
+
+        with self.assertRaises(ValueError):
+            batched.extend({"names": ["a"], "ids": [1], "parents": [""], "values": [1, 2], "count": [1]})
+
+        with self.assertRaises(ValueError):
+            batched.extend({"names": ["a"], "ids": [1], "parents": [""], "values": [1]})
+
+        with self.assertRaises(TypeError):
+            batched.extend({"names": ["a"], "ids": [1], "parents": [""], "values": ["large"], "count": [1]})
+
+        with self.assertRaises(TypeError):
+            batched.add({"names": ["a"], "ids": 1, "parents": "", "values": 1, "count": 1})
+
+        # Arrays of objects are checked value by value, just like lists
+        with self.assertRaises(TypeError):
+            batched.extend({
+                "names": numpy.array([["a"], "b"], dtype=object),
+                "ids": [1, 2],
+                "parents": ["", ""],
+                "values": [1, 2],
+                "count": [1, 1]
+            })
+
+        with self.assertRaises(TypeError):
+            batched.extend({
+                "names": ["a"],
+                "ids": [1],
+                "parents": [""],
+                "values": numpy.array(["large"], dtype=object),
+                "count": [1]
+            })
+
+        with self.assertRaises(ValueError):
+            batched.extend({"names": numpy.array([["a"]]), "ids": [1], "parents": [""], "values": [1], "count": [1]})
+
+        self.assertEqual(len(batched), len(rows))
+
+        batched.extend({
+            "names": numpy.array(["a", "b"], dtype=object),
+            "ids": numpy.array([1, "b"], dtype=object),
+            "parents": numpy.array(["", ""]),
+            "values": numpy.array([5, None], dtype=object),
+            "count": numpy.array([1, 2])
+        })
+        self.assertEqual(
+            list(batched.to_entries())[-2:],
+            [
+                {"names": "a", "ids": 1, "parents": "", "values": 5, "count": 1},
+                {"names": "b", "ids": "b", "parents": "", "values": None, "count": 2},
+            ]
+        )
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,146 @@
+"""
+Tests for the interchangeable process collectors
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from unittest import TestCase
+
+from pview.utilities.collectors import COLLECTORS
+from pview.utilities.collectors import get_collector
+from pview.utilities.collectors import ProcCollector
+from pview.utilities.proc import ProcTableGenerator
+from pview.utilities.ps import ProcessStatus
+
+from pview.utilities.ps import FoldMode
+from utilities import ps
+from utilities.collectors import get_default_collector
+
+from .test_proc import FAKE_PROC_ROOT
+from .test_proc import get_fake_generator
+
+
+class OverlapCountingCollector(ProcCollector):
+    """
+    Records the most collections that ever ran at once
+    """
+    def __init__(self):
+        super().__init__(table_generator=get_fake_generator())
+        self.active_count = 0
+        self.most_active = 0
+
+    def _collect(self):
+        self.active_count += 1
+        self.most_active = max(self.most_active, self.active_count)
+        time.sleep(0.05)
+        snapshot = super()._collect()
+        self.active_count -= 1
+        return snapshot
+
+    async def _collect_async(self):
+        return await asyncio.to_thread(self._collect)
+
+
+class TestCollectors(TestCase):
+    def test_get_collector(self):
+        self.assertEqual(sorted(COLLECTORS), ["proc", "ps", "psutil"])
+
+        automatic_collector = get_collector()
+        self.assertTrue(automatic_collector.is_available())
+
+        for name in COLLECTORS:
+            if COLLECTORS[name].is_available():
+                self.assertEqual(get_collector(name).name, name)
+
+        self.assertRaises(KeyError, get_collector, "not-a-collector")
+
+    def test_get_default_collector(self):
+        # The default is shared so that CPU rates are measured against the previous sample rather than from scratch
+        collector = get_default_collector()
+        self.assertIs(get_default_collector(), collector)
+        self.assertTrue(collector.is_available())
+
+        status = ps.ProcessStatus(include_self=True)
+        self.assertGreater(len(status), 0)
+        self.assertIsNotNone(collector.last_collection_time)
+
+    def test_collect(self):
+        collector = ProcCollector(table_generator=get_fake_generator())
+
+        self.assertEqual(collector.name, "proc")
+        self.assertIsNone(collector.last_collection_time)
+        self.assertIsNone(collector.describe()["last_collection_time"])
+
+        entries = collector.collect()
+
+        self.assertGreater(len(entries), 0)
+        self.assertIsNotNone(collector.last_collection_time)
+        self.assertGreaterEqual(collector.last_collection_duration, 0)
+        self.assertEqual(collector.describe()["name"], "proc")
+
+        status = ProcessStatus(include_self=True, collector=collector)
+        self.assertEqual(len(status), len(entries))
+        self.assertIn(1, status)
+
+    def test_one_collection_at_a_time(self):
+        collector = OverlapCountingCollector()
+
+        async def collect_at_once():
+            blocking_collection = threading.Thread(target=collector.collect)
+            blocking_collection.start()
+            snapshots = await asyncio.gather(*(collector.collect_async() for _ in range(3)))
+            await asyncio.to_thread(blocking_collection.join)
+            return snapshots
+
+        snapshots = asyncio.run(collect_at_once())
+
+        self.assertEqual(len(snapshots), 3)
+        self.assertTrue(all(len(snapshot) > 0 for snapshot in snapshots))
+        self.assertEqual(collector.most_active, 1)
+
+    def test_child_processes(self):
+        collector = ProcCollector(table_generator=ProcTableGenerator(
+            fold_mode=FoldMode.NONE,
+            proc_root=FAKE_PROC_ROOT,
+            page_size=4096,
+            clock_ticks=100
+        ))
+        status = ProcessStatus(include_self=True, collector=collector)
+
+        self.assertEqual(
+            sorted(process.process_id for process in status.get_direct_child_processes(1)),
+            [100, 200]
+        )
+        self.assertEqual(
+            sorted(process.process_id for process in status.get_child_processes(1)),
+            [100, 101, 102, 200]
+        )
+        self.assertEqual(
+            sorted(process.process_id for process in status.get_child_processes(101)),
+            [102]
+        )
+        self.assertEqual(list(status.get_child_processes(102)), [])
+        self.assertEqual(status.get_direct_child_processes(101)[0], status.get_by_pid(102))
+
+    def test_psutil(self):
+        collector = get_collector("psutil")
+        entries = collector.collect()
+
+        self.assertGreater(len(entries), 0)
+
+        for entry in entries:
+            self.assertIsInstance(entry.process_id, int)
+            self.assertIsInstance(entry.memory_usage, int)
+            self.assertTrue(entry.executable)
+
+    def test_collect_async(self):
+        for name in ("ps", "psutil"):
+            collector = get_collector(name, fold_mode=FoldMode.NONE)
+            snapshot = asyncio.run(collector.collect_async())
+
+            self.assertGreater(len(snapshot), 0)
+            self.assertIn(os.getpid(), snapshot)
+            self.assertIsNotNone(collector.last_collection_duration)
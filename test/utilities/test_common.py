@@ -0,0 +1,77 @@
+"""
+Tests for the shared utility functions
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from unittest import TestCase
+
+import psutil
+
+from pview.utilities.common import run_shell_command_async
+
+
+class TestRunShellCommandAsync(TestCase):
+    def test_output(self):
+        output = asyncio.run(run_shell_command_async("echo 'look at this example'"))
+
+        self.assertTrue(output)
+        self.assertEqual(output.stdout.strip(), "look at this example")
+        self.assertEqual(output.command, "echo 'look at this example'")
+
+        output = asyncio.run(run_shell_command_async(["echo", "first"], "second"))
+        self.assertEqual(output.stdout.strip(), "first second")
+
+    def test_deadline(self):
+        started_at = time.monotonic()
+
+        with self.assertRaises(TimeoutError):
+            asyncio.run(run_shell_command_async("sleep 10", timeout=0.1))
+
+        self.assertLess(time.monotonic() - started_at, 5)
+
+    def test_output_limit(self):
+        output = asyncio.run(run_shell_command_async("echo 1234", output_limit=5))
+        self.assertEqual(output.stdout, "1234\n")
+
+        with self.assertRaises(ValueError):
+            asyncio.run(run_shell_command_async("echo 12345", output_limit=5))
+
+        # Output larger than a pipe's buffer arrives in several reads and must be read in full
+        output = asyncio.run(run_shell_command_async("seq 1 100000"))
+        self.assertEqual(len(output.stdout.splitlines()), 100000)
+
+    def test_error_output_limit(self):
+        output = asyncio.run(run_shell_command_async(["sh", "-c", "echo 1234 >&2"], output_limit=5))
+        self.assertEqual(output.stderr, "1234\n")
+        self.assertEqual(output.stdout, "")
+
+        with self.assertRaises(ValueError) as context:
+            asyncio.run(run_shell_command_async(["sh", "-c", "echo 12345 >&2"], output_limit=5))
+
+        self.assertIn("stderr", str(context.exception))
+
+        # Endless errors must not be read forever
+        started_at = time.monotonic()
+
+        with self.assertRaises(ValueError):
+            asyncio.run(run_shell_command_async(["sh", "-c", "exec yes >&2"], output_limit=1024, timeout=30))
+
+        self.assertLess(time.monotonic() - started_at, 5)
+
+    def test_cancellation(self):
+        async def cancel_command() -> int:
+            task = asyncio.create_task(run_shell_command_async("sleep 10", timeout=30))
+            await asyncio.sleep(0.2)
+
+            child_ids = [child.pid for child in psutil.Process().children()]
+            task.cancel()
+
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+            return child_ids[0]
+
+        child_id = asyncio.run(cancel_command())
+        self.assertFalse(psutil.pid_exists(child_id) and psutil.Process(child_id).status() != psutil.STATUS_ZOMBIE)
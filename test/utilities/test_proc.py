@@ -0,0 +1,73 @@
+"""
+Tests for reading process data from a fake `/proc` filesystem
+"""
+from __future__ import annotations
+
+import pathlib
+from unittest import TestCase
+
+from pview.utilities.proc import ProcTableGenerator
+
+FAKE_PROC_ROOT = pathlib.Path(__file__).parent / "fixtures" / "proc"
+
+
+def get_fake_generator() -> ProcTableGenerator:
+    return ProcTableGenerator(proc_root=FAKE_PROC_ROOT, page_size=4096, clock_ticks=100)
+
+
+class TestProcTableGenerator(TestCase):
+    def test_is_available(self):
+        self.assertTrue(ProcTableGenerator.is_available(FAKE_PROC_ROOT))
+        self.assertFalse(ProcTableGenerator.is_available(FAKE_PROC_ROOT / "does-not-exist"))
+
+    def test_load_processes(self):
+        generator = get_fake_generator()
+        command_id, rows, commands = generator._load_processes()
+
+        self.assertIsNone(command_id)
+        self.assertEqual(len(rows), 7)
+
+        rows_by_id = {
+            row[generator.process_id_column()]: row
+            for row in rows
+        }
+
+        self.assertEqual(sorted(rows_by_id), [1, 2, 3, 100, 101, 102, 200])
+
+        bash = rows_by_id[100]
+        self.assertEqual(bash[generator.user_column()], "root")
+        self.assertEqual(bash[generator.parent_process_id_column()], 1)
+        self.assertEqual(bash[generator.cpu_percent_column()], 10.0)
+        self.assertEqual(bash[generator.memory_column()], 2000)
+        self.assertEqual(bash[generator.memory_percent_column()], 0.2)
+        self.assertEqual(bash[generator.command_and_args_column()], "/usr/bin/bash --login")
+        self.assertEqual(bash[generator.cpu_time_column()], 50.0)
+        self.assertEqual(bash[generator.start_time_column()], 500.0)
+        self.assertEqual(commands[100], "/usr/bin/bash")
+
+        server = rows_by_id[101]
+        self.assertEqual(server[generator.user_column()], "4294967")
+        self.assertEqual(server[generator.cpu_percent_column()], 10.0)
+        self.assertEqual(server[generator.memory_percent_column()], 1.0)
+
+        worker = rows_by_id[102]
+        self.assertEqual(worker[generator.state_column()], "D")
+        self.assertEqual(worker[generator.parent_process_id_column()], 101)
+        self.assertEqual(commands[102], "/usr/bin/python3")
+
+        self.assertEqual(commands[2], "kthreadd")
+        self.assertEqual(rows_by_id[2][generator.command_and_args_column()], "kthreadd")
+        self.assertEqual(commands[3], "kworker/0:1-events")
+
+    def test_create_entries(self):
+        entries = get_fake_generator().create_entries()
+
+        self.assertGreater(len(entries), 0)
+        self.assertEqual(sum(entry.memory_usage for entry in entries.values()), 14000)
+
+        init = entries[1]
+        self.assertEqual(init.executable, "/sbin/init")
+        self.assertEqual(init.arguments, "splash")
+        self.assertEqual(init.status, "Sleeping")
+
+        self.assertEqual(entries[200].status, "Zombie")
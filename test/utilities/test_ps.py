@@ -3,12 +3,72 @@
 """
 from __future__ import annotations
 
+import dataclasses
+import json
 import os
+import types
+import typing
 from unittest import TestCase
+from unittest import mock
 
+import psutil
+
+from pview.utilities.ps import ProcessSnapshot
 from pview.utilities.ps import ProcessStatus
 from utilities.ps import ProcessEntry
 from pview.utilities.ps import PSTableGenerator
+from pview.utilities.ps import PsutilTableGenerator
+from pview.utilities.ps import FoldMode
+from pview.utilities.ps import SizeUnit
+from pview.utilities.ps import describe_memory
+from pview.utilities.ps import describe_memory_values
+
+
+class StaticTableGenerator(PSTableGenerator):
+    """
+    A table generator that forms its table from prepared rows rather than a call to `ps`
+    """
+    def __init__(self, rows: typing.Sequence[typing.Tuple[int, int, int]], **kwargs):
+        """
+        Constructor
+
+        :param rows: The process ID, parent process ID, and memory usage for each process
+        """
+        super().__init__(**kwargs)
+        self.__rows = rows
+
+    def _load_processes(self):
+        rows = [
+            {
+                self.user_column(): "user",
+                self.process_id_column(): process_id,
+                self.parent_process_id_column(): parent_process_id,
+                self.cpu_percent_column(): 1.0,
+                self.memory_percent_column(): 0.5,
+                self.memory_column(): memory,
+                self.state_column(): "S",
+                self.command_and_args_column(): f"/usr/bin/process{process_id} --flag",
+            }
+            for process_id, parent_process_id, memory in self.__rows
+        ]
+        commands = {
+            process_id: f"/usr/bin/process{process_id}"
+            for process_id, _, _ in self.__rows
+        }
+        return None, rows, commands
+
+
+FOLDING_ROWS = [
+    (102, 101, 8),
+    (1, 0, 1),
+    (103, 100, 16),
+    (3, 2, 0),
+    (100, 1, 2),
+    (2, 0, 0),
+    (50, 1, 32),
+    (101, 100, 4),
+]
+"""Process ID, parent process ID, and memory for a small tree of processes, out of order on purpose"""
 
 
 def get_user_key() -> str:
@@ -90,3 +150,228 @@ class TestProcessStatus(TestCase):
         entries = table.create_entries()
         self.assertGreater(len(entries), 1)
 
+
+
+class TestFolding(TestCase):
+    def get_memory(
+        self,
+        fold_mode: FoldMode,
+        rows: typing.Sequence[typing.Tuple[int, int, int]] = None
+    ) -> typing.Dict[int, int]:
+        generator = StaticTableGenerator(rows or FOLDING_ROWS, fold_mode=fold_mode)
+        return {
+            process[generator.process_id_column()]: process[generator.memory_column()]
+            for process in generator.create_process_list()
+        }
+
+    def test_no_folding(self):
+        self.assertEqual(self.get_memory(FoldMode.NONE), {row[0]: row[2] for row in FOLDING_ROWS})
+
+    def test_children(self):
+        self.assertEqual(
+            self.get_memory(FoldMode.CHILDREN),
+            {1: 1, 2: 0, 3: 0, 50: 32, 100: 2 + 4 + 16, 102: 8}
+        )
+
+    def test_deep_children(self):
+        # 100 -> 101 -> 102 -> 104 -> 105 -> 106
+        deep_rows = FOLDING_ROWS + [(104, 102, 64), (105, 104, 128), (106, 105, 256)]
+
+        self.assertEqual(
+            self.get_memory(FoldMode.CHILDREN, deep_rows),
+            {1: 1, 2: 0, 3: 0, 50: 32, 100: 2 + 4 + 16, 102: 8, 104: 64, 105: 128, 106: 256}
+        )
+
+    def test_subtree(self):
+        self.assertEqual(
+            self.get_memory(FoldMode.SUBTREE),
+            {1: 1, 2: 0, 3: 0, 50: 32, 100: 2 + 4 + 8 + 16}
+        )
+
+    def test_order_does_not_matter(self):
+        reversed_rows = list(reversed(FOLDING_ROWS))
+
+        for fold_mode in FoldMode:
+            generator = StaticTableGenerator(reversed_rows, fold_mode=fold_mode)
+            memory = {
+                process[generator.process_id_column()]: process[generator.memory_column()]
+                for process in generator.create_process_list()
+            }
+            self.assertEqual(memory, self.get_memory(fold_mode))
+
+    def test_entries(self):
+        entries = StaticTableGenerator(FOLDING_ROWS, fold_mode=FoldMode.SUBTREE).create_entries()
+
+        self.assertEqual(entries[100].executable, "/usr/bin/process100")
+        self.assertEqual(entries[100].arguments, "--flag")
+        self.assertEqual(entries[100].current_cpu_percent, 4.0)
+        self.assertEqual(entries[100].memory_percent, 2.0)
+
+
+class TestProcessSnapshot(TestCase):
+    def get_snapshot(self) -> ProcessSnapshot:
+        return StaticTableGenerator(FOLDING_ROWS, fold_mode=FoldMode.NONE).create_snapshot()
+
+    def test_columns(self):
+        snapshot = self.get_snapshot()
+
+        self.assertEqual(len(snapshot), len(FOLDING_ROWS))
+        self.assertEqual(sorted(snapshot.process_ids.tolist()), sorted(row[0] for row in FOLDING_ROWS))
+        self.assertEqual(int(snapshot.memory_usages.sum()), sum(row[2] for row in FOLDING_ROWS))
+        self.assertEqual(set(snapshot.users.tolist()), {"user"})
+        self.assertEqual(set(snapshot.states.tolist()), {"Sleeping"})
+
+    def test_rows_match_entries(self):
+        generator = StaticTableGenerator(FOLDING_ROWS, fold_mode=FoldMode.CHILDREN)
+        entries = generator.create_entries()
+        snapshot = generator.create_snapshot()
+
+        self.assertEqual({entry.process_id: entry for entry in snapshot}, entries)
+        self.assertEqual(snapshot.get(100), entries[100])
+        self.assertIsNone(snapshot.get(12345))
+
+    def test_children(self):
+        snapshot = self.get_snapshot()
+
+        self.assertEqual(sorted(snapshot.process_ids[snapshot.child_indices(1)].tolist()), [50, 100])
+        self.assertEqual(snapshot.process_ids[snapshot.child_indices(101)].tolist(), [102])
+        self.assertEqual(len(snapshot.child_indices(102)), 0)
+
+    def test_exclude(self):
+        snapshot = self.get_snapshot()
+        remaining = snapshot.exclude([100, 101])
+
+        self.assertEqual(len(remaining), len(snapshot) - 2)
+        self.assertNotIn(100, remaining)
+        self.assertIn(102, remaining)
+        self.assertEqual(remaining.get(102), snapshot.get(102))
+
+    def test_status(self):
+        snapshot = self.get_snapshot()
+        status = ProcessStatus(include_self=True, snapshot=snapshot)
+
+        self.assertIs(status.snapshot, snapshot)
+        self.assertEqual(sorted(entry.process_id for entry in status.get_child_processes(100)), [101, 102, 103])
+        self.assertEqual(status[50].memory_usage, 32)
+
+    def test_diff(self):
+        previous_entries = [
+            dataclasses.replace(entry, start_time=float(entry.process_id))
+            for entry in self.get_snapshot()
+        ]
+        previous = ProcessSnapshot.from_entries(previous_entries)
+
+        current_entries = [
+            entry if entry.process_id != 101 else dataclasses.replace(entry, memory_usage=entry.memory_usage + 1)
+            for entry in previous_entries
+            if entry.process_id != 50
+        ]
+
+        # Process 102 exited and its ID was given to a new process
+        current_entries = [
+            entry if entry.process_id != 102 else dataclasses.replace(entry, start_time=5000.0)
+            for entry in current_entries
+        ]
+        current_entries.append(dataclasses.replace(previous_entries[0], process_id=9000, start_time=9000.0))
+        current = ProcessSnapshot.from_entries(current_entries)
+
+        diff = current.diff(previous)
+
+        self.assertEqual(sorted(entry.process_id for entry in diff.added), [102, 9000])
+        self.assertEqual(sorted(entry.process_id for entry in diff.removed), [50, 102])
+        self.assertEqual([(old.process_id, new.process_id) for old, new in diff.changed], [(101, 101)])
+        self.assertEqual(diff.changed[0][1].memory_usage, diff.changed[0][0].memory_usage + 1)
+        self.assertEqual(diff.churn, 5)
+
+        self.assertFalse(current.diff(current))
+        self.assertFalse(ProcessSnapshot.from_entries(current_entries).diff(current))
+
+
+class TestProcessEntry(TestCase):
+    def test_shared_entries(self):
+        entry = StaticTableGenerator(FOLDING_ROWS, fold_mode=FoldMode.NONE).create_entries()[100]
+
+        self.assertFalse(hasattr(entry, "__dict__"))
+        self.assertIs(entry.copy, entry)
+
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            entry.memory_usage = 0
+
+    def test_executable_parts(self):
+        entry = StaticTableGenerator(FOLDING_ROWS, fold_mode=FoldMode.NONE).create_entries()[100]
+
+        self.assertEqual(tuple(entry.executable_parts), ("usr", "bin", "process100"))
+        self.assertIs(entry.executable_parts, entry.executable_parts)
+
+    def test_fields(self):
+        generator = StaticTableGenerator(FOLDING_ROWS, fold_mode=FoldMode.NONE)
+        entry = generator.create_entries()[100]
+        entry.executable_parts
+
+        # The cached parts of the executable aren't a field, so they never reach clients
+        for process_id, dictionary in generator.create_dict().items():
+            self.assertFalse([key for key in dictionary if key.startswith("_")], f"Process {process_id} leaked a key")
+
+        self.assertNotIn("_executable_parts", json.loads(generator.create_json())[str(100)])
+
+        listed_entry = dataclasses.replace(entry, arguments=["--flag", "--other"])
+        self.assertEqual(listed_entry.arguments, ("--flag", "--other"))
+        self.assertEqual(hash(listed_entry), hash(dataclasses.replace(entry, arguments=("--flag", "--other"))))
+        self.assertEqual(len({entry, listed_entry, dataclasses.replace(entry)}), 2)
+
+
+def create_psutil_process(process_id: int, exe: typing.Optional[str], command_line: typing.List[str]):
+    """
+    Create a stand-in for a process from `psutil.process_iter` holding only what `PsutilTableGenerator` reads
+    """
+    return types.SimpleNamespace(info={
+        "pid": process_id,
+        "ppid": 1,
+        "username": "user",
+        "cpu_percent": 1.0,
+        "memory_percent": 0.5,
+        "memory_info": types.SimpleNamespace(rss=4096),
+        "status": psutil.STATUS_SLEEPING,
+        "exe": exe,
+        "name": command_line[0].split("/")[-1] if command_line else "kworker",
+        "cmdline": command_line,
+        "cpu_times": types.SimpleNamespace(user=1.0, system=0.5),
+        "create_time": 1000.0 + process_id,
+    })
+
+
+class TestPsutilTableGenerator(TestCase):
+    def test_arguments(self):
+        processes = [
+            # The executable is reached through a symlink, so it differs from argv[0]
+            create_psutil_process(10, "/usr/bin/python3.11", ["python3", "-m", "http.server"]),
+            # The executable appears again within an argument
+            create_psutil_process(11, "/usr/bin/bash", ["/usr/bin/bash", "-c", "exec /usr/bin/bash --login"]),
+            create_psutil_process(12, None, []),
+        ]
+
+        with mock.patch.object(psutil, "process_iter", return_value=processes):
+            entries = PsutilTableGenerator(fold_mode=FoldMode.NONE).create_entries()
+
+        self.assertEqual(entries[10].executable, "/usr/bin/python3.11")
+        self.assertEqual(entries[10].arguments, "-m http.server")
+        self.assertEqual(entries[11].arguments, "-c exec /usr/bin/bash --login")
+        self.assertEqual(entries[12].executable, "kworker")
+        self.assertEqual(entries[12].arguments, "")
+
+
+class TestDescribeMemory(TestCase):
+    def test_describe_memory_values(self):
+        amounts = [0, 1, 1023, 1024, 1025, 5000.5, 1024 ** 2, 1024 ** 2 + 1, 3 * 1024 ** 3, 1024 ** 4, 2 ** 45 + 0.25]
+        amounts.extend(amount * 0.999 for amount in list(amounts))
+
+        for from_unit in (SizeUnit.B, SizeUnit.KB, SizeUnit.MB):
+            for to_unit in (None, SizeUnit.KB, SizeUnit.GB):
+                self.assertEqual(
+                    describe_memory_values(amounts, from_unit, to_unit),
+                    [describe_memory(amount, from_unit, to_unit) for amount in amounts]
+                )
+
+        self.assertEqual(describe_memory_values([None, float("nan"), 2048], SizeUnit.KB), ["??", "??", "2.00MB"])
+        self.assertEqual(describe_memory_values([None], SizeUnit.KB, SizeUnit.MB), ["??MB"])
+        self.assertEqual(describe_memory_values([], SizeUnit.KB), [])
@@ -0,0 +1,54 @@
+"""
+Tests for computing CPU usage between samples
+"""
+from __future__ import annotations
+
+from unittest import TestCase
+
+from pview.utilities.ps import parse_duration
+from pview.utilities.rates import CPURateEngine
+
+
+class TestCPURateEngine(TestCase):
+    def test_rates(self):
+        engine = CPURateEngine()
+
+        first_rates = engine.update([(10, 100.0, 5.0), (11, 200.0, 1.0)], sampled_at=1000.0)
+        self.assertEqual(first_rates, {10: None, 11: None})
+        self.assertEqual(engine.tracked_process_count, 2)
+
+        second_rates = engine.update([(10, 100.0, 7.0), (11, 200.0, 1.0), (12, 300.0, 0.5)], sampled_at=1004.0)
+        self.assertEqual(second_rates[10], 50.0)
+        self.assertEqual(second_rates[11], 0.0)
+        self.assertIsNone(second_rates[12])
+
+        # Process 11 exited and a new process took its ID
+        third_rates = engine.update([(10, 100.0, 11.0), (11, 350.0, 0.1)], sampled_at=1006.0)
+        self.assertEqual(third_rates[10], 200.0)
+        self.assertIsNone(third_rates[11])
+        self.assertEqual(engine.tracked_process_count, 2)
+
+    def test_start_time_tolerance(self):
+        engine = CPURateEngine(start_time_tolerance=2.0)
+
+        engine.update([(10, 100.0, 5.0)], sampled_at=10.0)
+        rates = engine.update([(10, 101.0, 6.0)], sampled_at=20.0)
+        self.assertEqual(rates[10], 10.0)
+
+        rates = engine.update([(10, 110.0, 7.0)], sampled_at=30.0)
+        self.assertIsNone(rates[10])
+
+    def test_decreasing_cpu_time(self):
+        engine = CPURateEngine(start_time_tolerance=2.0)
+
+        engine.update([(10, 100.0, 5.0)], sampled_at=10.0)
+        rates = engine.update([(10, 100.0, 1.0)], sampled_at=20.0)
+        self.assertIsNone(rates[10])
+
+
+class TestParseDuration(TestCase):
+    def test_parse_duration(self):
+        self.assertEqual(parse_duration("00:00:02"), 2.0)
+        self.assertEqual(parse_duration("16:34"), 994.0)
+        self.assertEqual(parse_duration("2-03:04:05"), 183845.0)
+        self.assertEqual(parse_duration("0:01.50"), 1.5)
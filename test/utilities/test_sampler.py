@@ -0,0 +1,168 @@
+"""
+Tests for sampling process data in the background
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from unittest import TestCase
+
+from models.tree import ProcessTree
+from pview.utilities.collectors import ProcCollector
+from pview.utilities.executors import ExecutorKind
+from pview.utilities.executors import create_executor
+from pview.utilities.sampler import Sampler
+
+from .test_proc import get_fake_generator
+
+
+def count_processes(snapshot, details) -> dict:
+    return {"process_count": len(snapshot)}
+
+
+def describe_tree(snapshot, details, tree=None) -> dict:
+    return {
+        "process_count": len(snapshot),
+        "tree_id": id(tree) if tree is not None else None,
+        "memory_usage": tree.memory_usage if tree is not None else None,
+    }
+
+
+class AlternatingCollector(ProcCollector):
+    """
+    Leaves a process out of every other collection so that each sample differs from the one before it
+    """
+    def __init__(self):
+        super().__init__(table_generator=get_fake_generator())
+        self.collection_count = 0
+
+    def _collect(self):
+        snapshot = super()._collect()
+        self.collection_count += 1
+
+        if self.collection_count % 2 == 0:
+            leaf_id = next(
+                process_id
+                for process_id in snapshot.process_ids.tolist()
+                if len(snapshot.child_indices(process_id)) == 0
+            )
+            snapshot = snapshot.exclude({leaf_id})
+
+        return snapshot
+
+    async def _collect_async(self):
+        return self._collect()
+
+
+def create_sampler(**kwargs) -> Sampler:
+    kwargs.setdefault("collector", ProcCollector(table_generator=get_fake_generator()))
+    kwargs.setdefault("build_payload", count_processes)
+    return Sampler(include_self=True, **kwargs)
+
+
+class TestSampler(TestCase):
+    def test_sample(self):
+        sampler = create_sampler(capacity=2)
+
+        self.assertIsNone(sampler.latest)
+
+        first = sampler.sample()
+        second = sampler.sample()
+        third = sampler.sample()
+
+        self.assertIs(sampler.latest, third)
+        self.assertEqual([snapshot.snapshot_id for snapshot in sampler.snapshots], [2, 3])
+        self.assertGreater(third.snapshot_id, second.snapshot_id)
+        self.assertGreaterEqual(third.created_at, first.created_at)
+        self.assertIsNone(sampler.get(first.snapshot_id))
+        self.assertIs(sampler.get(second.snapshot_id), second)
+
+        payload = json.loads(third.payload)
+        self.assertEqual(payload["collector"]["name"], "proc")
+        self.assertEqual(payload["process_count"], len(third.status))
+        self.assertEqual(payload["snapshot"]["snapshot_id"], third.snapshot_id)
+
+    def test_invalid_configuration(self):
+        self.assertRaises(ValueError, create_sampler, interval=0)
+        self.assertRaises(ValueError, create_sampler, capacity=0)
+
+    def test_background_sampling(self):
+        sampler = create_sampler(interval=0.01, capacity=3)
+
+        async def sample_in_background():
+            sampler.start()
+            self.assertTrue(sampler.is_running)
+            await asyncio.sleep(0.1)
+            await sampler.stop()
+
+        asyncio.run(sample_in_background())
+
+        self.assertFalse(sampler.is_running)
+        self.assertIsNotNone(sampler.latest)
+        self.assertGreater(sampler.latest.snapshot_id, 1)
+        self.assertEqual(len(sampler.snapshots), 3)
+
+    def test_sample_async(self):
+        sampler = create_sampler()
+        snapshot = asyncio.run(sampler.sample_async())
+
+        self.assertIs(sampler.latest, snapshot)
+        self.assertEqual(json.loads(snapshot.payload)["process_count"], len(snapshot.status))
+        self.assertIsNotNone(sampler.collector.last_collection_duration)
+
+    def test_executors(self):
+        for kind in ExecutorKind:
+            executor = create_executor(kind=kind, workers=1)
+
+            try:
+                sampler = create_sampler(executor=executor)
+                snapshot = asyncio.run(sampler.sample_async())
+                payload = json.loads(snapshot.payload)
+
+                self.assertEqual(payload["process_count"], len(snapshot.status))
+                self.assertEqual(payload["snapshot"]["snapshot_id"], snapshot.snapshot_id)
+            finally:
+                if executor is not None:
+                    executor.shutdown()
+
+    def test_reuse_tree(self):
+        for kind in ExecutorKind:
+            executor = create_executor(kind=kind, workers=1)
+
+            try:
+                sampler = create_sampler(
+                    collector=AlternatingCollector(),
+                    build_payload=describe_tree,
+                    executor=executor,
+                    reuse_tree=True
+                )
+                payloads = [json.loads(asyncio.run(sampler.sample_async()).payload) for _ in range(3)]
+                self.assertNotEqual(payloads[0]["process_count"], payloads[1]["process_count"])
+
+                if kind == ExecutorKind.PROCESS:
+                    # A tree can't be shared with another process, so every payload is built from scratch
+                    self.assertIsNone(sampler.tree)
+                    self.assertTrue(all(payload["tree_id"] is None for payload in payloads))
+                    continue
+
+                tree = sampler.tree
+                self.assertIsInstance(tree, ProcessTree)
+                self.assertEqual({payload["tree_id"] for payload in payloads}, {id(tree)})
+
+                sampler.sample()
+                self.assertIs(sampler.tree, tree)
+
+                rebuilt_tree = ProcessTree.from_status(sampler.latest.status)
+                self.assertEqual(tree.memory_usage, rebuilt_tree.memory_usage)
+                self.assertEqual(tree.cpu_percent, rebuilt_tree.cpu_percent)
+                self.assertEqual(sorted(tree._entries), sorted(rebuilt_tree._entries))
+
+                # Other drawings of the newest snapshot are built from the kept tree, but older snapshots aren't
+                rendered = json.loads(asyncio.run(sampler.render_async(sampler.latest)))
+                self.assertEqual(rendered["tree_id"], id(tree))
+
+                rendered = json.loads(asyncio.run(sampler.render_async(sampler.snapshots[0])))
+                self.assertIsNone(rendered["tree_id"])
+            finally:
+                if executor is not None:
+                    executor.shutdown()
@@ -0,0 +1,91 @@
+"""
+Tests for the interchangeable JSON encoders
+"""
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from unittest import TestCase
+from unittest import mock
+
+import numpy
+
+from pview.utilities import serialization
+from pview.utilities.serialization import ENCODERS
+from pview.utilities.serialization import OrjsonEncoder
+from pview.utilities.serialization import StandardEncoder
+from pview.utilities.serialization import get_encoder
+from pview.utilities.serialization import json_response
+from pview.utilities.serialization import model_response
+from messages.responses import ErrorResponse
+
+
+class TestSerialization(TestCase):
+    def test_get_encoder(self):
+        self.assertEqual(list(ENCODERS), ["orjson", "json"])
+        self.assertTrue(get_encoder().is_available())
+
+        for name in ENCODERS:
+            if ENCODERS[name].is_available():
+                self.assertEqual(get_encoder(name).name, name)
+
+        self.assertRaises(KeyError, get_encoder, "not-an-encoder")
+
+        # The standard library is used when orjson isn't installed
+        with mock.patch.object(serialization, "orjson", None):
+            self.assertIsInstance(get_encoder(), StandardEncoder)
+            self.assertRaises(ValueError, get_encoder, "orjson")
+
+    def test_encode(self):
+        data = {
+            "values": numpy.array([1.5, 2.0]),
+            "ids": numpy.array(["bin", 10], dtype=object),
+            "strided": numpy.arange(6)[::2],
+            "count": numpy.int64(3),
+            "percent": numpy.float32(0.5),
+            "created_at": datetime(2024, 1, 2, 3, 4, 5),
+            "nested": [{"name": "é", "value": None}],
+            1: "numeric key",
+        }
+        expected = {
+            "values": [1.5, 2.0],
+            "ids": ["bin", 10],
+            "strided": [0, 2, 4],
+            "count": 3,
+            "percent": 0.5,
+            "created_at": "2024-01-02T03:04:05",
+            "nested": [{"name": "é", "value": None}],
+            "1": "numeric key",
+        }
+
+        for name, encoder_type in ENCODERS.items():
+            if not encoder_type.is_available():
+                continue
+
+            encoded = encoder_type().encode(data)
+            self.assertIsInstance(encoded, bytes)
+            self.assertEqual(json.loads(encoded), expected)
+
+        with self.assertRaises(TypeError):
+            StandardEncoder().encode({"value": object()})
+
+        if OrjsonEncoder.is_available():
+            with self.assertRaises(TypeError):
+                OrjsonEncoder().encode({"value": object()})
+
+    def test_responses(self):
+        response = json_response({"values": numpy.arange(3)}, status=201)
+        self.assertEqual(response.status, 201)
+        self.assertEqual(response.content_type, "application/json")
+        self.assertEqual(json.loads(response.body), {"values": [0, 1, 2]})
+
+        with self.assertLogs(level="ERROR"):
+            error = ErrorResponse(operation="Test", error_message="Something went wrong", code=404)
+
+        response = model_response(error, status=error.code)
+        self.assertEqual(response.status, 404)
+        self.assertEqual(json.loads(response.body), error.model_dump())
+
+        response = error.create_web_response()
+        self.assertEqual(response.status, 404)
+        self.assertEqual(json.loads(response.body), error.model_dump())